@@ -0,0 +1,61 @@
+"""Compare the JSON codecs available to SymBotClient on typical large responses
+
+Decodes a datafeed read of 100 message events and a listing of 1000 streams, as received in bytes,
+with each installed codec, and compares them with the previous response.text + json.loads path.
+
+    python benchmarks/benchmark_json_codec.py
+"""
+
+import json
+import timeit
+
+from sym_api_client_python import json_codec
+
+REPEAT = 5
+NUMBER = 200
+
+
+def datafeed_read(number_of_events=100):
+    message = ('<div data-format="PresentationML" data-version="2.0" class="wysiwyg"><p>'
+               '<span class="entity" data-entity-id="0">@bot</span> Price of $ACME for Q3 ? 🙂</p></div>')
+    return {'ackId': 'ack_id_string', 'events': [{
+        'id': 'event_{}'.format(i), 'messageId': 'message_{}'.format(i), 'timestamp': 1565879149167 + i,
+        'type': 'MESSAGESENT', 'initiator': {'user': {'userId': 344147139494862, 'displayName': 'Réed Feldman',
+                                                      'email': 'reed.feldman@symphony.com', 'username': 'reed'}},
+        'payload': {'messageSent': {'message': {
+            'messageId': 'message_{}'.format(i), 'timestamp': 1565879149167 + i, 'message': message,
+            'data': '{"0":{"id":[{"type":"com.symphony.user.userId","value":"344147139497165"}],'
+                    '"type":"com.symphony.user.mention"}}',
+            'user': {'userId': 344147139494862, 'firstName': 'Réed', 'lastName': 'Feldman'},
+            'stream': {'streamId': 'pDWC8aUE7IYlK8b9lChaM3___pNuPcIWdA', 'streamType': 'ROOM'},
+            'externalRecipients': False, 'originalFormat': 'com.symphony.messageml.v2'}}}}
+        for i in range(number_of_events)]}
+
+
+def stream_listing(number_of_streams=1000):
+    return [{'id': 'stream_{}'.format(i), 'crossPod': False, 'active': True,
+             'streamType': {'type': 'ROOM'}, 'streamAttributes': {'members': [344147139494862 + i]},
+             'roomAttributes': {'name': 'Room {}'.format(i)}} for i in range(number_of_streams)]
+
+
+def best_of(statement):
+    return min(timeit.repeat(statement, repeat=REPEAT, number=NUMBER)) / NUMBER * 1e6
+
+
+def main():
+    codecs = [codec for name, (codec, is_installed) in json_codec._CODECS.items() if is_installed()]
+    for name, payload in (('datafeed read (100 events)', datafeed_read()),
+                          ('stream listing (1000 streams)', stream_listing())):
+        body = json.dumps(payload).encode('utf-8')
+        print('{}: {} KiB'.format(name, len(body) // 1024))
+        baseline = best_of(lambda: json.loads(body.decode('utf-8')))
+        print('    {:<24} {:>9.1f} us'.format('text + json.loads', baseline))
+        for codec in codecs:
+            decode = best_of(lambda: codec.loads(body))
+            encode = best_of(lambda: codec.dumps(payload))
+            print('    {:<24} {:>9.1f} us  x{:.2f}   encode {:>9.1f} us'
+                  .format(codec.name + '.loads(bytes)', decode, baseline / decode, encode))
+
+
+if __name__ == '__main__':
+    main()
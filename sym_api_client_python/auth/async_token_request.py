@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from .auth_endpoint_constants import auth_endpoint_constants
+from ..exceptions.MaxRetryException import MaxRetryException
+from ..json_codec import encode_json_body
+
+log = logging.getLogger(__name__)
+
+
+async def request_token_async(session, url, json_codec, max_retries, create_body=None, **kwargs):
+    """POST to an authentication endpoint with aiohttp and return the token of the response.
+
+    Failed attempts, error statuses or connection errors, are retried every TIMEOUT seconds
+    without blocking the event loop. MaxRetryException is raised after max_retries retries.
+
+    create_body: called before each attempt to build the json body, so that a fresh JWT is sent
+    kwargs: passed on to session.post, typically proxy and ssl
+    """
+    retries = 0
+    while True:
+        request_kwargs = dict(kwargs)
+        if create_body is not None:
+            request_kwargs = encode_json_body(json_codec, dict(request_kwargs, json=create_body()))
+        try:
+            response = await session.post(url, **request_kwargs)
+            body = await response.read()
+            if response.status == 200:
+                return json_codec.loads(body)['token']
+            failure = response.status
+        except aiohttp.ClientError as exc:
+            failure = exc
+
+        retries += 1
+        if retries > max_retries:
+            raise MaxRetryException('bot failed to authenticate more than {} times.'.format(max_retries))
+        log.debug('request_token_async() --> Authentication to {} failed: {}, retrying in {}s'
+                  .format(url, failure, auth_endpoint_constants['TIMEOUT']))
+        await asyncio.sleep(auth_endpoint_constants['TIMEOUT'])
+
+
+async def wait_before_authenticating_async(auth):
+    """Authentication is not repeated within WAIT_TIME milliseconds, like in authenticate. Sleep
+    without blocking until it is allowed and record the time of this authentication"""
+    while auth.last_auth_time != 0 and \
+            _now_millis() - auth.last_auth_time < auth_endpoint_constants['WAIT_TIME']:
+        log.debug('Retry authentication in {} seconds.'.format(auth_endpoint_constants['TIMEOUT']))
+        await asyncio.sleep(auth_endpoint_constants['TIMEOUT'])
+    auth.last_auth_time = _now_millis()
+
+
+async def gather_tokens_async(*coroutines):
+    """Run the token requests concurrently. If one fails the others are cancelled"""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _now_millis():
+    return int(round(time.time() * 1000))
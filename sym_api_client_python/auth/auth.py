@@ -1,12 +1,17 @@
-import json
 import logging
 import time
+
+import aiohttp
 import requests
+
+from .async_token_request import request_token_async, wait_before_authenticating_async, gather_tokens_async
 from .auth_endpoint_constants import auth_endpoint_constants
+from .certificate_manager import CertificateManager
 from ..clients.api_client import APIClient
-from requests_pkcs12 import Pkcs12Adapter
 from ..exceptions.UnauthorizedException import UnauthorizedException
 from ..exceptions.MaxRetryException import MaxRetryException
+from ..services.session_token_repository import create_session_token_repository
+from ..json_codec import get_json_codec
 
 
 class Auth(APIClient):
@@ -25,6 +30,13 @@ class Auth(APIClient):
         self.key_manager_token = None
         self.auth_session = requests.Session()
         self.key_manager_auth_session = requests.Session()
+        self.json_codec = get_json_codec(self.config.data.get('jsonCodec'))
+        # Set if reuseSessionTokens is enabled, to reuse the tokens of a previous run
+        self.session_token_repository = create_session_token_repository(self.config)
+        # Decrypts the .p12 once, for the sessions below and authenticate_async
+        self.certificate_manager = CertificateManager(self.config.data['p.12'],
+                                                      self.config.data['botCertPassword'],
+                                                      self.config.data['truststorePath'] or None)
 
         # proxy infomation set in config loader, set to empty object if there is no proxy set in config.json
         self.auth_session.proxies.update(self.config.data['podProxyRequestObject'])
@@ -35,31 +47,11 @@ class Auth(APIClient):
             self.auth_session.verify = self.config.data['truststorePath']
             self.key_manager_auth_session.verify = self.config.data['truststorePath']
 
-        self.auth_session.mount(
-            self.config.data['sessionAuthUrl'],
-            Pkcs12Adapter(
-                pkcs12_filename=self.config.data['p.12'],
-                pkcs12_password=self.config.data['botCertPassword']
-            ))
-        self.auth_session.mount(
-            self.config.data['keyAuthUrl'],
-            Pkcs12Adapter(
-                pkcs12_filename=self.config.data['p.12'],
-                pkcs12_password=self.config.data['botCertPassword']
-            ))
-
-        self.key_manager_auth_session.mount(
-            self.config.data['sessionAuthUrl'],
-            Pkcs12Adapter(
-                pkcs12_filename=self.config.data['p.12'],
-                pkcs12_password=self.config.data['botCertPassword']
-            ))
-        self.key_manager_auth_session.mount(
-            self.config.data['keyAuthUrl'],
-            Pkcs12Adapter(
-                pkcs12_filename=self.config.data['p.12'],
-                pkcs12_password=self.config.data['botCertPassword']
-            ))
+        self.certificate_manager.mount(self.auth_session, self.config.get_connection_pool_config('pod'),
+                                       self.config.data['sessionAuthUrl'], self.config.data['keyAuthUrl'])
+        self.certificate_manager.mount(self.key_manager_auth_session,
+                                       self.config.get_connection_pool_config('keyManager'),
+                                       self.config.data['sessionAuthUrl'], self.config.data['keyAuthUrl'])
 
     def get_session_token(self):
         """Return the session token"""
@@ -69,11 +61,24 @@ class Auth(APIClient):
         """Return the key manager token"""
         return self.key_manager_token
 
+    def restore_session_tokens(self):
+        """Reuse the tokens of a previous run on the first authentication, if enabled and cached"""
+        if self.session_token_repository is not None and self.session_token_repository.restore_tokens(self):
+            logging.debug('Auth/authenticate() --> reusing cached tokens')
+            return True
+        return False
+
+    def save_session_tokens(self):
+        if self.session_token_repository is not None:
+            self.session_token_repository.save_tokens(self)
+
     def authenticate(self):
         """
         Get the session and key manager token
         """
         logging.debug('Auth/authenticate()')
+        if self.restore_session_tokens():
+            return
         try:
             if (self.last_auth_time == 0) or \
                     (int(round(time.time() * 1000) - self.last_auth_time >= auth_endpoint_constants['WAIT_TIME'])):
@@ -82,6 +87,7 @@ class Auth(APIClient):
                 self.last_auth_time = int(round(time.time() * 1000))
                 self.session_authenticate()
                 self.key_manager_authenticate()
+                self.save_session_tokens()
 
             else:
                 logging.debug('Retry authentication in 30 seconds.')
@@ -90,6 +96,35 @@ class Auth(APIClient):
         except:
             raise MaxRetryException('max auth retry limit')
 
+    async def authenticate_async(self):
+        """
+        Get the session and key manager token with aiohttp, without blocking the event loop. Both
+        are requested concurrently
+        """
+        logging.debug('Auth/authenticate_async()')
+        if self.restore_session_tokens():
+            return
+        await wait_before_authenticating_async(self)
+        ssl_context = self.get_async_ssl_context()
+        max_retries = auth_endpoint_constants['MAX_AUTH_RETRY']
+        async with aiohttp.ClientSession() as session:
+            self.session_token, self.key_manager_token = await gather_tokens_async(
+                request_token_async(session, self.config.data['sessionAuthUrl'] + '/sessionauth/v1/authenticate',
+                                    self.json_codec, max_retries,
+                                    proxy=self.config.data['podProxyRequestObject'].get('http'), ssl=ssl_context),
+                request_token_async(session, self.config.data['keyAuthUrl'] + '/keyauth/v1/authenticate',
+                                    self.json_codec, max_retries,
+                                    proxy=self.config.data['keyManagerProxyRequestObject'].get('http'),
+                                    ssl=ssl_context))
+        logging.debug('Auth/session and key manager token success')
+        self.auth_retries = 0
+        self.save_session_tokens()
+
+    def get_async_ssl_context(self):
+        """SSL context of authenticate_async, presenting the bot certificate and trusting the
+        truststore if one is configured. The same as the one of the requests sessions"""
+        return self.certificate_manager.ssl_context
+
     # Retrieve session token by calling the session token API
     # Certificates are passed in cert parameter
     def session_authenticate(self):
@@ -114,7 +149,7 @@ class Auth(APIClient):
                 time.sleep(auth_endpoint_constants['TIMEOUT'])
                 self.session_authenticate()
         else:
-            data = json.loads(response.text)
+            data = self.json_codec.loads(response.content)
             logging.debug('Auth/session token success')
             self.session_token = data['token']
             self.auth_retries = 0
@@ -139,7 +174,8 @@ class Auth(APIClient):
                 time.sleep(auth_endpoint_constants['TIMEOUT'])
                 self.key_manager_authenticate()
         else:
-            data = json.loads(response.text)
+            data = self.json_codec.loads(response.content)
             logging.debug('Auth/key manager token success')
             self.key_manager_token = data['token']
             self.auth_retries = 0
+
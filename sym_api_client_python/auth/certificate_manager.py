@@ -0,0 +1,97 @@
+import logging
+import os
+import secrets
+import ssl
+import tempfile
+import threading
+
+import requests
+from cryptography.hazmat.primitives.serialization import BestAvailableEncryption, Encoding, PrivateFormat, pkcs12
+
+from ..connection_pool import PooledHTTPAdapter, mount_connection_pool
+
+log = logging.getLogger(__name__)
+
+
+class CertificateManager:
+    """Loads the bot certificate of a .p12 file once and shares one SSLContext presenting it
+    between the requests sessions, through SSLContextAdapter, and aiohttp, through the ssl
+    argument of its requests.
+
+    The context trusts the truststore if one is configured, otherwise the CA bundle of requests
+    like the sessions did before. Sharing it, rather than building one per session or adapter,
+    means the .p12 is decrypted once and the trust store parsed once.
+    """
+
+    def __init__(self, pkcs12_path, password, truststore_path=None):
+        self.pkcs12_path = pkcs12_path
+        self.password = password
+        self.truststore_path = truststore_path
+        self._ssl_context = None
+        self._lock = threading.Lock()
+
+    @property
+    def ssl_context(self):
+        if self._ssl_context is None:
+            with self._lock:
+                if self._ssl_context is None:
+                    log.debug('CertificateManager --> Loading certificate {}'.format(self.pkcs12_path))
+                    self._ssl_context = create_pkcs12_ssl_context(
+                        self.pkcs12_path, self.password,
+                        cafile=self.truststore_path or requests.certs.where())
+        return self._ssl_context
+
+    def mount(self, session, pool_config, *urls):
+        """Mount one adapter using the shared context on the session, for each of the url prefixes.
+        pool_config is from SymConfig.get_connection_pool_config"""
+        return mount_connection_pool(session, pool_config, *urls, adapter_class=SSLContextAdapter,
+                                     ssl_context=self.ssl_context)
+
+
+class SSLContextAdapter(PooledHTTPAdapter):
+    """HTTPAdapter opening its HTTPS connections with the given SSLContext, directly or through a
+    proxy"""
+
+    def __init__(self, ssl_context=None, **kwargs):
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['ssl_context'] = self.ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        proxy_kwargs['ssl_context'] = self.ssl_context
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if verify:
+            # The context trusts the CA certificates already, urllib3 would load them into it again
+            # for every new connection
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+def create_pkcs12_ssl_context(pkcs12_path, password, cafile=None):
+    """Return a client SSLContext presenting the certificate and key of a .p12 file. The ssl module
+    only loads them from PEM files, so they are written to a temporary file for the time of the
+    loading, the key encrypted with a random password"""
+    with open(pkcs12_path, 'rb') as pkcs12_file:
+        pkcs12_data = pkcs12_file.read()
+    password_bytes = password.encode('utf-8') if isinstance(password, str) else password
+    private_key, certificate, ca_certificates = pkcs12.load_key_and_certificates(pkcs12_data, password_bytes)
+
+    ssl_context = ssl.create_default_context(cafile=cafile)
+    pem_password = secrets.token_bytes(16)
+    pem_file = tempfile.NamedTemporaryFile(delete=False)
+    try:
+        with pem_file:
+            pem_file.write(private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8,
+                                                     BestAvailableEncryption(pem_password)))
+            for cert in [certificate] + list(ca_certificates or []):
+                pem_file.write(cert.public_bytes(Encoding.PEM))
+        ssl_context.load_cert_chain(pem_file.name, password=pem_password)
+    finally:
+        os.remove(pem_file.name)
+    return ssl_context
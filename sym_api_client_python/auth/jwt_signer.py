@@ -0,0 +1,72 @@
+import base64
+import datetime
+import json
+import logging
+import threading
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+log = logging.getLogger(__name__)
+
+# The pod and key manager reject JWTs valid for 5 minutes or more
+JWT_VALIDITY_SEC = 5 * 58
+# A cached JWT is only sent if still valid for that long, covering clock skew and retries
+JWT_REUSE_MARGIN_SEC = 60
+
+_RS512_HEADER = {'alg': 'RS512', 'typ': 'JWT'}
+
+
+def _base64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _encode_json_segment(obj):
+    return _base64url(json.dumps(obj, separators=(',', ':')).encode('utf-8'))
+
+
+class RSAJwtSigner:
+    """Signs RS512 JWTs with an RSA private key, which is read and parsed once.
+
+    create_jwt returns the same JWT until it gets within JWT_REUSE_MARGIN_SEC of its expiration, so
+    that the session and key manager authentications, and their retries, share one signature.
+    """
+
+    def __init__(self, private_key_path, subject):
+        self.private_key_path = private_key_path
+        self.subject = subject
+        self._private_key = None
+        self._cached_jwt = None
+        self._lock = threading.Lock()
+
+    @property
+    def private_key(self):
+        if self._private_key is None:
+            log.debug('RSAJwtSigner --> Loading private key {}'.format(self.private_key_path))
+            with open(self.private_key_path, 'rb') as key_file:
+                self._private_key = serialization.load_pem_private_key(key_file.read(), password=None)
+        return self._private_key
+
+    def sign(self, payload):
+        """Return a JWT of the payload signed with RS512"""
+        signing_input = _encode_json_segment(_RS512_HEADER) + b'.' + _encode_json_segment(payload)
+        signature = self.private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA512())
+        return (signing_input + b'.' + _base64url(signature)).decode('ascii')
+
+    def create_jwt(self):
+        """Return a JWT for the subject valid for JWT_VALIDITY_SEC, or a cached one that is
+        still valid for at least JWT_REUSE_MARGIN_SEC"""
+        now = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        with self._lock:
+            if self._cached_jwt is not None and self._cached_jwt[1] - now >= JWT_REUSE_MARGIN_SEC:
+                return self._cached_jwt[0]
+            expiration_date = now + JWT_VALIDITY_SEC
+            encoded = self.sign({'sub': self.subject, 'exp': expiration_date})
+            self._cached_jwt = (encoded, expiration_date)
+            return encoded
+
+    def clear(self):
+        """Forget the key and the cached JWT, for instance after the key file was rotated"""
+        with self._lock:
+            self._private_key = None
+            self._cached_jwt = None
@@ -1,12 +1,18 @@
-import json
 import requests
-import datetime
+import ssl
 import time
 import logging
+
+import aiohttp
+
+from .async_token_request import request_token_async, wait_before_authenticating_async, gather_tokens_async
 from .auth_endpoint_constants import auth_endpoint_constants
-from jose import jwt
+from .jwt_signer import RSAJwtSigner
 from ..clients.api_client import APIClient
 from ..exceptions.MaxRetryException import MaxRetryException
+from ..services.session_token_repository import create_session_token_repository
+from ..connection_pool import mount_connection_pool
+from ..json_codec import get_json_codec, encode_json_body
 
 class SymBotRSAAuth(APIClient):
     """Class for RSA authentication"""
@@ -23,7 +29,14 @@ class SymBotRSAAuth(APIClient):
         self.key_manager_token = None
         self.auth_session = requests.Session()
         self.key_manager_auth_session = requests.Session()
-
+        self.json_codec = get_json_codec(self.config.data.get('jsonCodec'))
+        # Set if reuseSessionTokens is enabled, to reuse the tokens of a previous run
+        self.session_token_repository = create_session_token_repository(self.config)
+        self.async_ssl_context = None
+        self.jwt_signer = RSAJwtSigner(self.config.data.get('botRSAPath'), self.config.data.get('botUsername'))
+
+        mount_connection_pool(self.auth_session, self.config.get_connection_pool_config('pod'))
+        mount_connection_pool(self.key_manager_auth_session, self.config.get_connection_pool_config('keyManager'))
         self.auth_session.proxies.update(self.config.data['podProxyRequestObject'])
         self.key_manager_auth_session.proxies.update(self.config.data['keyManagerProxyRequestObject'])
 
@@ -40,11 +53,24 @@ class SymBotRSAAuth(APIClient):
         """Return the key manager token"""
         return self.key_manager_token
 
+    def restore_session_tokens(self):
+        """Reuse the tokens of a previous run on the first authentication, if enabled and cached"""
+        if self.session_token_repository is not None and self.session_token_repository.restore_tokens(self):
+            logging.debug('RSA Auth/authenticate() --> reusing cached tokens')
+            return True
+        return False
+
+    def save_session_tokens(self):
+        if self.session_token_repository is not None:
+            self.session_token_repository.save_tokens(self)
+
     def authenticate(self):
         """
         Get the session and key manager token
         """
         logging.debug('RSA Auth/authenticate()')
+        if self.restore_session_tokens():
+            return
         try:
             if (self.last_auth_time == 0) or \
                     (int(round(time.time() * 1000) - self.last_auth_time >= auth_endpoint_constants['WAIT_TIME'])):
@@ -53,6 +79,7 @@ class SymBotRSAAuth(APIClient):
                 self.last_auth_time = int(round(time.time() * 1000))
                 self.session_authenticate()
                 self.key_manager_authenticate()
+                self.save_session_tokens()
 
             else:
                 logging.debug('Retry authentication in 30 seconds.')
@@ -62,25 +89,49 @@ class SymBotRSAAuth(APIClient):
             logging.exception(e)
             raise MaxRetryException
 
+    async def authenticate_async(self):
+        """
+        Get the session and key manager token with aiohttp, without blocking the event loop. Both
+        are requested concurrently
+        """
+        logging.debug('RSA Auth/authenticate_async()')
+        if self.restore_session_tokens():
+            return
+        await wait_before_authenticating_async(self)
+        ssl_context = self.get_async_ssl_context()
+        max_retries = auth_endpoint_constants['MAX_RSA_RETRY']
+        async with aiohttp.ClientSession() as session:
+            self.session_token, self.key_manager_token = await gather_tokens_async(
+                request_token_async(session, self.config.data['sessionAuthUrl'] + '/login/pubkey/authenticate',
+                                    self.json_codec, max_retries, create_body=self.create_jwt_body,
+                                    proxy=self.config.data['podProxyRequestObject'].get('http'), ssl=ssl_context),
+                request_token_async(session, self.config.data['keyAuthUrl'] + '/relay/pubkey/authenticate',
+                                    self.json_codec, max_retries, create_body=self.create_jwt_body,
+                                    proxy=self.config.data['keyManagerProxyRequestObject'].get('http'),
+                                    ssl=ssl_context))
+        logging.debug('RSA/session and key manager token success')
+        self.auth_retries = 0
+        self.save_session_tokens()
+
+    def get_async_ssl_context(self):
+        """SSL context of authenticate_async, trusting the truststore if one is configured"""
+        if self.async_ssl_context is None:
+            self.async_ssl_context = ssl.create_default_context(cafile=self.config.data['truststorePath'] or None)
+        return self.async_ssl_context
+
+    def create_jwt_body(self):
+        return {'token': self.create_jwt()}
+
     def create_jwt(self):
         """
         Create a jwt token with payload dictionary. Encode with
-        RSA private key using RS512 algorithm
+        RSA private key using RS512 algorithm. The key is loaded once and
+        the token reused while valid for more than a minute, see RSAJwtSigner
 
         :return: A jwt token valid for < 290 seconds
         """
         logging.debug('RSA_auth/getJWT() function started')
-        with open(self.config.data['botRSAPath'], 'r') as f:
-            content = f.readlines()
-            private_key = ''.join(content)
-            expiration_date = int(datetime.datetime.now(datetime.timezone.utc)
-                                  .timestamp() + (5*58))
-            payload = {
-                'sub': self.config.data['botUsername'],
-                'exp': expiration_date
-            }
-            encoded = jwt.encode(payload, private_key, algorithm='RS512')
-            return encoded
+        return self.jwt_signer.create_jwt()
 
     def session_authenticate(self):
         """
@@ -91,7 +142,7 @@ class SymBotRSAAuth(APIClient):
             'token': self.create_jwt()
         }
         url = self.config.data['sessionAuthUrl']+'/login/pubkey/authenticate'
-        response = self.auth_session.post(url, json=data)
+        response = self.auth_session.post(url, **encode_json_body(self.json_codec, {'json': data}))
 
         if response.status_code != 200:
             self.auth_retries += 1
@@ -105,7 +156,7 @@ class SymBotRSAAuth(APIClient):
                 time.sleep(auth_endpoint_constants['TIMEOUT'])
                 self.session_authenticate()
         else:
-            data = json.loads(response.text)
+            data = self.json_codec.loads(response.content)
             logging.debug('RSA/session token success')
             self.session_token = data['token']
             self.auth_retries = 0
@@ -120,7 +171,7 @@ class SymBotRSAAuth(APIClient):
             'token': self.create_jwt()
         }
         url = self.config.data['keyAuthUrl']+'/relay/pubkey/authenticate'
-        response = self.key_manager_auth_session.post(url, json=data)
+        response = self.key_manager_auth_session.post(url, **encode_json_body(self.json_codec, {'json': data}))
 
         if response.status_code != 200:
             self.auth_retries += 1
@@ -134,7 +185,7 @@ class SymBotRSAAuth(APIClient):
                 time.sleep(auth_endpoint_constants['TIMEOUT'])
                 self.key_manager_authenticate()
         else:
-            data = json.loads(response.text)
+            data = self.json_codec.loads(response.content)
             logging.debug('RSA/key manager token success')
             self.key_manager_token = data['token']
             self.auth_retries = 0
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Default of the authTokenRefreshPeriod config key, in minutes
+DEFAULT_REFRESH_PERIOD_MIN = 30
+
+
+class TokenManager:
+    """Refreshes the tokens of an authenticator once for all the threads and tasks needing it.
+
+    Each refresh increments generation. A caller reads the generation before sending a request
+    and passes it to refresh or refresh_async if the request gets a 401: if the tokens were
+    refreshed in the meantime, by another thread or task, the request is simply retried with the
+    new tokens. Concurrent refreshes wait for the one in progress instead of authenticating again.
+
+    If refresh_period_sec is set, refresh_in_background_if_due refreshes the tokens in the
+    background once they are that old, so that requests rarely get a 401 at all.
+
+    on_refresh is called after each refresh, for instance to update the session headers.
+    """
+
+    def __init__(self, auth, on_refresh=None, refresh_period_sec=None):
+        self.auth = auth
+        self.on_refresh = on_refresh
+        self.refresh_period_sec = refresh_period_sec
+        self.generation = 0
+        self.refresh_count = 0
+        self.coalesced_count = 0
+        self.last_refresh = time.monotonic()
+        # Held during a refresh, by a thread or by the refresh task of an event loop
+        self._lock = threading.Lock()
+        self._refresh_task = None
+        self._background_refresh = False
+
+    @staticmethod
+    def get_refresh_period_sec(config):
+        """The authTokenRefreshPeriod from the config in seconds, or None if disabled"""
+        refresh_period_min = config.data.get('authTokenRefreshPeriod', DEFAULT_REFRESH_PERIOD_MIN)
+        if not refresh_period_min:
+            return None
+        return float(refresh_period_min) * 60
+
+    def refresh(self, generation=None):
+        """Authenticate again, unless the tokens were refreshed since generation. Blocks while a
+        refresh is in progress. Without generation the tokens are always refreshed"""
+        with self._lock:
+            if self._is_refreshed_since(generation):
+                return
+            log.debug('TokenManager/refresh() --> Refreshing tokens')
+            self.auth.authenticate()
+            self._refreshed()
+
+    async def refresh_async(self, generation=None):
+        """Same as refresh without blocking the event loop. Concurrent tasks share one refresh"""
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            if self._is_refreshed_since(generation):
+                return
+            task = self._refresh_task = asyncio.ensure_future(self._refresh_async(generation))
+        else:
+            self.coalesced_count += 1
+        # Shielded so that a cancelled caller does not cancel the refresh of the others
+        await asyncio.shield(task)
+
+    async def _refresh_async(self, generation):
+        loop = asyncio.get_running_loop()
+        if not self._lock.acquire(blocking=False):
+            # A thread is refreshing, wait for it without blocking the event loop
+            acquire = loop.run_in_executor(None, self._lock.acquire)
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                acquire.add_done_callback(lambda _: self._lock.release())
+                raise
+        try:
+            if self._is_refreshed_since(generation):
+                return
+            log.debug('TokenManager/refresh_async() --> Refreshing tokens')
+            if asyncio.iscoroutinefunction(getattr(self.auth, 'authenticate_async', None)):
+                await self.auth.authenticate_async()
+            else:
+                # authenticate uses requests and sleeps between retries
+                await loop.run_in_executor(None, self.auth.authenticate)
+            self._refreshed()
+        finally:
+            self._lock.release()
+
+    def _is_refreshed_since(self, generation):
+        if generation is not None and generation != self.generation:
+            self.coalesced_count += 1
+            return True
+        return False
+
+    def _refreshed(self):
+        self.refresh_count += 1
+        self.last_refresh = time.monotonic()
+        if self.on_refresh is not None:
+            self.on_refresh()
+        # Incremented last, a request sent with the new generation uses the new tokens
+        self.generation += 1
+
+    def is_refresh_due(self):
+        return self.refresh_period_sec is not None and \
+            time.monotonic() - self.last_refresh >= self.refresh_period_sec
+
+    def refresh_in_background_if_due(self):
+        """Start refreshing the tokens if they are older than refresh_period_sec, without waiting
+        for the refresh. It runs as a task when called from an event loop, on a thread otherwise"""
+        if self._background_refresh or not self.is_refresh_due():
+            return
+        self._background_refresh = True
+        generation = self.generation
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=self._refresh_in_background, args=(generation,),
+                             name='TokenRefresh', daemon=True).start()
+        else:
+            asyncio.ensure_future(self._refresh_in_background_async(generation))
+
+    def _refresh_in_background(self, generation):
+        try:
+            self.refresh(generation)
+        except Exception:
+            self._background_refresh_failed()
+        finally:
+            self._background_refresh = False
+
+    async def _refresh_in_background_async(self, generation):
+        try:
+            await self.refresh_async(generation)
+        except Exception:
+            self._background_refresh_failed()
+        finally:
+            self._background_refresh = False
+
+    def _background_refresh_failed(self):
+        # Tried again after another period, until then a 401 triggers a refresh as usual
+        log.exception('TokenManager --> Background token refresh failed')
+        self.last_refresh = time.monotonic()
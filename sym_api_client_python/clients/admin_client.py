@@ -1,6 +1,7 @@
 import logging
 
 from .api_client import APIClient
+from ..response_cache import POD_FEATURES
 
 
 # child class of APIClient --> Extends error handling functionality
@@ -125,7 +126,9 @@ class AdminClient(APIClient):
         """
         logging.debug('AdminClient/admin_update_user()')
         url = '/pod/v2/admin/user/{0}/update'.format(user_id)
-        return self.bot_client.execute_rest_call("POST", url, json=updated_user_attributes)
+        user = self.bot_client.execute_rest_call("POST", url, json=updated_user_attributes)
+        self.bot_client.response_cache.invalidate_user(user_id)
+        return user
 
     def admin_get_user_avatar(self, user_id):
         """
@@ -172,7 +175,9 @@ class AdminClient(APIClient):
         logging.debug('AdminClient/admin_update_user_status()')
         url = '/pod/v1/admin/user/{0}/status/update'.format(user_id)
         data  = {'status': status}
-        return self.bot_client.execute_rest_call("POST", url, json=data)
+        result = self.bot_client.execute_rest_call("POST", url, json=data)
+        self.bot_client.response_cache.invalidate_user(user_id)
+        return result
 
     def admin_list_pod_features(self):
         """
@@ -209,7 +214,7 @@ Calling this endpoint requires the User Provisioning role with ACCESS_USER_PROVI
 """
         logging.debug('AdminClient/admin_list_pod_features()')
         url = '/pod/v1/admin/system/features/list'
-        return self.bot_client.execute_rest_call("GET", url)
+        return self.bot_client.execute_cached_rest_call(POD_FEATURES, "GET", url)
 
     def admin_get_user_features(self, user_id):
         """
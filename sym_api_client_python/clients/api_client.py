@@ -8,7 +8,9 @@ from ..exceptions.APIClientErrorException import APIClientErrorException
 from ..exceptions.DatafeedExpiredException import DatafeedExpiredException
 from ..exceptions.ForbiddenException import ForbiddenException
 from ..exceptions.ServerErrorException import ServerErrorException
+from ..exceptions.TooManyRequestsException import TooManyRequestsException
 from ..exceptions.UnauthorizedException import UnauthorizedException
+from ..retry_policy import parse_retry_after
 
 
 # error handling class --> take status code and raise appropriate exceptions
@@ -105,6 +107,11 @@ class APIClient:
             raise ForbiddenException(
                 'Method Not Allowed: The method received in the request-line is known by the origin server but not supported by the target resource: {}'
                     .format(status))
+        elif status == 429:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            raise TooManyRequestsException(
+                'Too Many Requests: {} {}, retry after: {}s'
+                    .format(status, err_message, retry_after), retry_after)
 
         # Response dict is a bit of an information overload, could consider trimming it
         elif 400 <= status < 500:
@@ -97,11 +97,46 @@ class DataFeedClient(APIClient):
         """
         return self.datafeed_client.get_ack_id()
 
+    def reset_ack_id(self):
+        """
+        Forget the ack id of the previous read. To be used when the datafeed is recreated.
+
+        This feature is not supported in datafeed v1.
+        """
+        self.datafeed_client.reset_ack_id()
+
 
-    async def read_datafeed_async(self, datafeed_id):
+    async def create_datafeed_async(self):
+        """
+        Asynchronous version of create_datafeed, should be called with the await keyword
+
+        See create_datafeed for more info
+        """
+        return await self.datafeed_client.create_datafeed_async()
+
+    async def read_datafeed_async(self, datafeed_id, *ackId):
         """
         This works the same as the previous datafeed apart from it's asynchronous and therefore should be called with the await keyword
 
+        For a V2 datafeed, if no ackId is given the one returned by the previous read is used.
+        Concurrent reads on the same client are serialised so an ackId is never sent twice.
+
         See read_datafeed for more info
         """
-        return await self.datafeed_client.read_datafeed_async(datafeed_id)
+        return await self.datafeed_client.read_datafeed_async(datafeed_id, *ackId)
+
+    async def list_datafeed_id_async(self):
+        """
+        Asynchronous version of list_datafeed_id
+
+        This feature is not supported in datafeed v1.
+        """
+        return await self.datafeed_client.list_datafeed_id_async()
+
+    async def delete_datafeed_async(self, datafeed_id):
+        """
+        Asynchronous version of delete_datafeed
+
+        This feature is not supported in datafeed v1.
+        """
+        await self.datafeed_client.delete_datafeed_async(datafeed_id)
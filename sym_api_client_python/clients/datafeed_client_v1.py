@@ -34,8 +34,20 @@ class DataFeedClientV1(APIClient):
         logging.debug('DataFeedClientV1/get_ack_id()')
         raise TypeError("This function is not supported for the DF V1 client.")
 
+    def reset_ack_id(self):
+        logging.debug('DataFeedClientV1/reset_ack_id()')
+        raise TypeError("This function is not supported for the DF V1 client.")
+
+
+    async def create_datafeed_async(self):
 
-    async def read_datafeed_async(self, datafeed_id):
+        url = '/agent/v4/datafeed/create'
+        response = await self.bot_client.execute_rest_call_async("POST", url)
+        datafeed_id = response.get('id')
+        logging.debug('DataFeedClientV1/create_datafeed_async() --> {}'.format(datafeed_id))
+        return datafeed_id
+
+    async def read_datafeed_async(self, datafeed_id, *ackId):
 
         logging.debug('DataFeedClientV1/read_datafeed_async()')
         url = '/agent/v4/datafeed/{0}/read'.format(datafeed_id)
@@ -43,3 +55,11 @@ class DataFeedClientV1(APIClient):
 
         return datafeed_read
 
+    async def list_datafeed_id_async(self):
+        logging.debug('DataFeedClientV1/list_datafeed_id_async()')
+        raise TypeError("This function is not supported for the DF V1 client.")
+
+    async def delete_datafeed_async(self, datafeed_id):
+        logging.debug('DataFeedClientV1/delete_datafeed_async()')
+        raise TypeError("This function is not supported for the DF V1 client.")
+
@@ -1,11 +1,18 @@
 from .api_client import APIClient
+import asyncio
 import logging
+import threading
 import json
 
 class DataFeedClientV2(APIClient):
     def __init__(self, bot_client):
         self.bot_client = bot_client
         self.ackid = ""
+        # Guards ackid so concurrent readers/handlers never observe a half-updated value
+        self._ack_lock = threading.Lock()
+        # A v2 datafeed must be read by one consumer at a time, the ackId of one read being
+        # the input of the next one. The asyncio lock is created lazily inside the event loop
+        self._async_read_lock = None
 
     def create_datafeed(self):
         url = '/agent/v5/datafeeds'
@@ -29,9 +36,7 @@ class DataFeedClientV2(APIClient):
             data["ackId"] = ackId[0]
 
         datafeed_read = self.bot_client.execute_rest_call("POST", url,  json=data)
-        self.ackid = datafeed_read.get("ackId")
-        events = datafeed_read.get("events")
-        return events
+        return self._update_ack_id_and_get_events(datafeed_read)
 
     def list_datafeed_id(self):
         logging.debug('DataFeedClientV2/list_datafeed()')
@@ -45,4 +50,53 @@ class DataFeedClientV2(APIClient):
         self.bot_client.execute_rest_call("DELETE", url)
 
     def get_ack_id(self):
-        return self.ackid
\ No newline at end of file
+        with self._ack_lock:
+            return self.ackid
+
+    def reset_ack_id(self):
+        """Forget the ack id of the previous read, to be used when the datafeed is recreated"""
+        with self._ack_lock:
+            self.ackid = ""
+
+    async def create_datafeed_async(self):
+        url = '/agent/v5/datafeeds'
+        response = await self.bot_client.execute_rest_call_async("POST", url)
+
+        datafeed_id = response.get("id")
+        logging.debug('DataFeedClientV2/create_datafeed_async() --> {}'.format(datafeed_id))
+        return datafeed_id
+
+    async def read_datafeed_async(self, datafeed_id, *ackId):
+        """
+        Asynchronous version of read_datafeed. Reads of the same client are serialised so that
+        each read acknowledges the events returned by the previous one. If no ack id is given the
+        one stored from the previous read is used.
+        """
+        logging.debug('DataFeedClientV2/read_datafeed_async()')
+        url = '/agent/v5/datafeeds/{0}/read'.format(datafeed_id)
+
+        if self._async_read_lock is None:
+            self._async_read_lock = asyncio.Lock()
+
+        async with self._async_read_lock:
+            data = {"ackId": ackId[0] if len(ackId) > 0 else self.get_ack_id()}
+            datafeed_read = await self.bot_client.execute_rest_call_async("POST", url, json=data)
+            return self._update_ack_id_and_get_events(datafeed_read)
+
+    async def list_datafeed_id_async(self):
+        logging.debug('DataFeedClientV2/list_datafeed_id_async()')
+        url = '/agent/v5/datafeeds'
+        return await self.bot_client.execute_rest_call_async("GET", url)
+
+    async def delete_datafeed_async(self, datafeed_id):
+        logging.debug('DataFeedClientV2/delete_datafeed_async()')
+        url = '/agent/v5/datafeeds/{0}'.format(datafeed_id)
+        await self.bot_client.execute_rest_call_async("DELETE", url)
+
+    def _update_ack_id_and_get_events(self, datafeed_read):
+        # A 204 is returned as an empty list, in that case there is nothing to acknowledge
+        if not isinstance(datafeed_read, dict):
+            return []
+        with self._ack_lock:
+            self.ackid = datafeed_read.get("ackId", self.ackid)
+        return datafeed_read.get("events")
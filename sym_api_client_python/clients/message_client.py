@@ -4,6 +4,7 @@ from contextlib import contextmanager
 from typing import Union
 
 from .api_client import APIClient
+from ..response_cache import ATTACHMENT_TYPES
 
 # child class of APIClient --> Extends error handling functionality
 # MessageClient class contains a series of functions corresponding to all
@@ -142,7 +143,7 @@ class MessageClient(APIClient):
     def get_supported_attachment_types(self):
         logging.debug('MessageClient/getAttachmentTypes()')
         url = '/pod/v1/files/allowedTypes'
-        return self.bot_client.execute_rest_call("GET", url)
+        return self.bot_client.execute_cached_rest_call(ATTACHMENT_TYPES, "GET", url)
 
     def get_msg_ids_by_timestamp(self, msg_id, **kwargs):
         logging.debug('MessageClient/get_msg_ids_by_timestamp()')
@@ -1,6 +1,7 @@
 import logging
 
 from .api_client import APIClient
+from ..response_cache import ROOM, STREAM
 
 
 # child class of APIClient --> Extends error handling functionality
@@ -72,7 +73,9 @@ class StreamClient(APIClient):
         """
         logging.debug('StreamClient/update_room()')
         url = '/pod/v3/room/{0}/update'.format(stream_id)
-        return self.bot_client.execute_rest_call('POST', url, json=kwargs)
+        room_info = self.bot_client.execute_rest_call('POST', url, json=kwargs)
+        self.bot_client.response_cache.invalidate_stream(stream_id)
+        return room_info
 
     def get_room_info(self, stream_id):
         """
@@ -80,7 +83,12 @@ class StreamClient(APIClient):
         """
         logging.debug('StreamClient/get_room_info()')
         url = '/pod/v3/room/{0}/info'.format(stream_id)
-        return self.bot_client.execute_rest_call('GET', url)
+        return self.bot_client.execute_cached_rest_call(ROOM, 'GET', url)
+
+    async def get_room_info_async(self, stream_id):
+        logging.debug('StreamClient/get_room_info_async()')
+        url = '/pod/v3/room/{0}/info'.format(stream_id)
+        return await self.bot_client.execute_cached_rest_call_async(ROOM, 'GET', url)
 
     def activate_room(self, stream_id):
         """
@@ -91,7 +99,9 @@ class StreamClient(APIClient):
         params = {
             'active': True
         }
-        return self.bot_client.execute_rest_call('POST', url, params=params)
+        room_info = self.bot_client.execute_rest_call('POST', url, params=params)
+        self.bot_client.response_cache.invalidate_stream(stream_id)
+        return room_info
 
     def deactivate_room(self, stream_id):
         """
@@ -102,7 +112,9 @@ class StreamClient(APIClient):
         params = {
             'active': False
         }
-        return self.bot_client.execute_rest_call('POST', url, params=params)
+        room_info = self.bot_client.execute_rest_call('POST', url, params=params)
+        self.bot_client.response_cache.invalidate_stream(stream_id)
+        return room_info
 
     def get_room_members(self, stream_id):
         """
@@ -252,7 +264,12 @@ class StreamClient(APIClient):
         """
         logging.debug('StreamClient/stream_info_v2()')
         url = '/pod/v2/streams/{0}/info'.format(stream_id)
-        return self.bot_client.execute_rest_call('GET', url)
+        return self.bot_client.execute_cached_rest_call(STREAM, 'GET', url)
+
+    async def stream_info_v2_async(self, stream_id):
+        logging.debug('StreamClient/stream_info_v2_async()')
+        url = '/pod/v2/streams/{0}/info'.format(stream_id)
+        return await self.bot_client.execute_cached_rest_call_async(STREAM, 'GET', url)
 
 
     def list_streams_enterprise(self, skip=0, limit=50, **kwargs):
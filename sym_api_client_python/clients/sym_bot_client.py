@@ -1,6 +1,6 @@
-import json
+import asyncio
 import logging
-from json.decoder import JSONDecodeError
+import time
 
 import aiohttp
 import requests
@@ -16,7 +16,13 @@ from .signals_client import SignalsClient
 from .stream_client import StreamClient
 from .user_client import UserClient
 from ..datafeed_event_service import AsyncDataFeedEventService, DataFeedEventService
-from ..exceptions.UnauthorizedException import UnauthorizedException
+from ..auth.token_manager import TokenManager
+from ..connection_pool import mount_connection_pool, get_session_pool_stats, create_tcp_connector
+from ..json_codec import get_json_codec, encode_json_body
+from ..request_policy import (DATAFEED_READ_PATH, RequestCoalescer, RequestHedger, classify_request,
+                              get_coalescing_key, to_aiohttp_timeout)
+from ..response_cache import ResponseCache
+from ..retry_policy import RateLimiter, RetryPolicy, get_endpoint_family, parse_retry_after
 
 # SymBotClient class is the Client class that has access to all of the other
 # client classes upon initialization, SymBotClient class gets an instance of
@@ -50,10 +56,28 @@ class SymBotClient(APIClient):
         self.async_pod_session = None
         self.agent_session = None
         self.async_agent_session = None
+        self.datafeed_session = None
+        self.async_datafeed_session = None
+        self.async_datafeed_connector = None
+        # Shared by the aiohttp sessions and kept when reauthenticating
+        self.async_connector = None
         self.bot_user_info = None
         self.health_check_client = None
         self.async_ssl_context = None
-
+        # Encodes request bodies and decodes responses, see json_codec
+        self.json_codec = get_json_codec(config.data.get('jsonCodec'))
+        # Refreshes the tokens once for all the requests getting a 401, and proactively
+        self.token_manager = TokenManager(auth, self._update_session_tokens,
+                                          TokenManager.get_refresh_period_sec(config))
+        # Sends a second attempt of slow idempotent GETs if hedgeDelay is set, see request_policy
+        self.request_hedger = RequestHedger(config.get_hedge_delay())
+        # Shares one call between identical concurrent GETs, see request_policy
+        self.request_coalescer = RequestCoalescer(config.is_request_coalescing_enabled())
+        # Responses of the pod lookups which rarely change, see response_cache
+        self.response_cache = ResponseCache(**config.get_response_cache_config())
+        # Rate limits calls per endpoint family and retries 429s, 5xx and connection errors
+        self.rate_limiter = RateLimiter(config.get_rate_limits())
+        self.retry_policy = RetryPolicy(**config.get_retry_config())
 
     def get_datafeed_event_service(self, *args, **kwargs):
         if self.datafeed_event_service is None:
@@ -117,6 +141,7 @@ class SymBotClient(APIClient):
         if self.pod_session is None:
             logging.debug('bot_client/get_pod_session() - creating pod session')
             self.pod_session = requests.Session()
+            mount_connection_pool(self.pod_session, self.config.get_connection_pool_config('pod'))
             self.pod_session.headers.update({
                 'sessionToken': self.auth.get_session_token(),
                 'cache-control': 'no-cache'}
@@ -132,25 +157,72 @@ class SymBotClient(APIClient):
         """This is the method to retrieve the session object for synchronous calls with requests"""
         if self.agent_session is None:
             logging.debug('bot_client/get_agent_session() - creating agent session')
-            self.agent_session = requests.Session()
-            self.agent_session.headers.update({
-                'sessionToken': self.auth.get_session_token(),
-                'keyManagerToken': self.auth.get_key_manager_token(),
-                'cache-control': 'no-cache'}
-            )
-            self.agent_session.proxies.update(self.config.data['agentProxyRequestObject'])
-            if self.config.data[_TRUSTSTORE_PATH]:
-                logging.debug("Setting truststorePath for agent to {}".format(
-                    self.config.data[_TRUSTSTORE_PATH])
-                )
-                self.agent_session.verify=self.config.data[_TRUSTSTORE_PATH]
-
+            self.agent_session = self._create_agent_session(self.config.get_connection_pool_config('agent'))
         return self.agent_session
 
+    def get_datafeed_session(self):
+        """Session of the datafeed reads, with its own connection pool so that the long-polls do not
+        hold the connections of the other agent calls, see SymConfig.get_datafeed_connection_config"""
+        if self.datafeed_session is None:
+            logging.debug('bot_client/get_datafeed_session() - creating datafeed session')
+            self.datafeed_session = self._create_agent_session(self.config.get_datafeed_connection_config())
+        return self.datafeed_session
+
+    def _create_agent_session(self, pool_config):
+        session = requests.Session()
+        mount_connection_pool(session, pool_config)
+        session.headers.update({
+            'sessionToken': self.auth.get_session_token(),
+            'keyManagerToken': self.auth.get_key_manager_token(),
+            'cache-control': 'no-cache'}
+        )
+        session.proxies.update(self.config.data['agentProxyRequestObject'])
+        if self.config.data[_TRUSTSTORE_PATH]:
+            logging.debug("Setting truststorePath for agent to {}".format(
+                self.config.data[_TRUSTSTORE_PATH])
+            )
+            session.verify = self.config.data[_TRUSTSTORE_PATH]
+        return session
+
+    def get_connection_pool_stats(self):
+        """Utilization of the connection pools of the requests sessions to the pod, the agent and
+        the key manager, see PooledHTTPAdapter.get_pool_stats"""
+        sessions = {
+            'pod': self.pod_session,
+            'agent': self.agent_session,
+            'datafeed': self.datafeed_session,
+            'keyManager': getattr(self.auth, 'key_manager_auth_session', None),
+        }
+        return {name: get_session_pool_stats(session) if session is not None else []
+                for name, session in sessions.items()}
+
+    def get_request_stats(self):
+        """Counters of the calls saved, hedged, retried or throttled, see request_policy and
+        retry_policy"""
+        return {
+            'coalesced': self.request_coalescer.coalesced,
+            'cache_hits': self.response_cache.hits,
+            'cache_misses': self.response_cache.misses,
+            'cache_evictions': self.response_cache.evictions,
+            'hedged': self.request_hedger.hedged,
+            'hedge_wins': self.request_hedger.hedge_wins,
+            'retries': self.retry_policy.retries,
+            'throttled': self.rate_limiter.throttled,
+        }
+
     def execute_rest_call(self, method, path, **kwargs):
+        """Send a REST call and return its decoded response. Identical concurrent GETs share one
+        call and its result, see request_policy.RequestCoalescer"""
+        return self.request_coalescer.call(get_coalescing_key(method, path, kwargs),
+                                           self._execute_rest_call, method, path, **kwargs)
+
+    def _execute_rest_call(self, method, path, **kwargs):
         results = None
         session = None
-        if path.startswith("/agent/"):
+        if DATAFEED_READ_PATH.match(path):
+            url = self.config.data["agentUrl"] + path
+            session = self.get_datafeed_session()
+        elif path.startswith("/agent/"):
             url = self.config.data["agentUrl"] + path
             session = self.get_agent_session()
         elif path.startswith("/pod/"):
@@ -159,178 +231,332 @@ class SymBotClient(APIClient):
         else:
             url = path
             session = self.get_agent_session()
+        request_class = classify_request(method, path, kwargs)
+        family = get_endpoint_family(path, request_class)
+        kwargs.setdefault('timeout', self.config.get_request_timeout(request_class))
+
+        self.token_manager.refresh_in_background_if_due()
+        token_generation = self.token_manager.generation
+        attempt = 0
+        while True:
+            delay = self.rate_limiter.reserve(family)
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                response = session.request(method, url, **encode_json_body(self.json_codec, kwargs))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                delay = self.retry_policy.get_retry_delay(method, request_class, attempt)
+                if delay is None:
+                    logging.debug(err)
+                    logging.debug(type(err))
+                    logging.debug('ensure pod/agent subdomains are correct')
+                    raise
+                logging.debug('bot_client/execute_rest_call() - {}, retrying in {:.3f}s'.format(err, delay))
+            else:
+                delay = self._get_retry_delay(method, request_class, family, attempt, response.status_code, response)
+                if delay is None:
+                    break
+            time.sleep(delay)
+            attempt += 1
 
-        try:
-            response = session.request(method, url, **kwargs)
-        except requests.exceptions.ConnectionError as err:
-            logging.debug(err)
-            logging.debug(type(err))
-            logging.debug('ensure pod/agent subdomains are correct')
-            raise
         if response.status_code == 204:
             results = []
+        elif response.status_code == 401:
+            logging.debug('bot_client/execute_rest_call() - 401, refreshing tokens and retrying')
+            self.token_manager.refresh(token_generation)
+            results = self._execute_rest_call(method, path, **kwargs)
         elif response.status_code == 200 or response.status_code == 201:
             try:
-                results = json.loads(response.text)
-            except JSONDecodeError:
+                results = self.json_codec.loads(response.content)
+            except ValueError:
                 results = response.text
         else:
             # Try to get the json to be used to handle the error message
             error_json = None
             text = None
             try:
-                error_json = response.json()
-            except JSONDecodeError:
+                error_json = self.json_codec.loads(response.content)
+            except ValueError:
                 try:
                     text = response.text
                 except Exception:
                     text = None
-            try:
-                super().handle_error(response, self, error_json, text)
-            except UnauthorizedException:
-                logging.debug('caught UnauthorizedException - try execute_rest_call() again')
-                self.execute_rest_call(method, path, **kwargs)
+            super().handle_error(response, self, error_json, text)
         return results
 
 
+    def get_async_connector(self):
+        """The TCPConnector shared by the aiohttp sessions, configured by the config, see
+        SymConfig.get_async_connector_config. It presents the truststore"""
+        if self.async_connector is None or self.async_connector.closed:
+            self.async_connector = create_tcp_connector(self.config.get_async_connector_config(),
+                                                        self.get_async_ssl_context())
+        return self.async_connector
+
     def get_async_pod_session(self):
-        """This is the method to retrieve the session object for asynchronous calls with aiohttp"""
+        """This is the method to retrieve the session object for asynchronous calls with aiohttp.
+        Tokens are not set on the session, but on each request by execute_rest_call_async"""
         if self.async_pod_session is None:
             logging.debug('bot_client/get_pod_session() - creating async pod session')
             self.async_pod_session = aiohttp.ClientSession(
-            headers = {
-                'sessionToken': self.auth.get_session_token(),
-                'cache-control': 'no-cache'}
-                )
-            # For aiohttp proxies and truststore are handled when the request is made
+                connector=self.get_async_connector(), connector_owner=False,
+                headers={'cache-control': 'no-cache'})
+            # For aiohttp proxies are handled when the request is made
         return self.async_pod_session
 
     def get_async_agent_session(self):
-        """This is the method to retrieve the session object for asynchronous calls with aiohttp"""
+        """This is the method to retrieve the session object for asynchronous calls with aiohttp.
+        Tokens are not set on the session, but on each request by execute_rest_call_async"""
         if self.async_agent_session is None:
             logging.debug('bot_client/get_agent_session() - creating async agent session')
             self.async_agent_session = aiohttp.ClientSession(
-            headers = {
-                'sessionToken': self.auth.get_session_token(),
-                'keyManagerToken': self.auth.get_key_manager_token(),
-                'cache-control': 'no-cache'}
-            )
-            # For aiohttp proxies and truststore are handled when the request is made
+                connector=self.get_async_connector(), connector_owner=False,
+                headers={'cache-control': 'no-cache'})
+            # For aiohttp proxies are handled when the request is made
         return self.async_agent_session
 
+    def get_async_datafeed_session(self):
+        """Session of the asynchronous datafeed reads, with its own connector and a read timeout
+        longer than the long-poll, see SymConfig.get_datafeed_connection_config"""
+        if self.async_datafeed_session is None:
+            logging.debug('bot_client/get_async_datafeed_session() - creating async datafeed session')
+            datafeed_config = self.config.get_datafeed_connection_config()
+            connector_config = dict(self.config.get_async_connector_config(),
+                                    limit=datafeed_config['pool_maxsize'],
+                                    limit_per_host=datafeed_config['pool_maxsize'],
+                                    keep_alive=datafeed_config['keep_alive'])
+            self.async_datafeed_connector = create_tcp_connector(connector_config, self.get_async_ssl_context())
+            self.async_datafeed_session = aiohttp.ClientSession(
+                connector=self.async_datafeed_connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=datafeed_config['connect_timeout'],
+                                              sock_read=datafeed_config['read_timeout']),
+                headers={'cache-control': 'no-cache'})
+        return self.async_datafeed_session
+
+    def get_token_headers(self, agent=False):
+        """Headers authenticating a request with the current tokens. Agent requests also need the
+        key manager token"""
+        headers = {'sessionToken': self.auth.get_session_token()}
+        if agent:
+            headers['keyManagerToken'] = self.auth.get_key_manager_token()
+        return headers
+
     # Known issue on this function when using a proxy due to an outstanding issue with aiohttp
     # To workaround this please check README.md
     async def execute_rest_call_async(self, method, path, **kwargs):
+        """Asynchronous version of execute_rest_call"""
+        return await self.request_coalescer.call_async(get_coalescing_key(method, path, kwargs),
+                                                       self._execute_rest_call_async, method, path, **kwargs)
+
+    async def _execute_rest_call_async(self, method, path, **kwargs):
         """This is the asynchronous method to hit the rest api, it should be awaited"""
         results = None
         session = None
 
-        if path.startswith("/agent/"):
+        if DATAFEED_READ_PATH.match(path):
+            url = self.config.data["agentUrl"] + path
+            session = self.get_async_datafeed_session()
+            http_proxy = self.config.data['agentProxyRequestObject'].get("http")
+            token_headers = self.get_token_headers(agent=True)
+
+        elif path.startswith("/agent/"):
             url = self.config.data["agentUrl"] + path
             session = self.get_async_agent_session()
             http_proxy = self.config.data['agentProxyRequestObject'].get("http")
+            token_headers = self.get_token_headers(agent=True)
 
         elif path.startswith("/pod/"):
             url = self.config.data["podUrl"] + path
             session = self.get_async_pod_session()
             http_proxy = self.config.data['podProxyRequestObject'].get("http")
+            token_headers = self.get_token_headers()
         else:
             # TODO: Confirm whether this should just throw
             # Not sure what the best course of action is here, taking pod values
             url = path
             session = self.get_async_pod_session()
             http_proxy = self.config.data['podProxyRequestObject'].get("http")
-
+            token_headers = self.get_token_headers()
+
+        # Kept as given for the retry after reauthentication, as the body is removed from kwargs
+        retry_kwargs = dict(kwargs)
+        request_class = classify_request(method, path, kwargs)
+        family = get_endpoint_family(path, request_class)
+        timeout = kwargs.pop('timeout', None)
+        if timeout is None:
+            timeout = self.config.get_request_timeout(request_class)
+        kwargs['timeout'] = to_aiohttp_timeout(timeout)
+        kwargs = encode_json_body(self.json_codec, kwargs)
+        # Read at each attempt, so that a retry after reauthentication uses the new tokens
+        kwargs['headers'] = dict(kwargs.get('headers') or {}, **token_headers)
         # This is to handle the files keyword
         files = kwargs.pop("files", None)
-
-        # The below attempts to handle a files kwarg in the same way that Requests handles it
-        if files is not None:
-            with aiohttp.MultipartWriter("form-data") as mpwriter:
-                for (key, value) in files.items():
-                    part = mpwriter.append(value)
-                    part.set_content_disposition("form-data", name=key)
-            if kwargs.get("data"):
-                # This isn't fatal, it's just not yet clear how to handle this in aiohttp
-                # This link is the best resource I've seen explaining the issue
-                # https://github.com/aio-libs/aiohttp/issues/3571
-                raise RuntimeError("Not expecting to find data and files")
+        data = kwargs.pop("data", None)
+        if files is not None and data:
+            # This isn't fatal, it's just not yet clear how to handle this in aiohttp
+            # This link is the best resource I've seen explaining the issue
+            # https://github.com/aio-libs/aiohttp/issues/3571
+            raise RuntimeError("Not expecting to find data and files")
+
+
+        self.token_manager.refresh_in_background_if_due()
+        token_generation = self.token_manager.generation
+        attempt = 0
+        while True:
+            delay = self.rate_limiter.reserve(family)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                response = await session.request(method, url, proxy=http_proxy,
+                                                 data=self._get_async_request_body(files, data), **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+                delay = self.retry_policy.get_retry_delay(method, request_class, attempt)
+                if delay is None:
+                    logging.debug(err)
+                    logging.debug(type(err))
+                    logging.debug('ensure pod/agent subdomains are correct')
+                    raise
+                logging.debug('bot_client/execute_rest_call_async() - {!r}, retrying in {:.3f}s'.format(err, delay))
             else:
-                data = mpwriter
-        elif kwargs.get("data") is not None:
-            data = kwargs.pop("data")
-        else:
-            data = None
-
-
-        try:
-            response = await session.request(method, url, proxy=http_proxy, ssl=self.get_async_ssl_context(), data=data, **kwargs)
-        except aiohttp.ClientConnectionError as err:
-            logging.debug(err)
-            logging.debug(type(err))
-            logging.debug('ensure pod/agent subdomains are correct')
-            raise
+                delay = self._get_retry_delay(method, request_class, family, attempt, response.status, response)
+                if delay is None:
+                    break
+                response.release()
+            await asyncio.sleep(delay)
+            attempt += 1
 
         if response.status == 204:
             results = []
+        elif response.status == 401:
+            # Handled here rather than in handle_error, which reauthenticates synchronously
+            logging.debug('bot_client/execute_rest_call_async() - 401, refreshing tokens and retrying')
+            await self.token_manager.refresh_async(token_generation)
+            results = await self._execute_rest_call_async(method, path, **retry_kwargs)
         elif response.status == 200:
-            text = await response.text()
+            body = await response.read()
 
             try:
-                results = json.loads(text)
-            except JSONDecodeError:
-                results = text
+                results = self.json_codec.loads(body)
+            except ValueError:
+                results = await response.text()
         else:
             # Try to get the json to be used to handle the error message
             error_json = None
             text = None
             try:
-                error_json = await response.json()
-            except JSONDecodeError:
+                error_json = self.json_codec.loads(await response.read())
+            except ValueError:
                 try:
                     text = await response.text()
                 except Exception:
                     text = None
-            try:
-                super().handle_error(response, self, error_json, text)
-            except UnauthorizedException:
-                await self.execute_rest_call_async(method, path, **kwargs)
+            super().handle_error(response, self, error_json, text)
+        return results
+
+    @staticmethod
+    def _get_async_request_body(files, data):
+        """The body of an aiohttp request, built again for each retry of the request"""
+        # The below attempts to handle a files kwarg in the same way that Requests handles it
+        if files is None:
+            return data
+        with aiohttp.MultipartWriter("form-data") as mpwriter:
+            for (key, value) in files.items():
+                part = mpwriter.append(value)
+                part.set_content_disposition("form-data", name=key)
+        return mpwriter
+
+    def _get_retry_delay(self, method, request_class, family, attempt, status, response):
+        """Seconds to wait before retrying a call that got status, or None, see retry_policy. A
+        429 also pauses the other calls of its family for its Retry-After"""
+        if status < 429:
+            return None
+        retry_after = response.headers.get('Retry-After') if status == 429 else None
+        if status == 429:
+            pause = parse_retry_after(retry_after)
+            if pause:
+                self.rate_limiter.pause(family, min(pause, self.retry_policy.max_retry_after_sec))
+        delay = self.retry_policy.get_retry_delay(method, request_class, attempt, status, retry_after)
+        if delay is not None:
+            logging.debug('bot_client/execute_rest_call() - {} {} got {}, retrying in {:.3f}s'
+                          .format(method, family, status, delay))
+        return delay
+
+    def execute_hedged_rest_call(self, method, path, **kwargs):
+        """execute_rest_call for idempotent GETs, sending a second attempt if the first one has not
+        returned after hedgeDelay seconds, see RequestHedger. Other methods are not hedged"""
+        if method.upper() != 'GET':
+            return self.execute_rest_call(method, path, **kwargs)
+        # Coalesced around the hedger, whose two attempts must not be coalesced together
+        return self.request_coalescer.call(get_coalescing_key(method, path, kwargs), self.request_hedger.call,
+                                           self._execute_rest_call, method, path, **kwargs)
+
+    async def execute_hedged_rest_call_async(self, method, path, **kwargs):
+        """Asynchronous version of execute_hedged_rest_call"""
+        if method.upper() != 'GET':
+            return await self.execute_rest_call_async(method, path, **kwargs)
+        return await self.request_coalescer.call_async(get_coalescing_key(method, path, kwargs),
+                                                       self.request_hedger.call_async,
+                                                       self._execute_rest_call_async, method, path, **kwargs)
+
+    def execute_cached_rest_call(self, endpoint, method, path, **kwargs):
+        """execute_hedged_rest_call for the pod lookups of an endpoint of response_cache, whose
+        response is cached for the time to live of the endpoint"""
+        key = get_coalescing_key(method, path, kwargs)
+        if not self.response_cache.is_cached(endpoint, key):
+            return self.execute_hedged_rest_call(method, path, **kwargs)
+        hit, results = self.response_cache.get(key)
+        if not hit:
+            results = self.execute_hedged_rest_call(method, path, **kwargs)
+            self.response_cache.put(endpoint, key, results)
+        return results
+
+    async def execute_cached_rest_call_async(self, endpoint, method, path, **kwargs):
+        """Asynchronous version of execute_cached_rest_call"""
+        key = get_coalescing_key(method, path, kwargs)
+        if not self.response_cache.is_cached(endpoint, key):
+            return await self.execute_hedged_rest_call_async(method, path, **kwargs)
+        hit, results = self.response_cache.get(key)
+        if not hit:
+            results = await self.execute_hedged_rest_call_async(method, path, **kwargs)
+            self.response_cache.put(endpoint, key, results)
         return results
 
     def reauth_client(self):
-        self.auth.authenticate()
+        """Reauthenticate, unless another thread does it already in which case wait for it"""
+        self.token_manager.refresh(self.token_manager.generation)
+
+    async def reauth_client_async(self):
+        """Reauthenticate without blocking the event loop, with the authenticate_async method of
+        the authenticator if it has one, see TokenManager.refresh_async"""
+        await self.token_manager.refresh_async(self.token_manager.generation)
+
+    def _update_session_tokens(self):
+        """Use the tokens of the last authentication in the existing sessions"""
         if self.pod_session:
             logging.debug('bot_client/reauth_client() - pod session exists')
             self.pod_session.headers.update({
                 'sessionToken': self.auth.get_session_token()}
             )
-        if self.agent_session:
-            logging.debug('bot_client/reauth_client() - agent session exists')
-            self.agent_session.headers.update({
-                'sessionToken' : self.auth.get_session_token(),
-                'keyManagerToken': self.auth.get_key_manager_token()}
-            )
-
-        if self.async_pod_session:
-            logging.debug('bot_client/reauth_client() - async pod session exists')
-            self.async_pod_session = aiohttp.ClientSession(
-            headers = {
-                'sessionToken': self.auth.get_session_token()}
-            )
-
-        if self.async_agent_session:
-            logging.debug('bot_client/reauth_client() - async agent session exists')
-            self.async_agent_session = aiohttp.ClientSession(
-            headers = {
-                'sessionToken': self.auth.get_session_token(),
-                'keyManagerToken': self.auth.get_key_manager_token()}
-            )
+        for session in (self.agent_session, self.datafeed_session):
+            if session:
+                logging.debug('bot_client/reauth_client() - agent session exists')
+                session.headers.update({
+                    'sessionToken' : self.auth.get_session_token(),
+                    'keyManagerToken': self.auth.get_key_manager_token()}
+                )
+        # The aiohttp sessions are kept with their connections, execute_rest_call_async sets the
+        # tokens on each request
 
     def get_bot_user_info(self):
         if self.bot_user_info is None:
             self.bot_user_info = self.get_user_client().get_session_user()
         return self.bot_user_info
 
+    async def get_bot_user_info_async(self):
+        if self.bot_user_info is None:
+            self.bot_user_info = await self.get_user_client().get_session_user_async()
+        return self.bot_user_info
+
     def get_health_check_client(self):
         if self.health_check_client is None:
             self.health_check_client = HealthCheckClient(self)
@@ -366,3 +592,13 @@ class SymBotClient(APIClient):
         if self.async_agent_session:
             await self.async_agent_session.close()
             self.async_agent_session = None
+
+        if self.async_datafeed_session:
+            # Owns its connector
+            await self.async_datafeed_session.close()
+            self.async_datafeed_session = None
+            self.async_datafeed_connector = None
+
+        if self.async_connector:
+            await self.async_connector.close()
+            self.async_connector = None
@@ -1,6 +1,7 @@
 import logging
 
 from .api_client import APIClient
+from ..response_cache import USER
 
 
 # logging.basicConfig(filename='logs/example.log', format='%(asctime)s - %(
@@ -22,19 +23,25 @@ class UserClient(APIClient):
         logging.debug('UserClient/get_user_from_user_name()')
         url = '/pod/v2/user'
         params = {'username': user_name}
-        return self.bot_client.execute_rest_call('GET', url, params=params)
+        return self.bot_client.execute_cached_rest_call(USER, 'GET', url, params=params)
 
     def get_user_from_email(self, email, local=False):
         logging.debug('UserClient/get_user_from_email()')
         url = '/pod/v2/user'
         params = {'email': email, 'local':local}
-        return self.bot_client.execute_rest_call('GET', url, params=params)
+        return self.bot_client.execute_cached_rest_call(USER, 'GET', url, params=params)
 
     def get_user_from_id(self, user_id, local=False):
         logging.debug('UserClient/get_user_from_id()')
         url = '/pod/v2/user'
         params = {'uid': user_id, 'local':local}
-        return self.bot_client.execute_rest_call('GET', url, params=params)
+        return self.bot_client.execute_cached_rest_call(USER, 'GET', url, params=params)
+
+    async def get_user_from_id_async(self, user_id, local=False):
+        logging.debug('UserClient/get_user_from_id_async()')
+        url = '/pod/v2/user'
+        params = {'uid': user_id, 'local': str(local).lower()}
+        return await self.bot_client.execute_cached_rest_call_async(USER, 'GET', url, params=params)
 
     def get_users_from_id_list(self, user_id_list, local=False):
         logging.debug('UserClient/get_users_from_id_list()')
@@ -61,3 +68,8 @@ class UserClient(APIClient):
         logging.debug('UserClient/get_session_user()')
         url = '/pod/v2/sessioninfo'
         return self.bot_client.execute_rest_call('GET', url)
+
+    async def get_session_user_async(self):
+        logging.debug('UserClient/get_session_user_async()')
+        url = '/pod/v2/sessioninfo'
+        return await self.bot_client.execute_rest_call_async('GET', url)
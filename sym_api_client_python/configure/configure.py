@@ -3,6 +3,17 @@ import logging
 import os
 
 from sym_api_client_python.clients.constants.DatafeedVersion import DatafeedVersion
+from sym_api_client_python.request_policy import (LONG_POLL, DEFAULT_CONNECT_TIMEOUT, DEFAULT_LOOKUP_TIMEOUT,
+                                                    DEFAULT_SEND_TIMEOUT, DEFAULT_UPLOAD_TIMEOUT)
+from sym_api_client_python.connection_pool import (DEFAULT_POOL_SIZE, DEFAULT_POOL_BLOCK, DEFAULT_KEEP_ALIVE,
+                                                     DEFAULT_ASYNC_CONNECTION_LIMIT,
+                                                     DEFAULT_ASYNC_CONNECTION_LIMIT_PER_HOST,
+                                                     DEFAULT_ASYNC_DNS_CACHE_TTL, DEFAULT_ASYNC_KEEP_ALIVE_TIMEOUT,
+                                                     DEFAULT_DATAFEED_POOL_SIZE, DEFAULT_DATAFEED_CONNECT_TIMEOUT,
+                                                     DEFAULT_DATAFEED_READ_TIMEOUT)
+from sym_api_client_python.response_cache import DEFAULT_CACHE_SIZE, DEFAULT_TTLS
+from sym_api_client_python.retry_policy import (MESSAGE, AGENT, POD, DEFAULT_MAX_RETRIES,
+                                                  DEFAULT_MAX_RETRY_AFTER_SEC)
 
 
 class SymConfig:
@@ -199,3 +210,124 @@ class SymConfig:
         if datafeed_id_file_path:
             return datafeed_id_file_path
         return os.getcwd()
+
+    def is_session_token_reused(self):
+        return bool(self.data.get("reuseSessionTokens"))
+
+    def get_session_token_folder_path(self):
+        session_token_file_path = self.data.get("sessionTokenFilePath")
+        if session_token_file_path:
+            return session_token_file_path
+        return self.get_datafeed_id_folder_path()
+
+    def get_connection_pool_config(self, component):
+        """Connection pool settings of the requests sessions of a component: pod, agent or
+        keyManager, see sym_api_client_python.connection_pool"""
+
+        def get_value(key, default):
+            value = self.data.get(component + key[0].upper() + key[1:])
+            if value is None:
+                value = self.data.get(key)
+            return default if value is None else value
+
+        return {
+            'pool_maxsize': int(get_value('connectionPoolSize', DEFAULT_POOL_SIZE)),
+            'pool_block': bool(get_value('connectionPoolBlock', DEFAULT_POOL_BLOCK)),
+            'keep_alive': bool(get_value('keepAlive', DEFAULT_KEEP_ALIVE)),
+        }
+
+    def get_async_connector_config(self):
+        """Settings of the TCPConnector shared by the aiohttp sessions, see
+        sym_api_client_python.connection_pool"""
+
+        def get_value(key, default):
+            value = self.data.get(key)
+            return default if value is None else value
+
+        return {
+            'limit': int(get_value('asyncConnectionLimit', DEFAULT_ASYNC_CONNECTION_LIMIT)),
+            'limit_per_host': int(get_value('asyncConnectionLimitPerHost', DEFAULT_ASYNC_CONNECTION_LIMIT_PER_HOST)),
+            'ttl_dns_cache': get_value('asyncDnsCacheTtl', DEFAULT_ASYNC_DNS_CACHE_TTL),
+            'keepalive_timeout': float(get_value('asyncKeepAliveTimeout', DEFAULT_ASYNC_KEEP_ALIVE_TIMEOUT)),
+            'keep_alive': bool(get_value('keepAlive', DEFAULT_KEEP_ALIVE)),
+        }
+
+    def get_datafeed_connection_config(self):
+        """Settings of the connections of the datafeed reads, see
+        sym_api_client_python.connection_pool"""
+
+        def get_value(key, default):
+            value = self.data.get(key)
+            return default if value is None else value
+
+        return {
+            'pool_maxsize': int(get_value('datafeedConnectionPoolSize', DEFAULT_DATAFEED_POOL_SIZE)),
+            'pool_block': False,
+            'keep_alive': bool(get_value('keepAlive', DEFAULT_KEEP_ALIVE)),
+            'connect_timeout': float(get_value('datafeedConnectTimeout', DEFAULT_DATAFEED_CONNECT_TIMEOUT)),
+            'read_timeout': float(get_value('datafeedReadTimeout', DEFAULT_DATAFEED_READ_TIMEOUT)),
+        }
+
+    def get_request_timeout(self, request_class):
+        """(connect, read) timeouts in seconds of a class of REST calls, see
+        sym_api_client_python.request_policy. A timeout set to 0 is None, no timeout"""
+        if request_class == LONG_POLL:
+            datafeed_config = self.get_datafeed_connection_config()
+            return datafeed_config['connect_timeout'] or None, datafeed_config['read_timeout'] or None
+        defaults = {
+            'lookup': DEFAULT_LOOKUP_TIMEOUT,
+            'send': DEFAULT_SEND_TIMEOUT,
+            'upload': DEFAULT_UPLOAD_TIMEOUT,
+        }
+        read_timeout = self.data.get(request_class + 'Timeout')
+        if read_timeout is None:
+            read_timeout = defaults[request_class]
+        connect_timeout = self.data.get('connectTimeout')
+        if connect_timeout is None:
+            connect_timeout = DEFAULT_CONNECT_TIMEOUT
+        return float(connect_timeout) or None, float(read_timeout) or None
+
+    def get_hedge_delay(self):
+        """Seconds after which idempotent GETs are hedged, or None if hedging is disabled"""
+        hedge_delay = self.data.get('hedgeDelay')
+        return float(hedge_delay) if hedge_delay else None
+
+    def is_request_coalescing_enabled(self):
+        """Whether identical concurrent GETs share one call, true by default"""
+        return bool(self.data.get('coalesceRequests', True))
+
+    def get_response_cache_config(self):
+        """Settings of the cache of pod lookups, the keyword arguments of
+        sym_api_client_python.response_cache.ResponseCache"""
+        ttls = {}
+        for endpoint, default_ttl in DEFAULT_TTLS.items():
+            ttl = self.data.get(endpoint + 'CacheTtl')
+            ttls[endpoint] = float(default_ttl if ttl is None else ttl)
+        max_size = self.data.get('responseCacheSize')
+        return {
+            'ttls': ttls,
+            'max_size': int(DEFAULT_CACHE_SIZE if max_size is None else max_size),
+        }
+
+    def get_retry_config(self):
+        """Settings of the retries of the REST calls, the keyword arguments of
+        sym_api_client_python.retry_policy.RetryPolicy"""
+
+        def get_value(key, default):
+            value = self.data.get(key)
+            return default if value is None else value
+
+        return {
+            'max_retries': int(get_value('maxRetries', DEFAULT_MAX_RETRIES)),
+            'retry_non_idempotent': bool(get_value('retryNonIdempotent', False)),
+            'max_retry_after_sec': float(get_value('maxRetryAfter', DEFAULT_MAX_RETRY_AFTER_SEC)),
+        }
+
+    def get_rate_limits(self):
+        """Calls per second allowed per endpoint family, None if not rate limited, see
+        sym_api_client_python.retry_policy"""
+        rate_limits = {}
+        for family in (MESSAGE, AGENT, POD):
+            rate_limit = self.data.get(family + 'RateLimit')
+            rate_limits[family] = float(rate_limit) if rate_limit else None
+        return rate_limits
@@ -0,0 +1,124 @@
+"""Connection pools of the requests sessions
+
+Each session talks to a single host, the pod, the agent or the key manager, and gets one
+PooledHTTPAdapter sized from the config, see SymConfig.get_connection_pool_config:
+    * connectionPoolSize: connections kept open per host, 10 by default like requests. More
+      threads than that calling the same host open extra connections, which are closed after use
+      ("Connection pool is full, discarding connection")
+    * connectionPoolBlock: if true, threads wait for a connection of the pool instead
+    * keepAlive: if false, connections are closed after each request
+
+Each key can be overridden per host by prefixing it with pod, agent or keyManager, for instance
+agentConnectionPoolSize.
+
+The aiohttp sessions to the pod and the agent share one TCPConnector, which lives as long as the
+SymBotClient, see SymConfig.get_async_connector_config:
+    * asyncConnectionLimit: connections open at once to all hosts, 100 by default like aiohttp
+    * asyncConnectionLimitPerHost: connections open at once per host, 0 for no limit
+    * asyncDnsCacheTtl: seconds host names are resolved for, 10 by default
+    * asyncKeepAliveTimeout: seconds idle connections are kept open for, 15 by default
+    * keepAlive: if false, connections are closed after each request
+
+The datafeed reads, long-polls answered after up to 30 seconds without events, use sessions and
+a connector of their own so that they do not hold the connections of the other agent calls, see
+SymConfig.get_datafeed_connection_config:
+    * datafeedConnectionPoolSize: connections kept open, 2 by default, one per datafeed read at
+      once. Sized for the number of datafeed event services of the bot
+    * datafeedConnectTimeout: seconds to connect to the agent, 10 by default
+    * datafeedReadTimeout: seconds without data after which a read fails, 60 by default, above
+      the 30 seconds of the long-poll
+"""
+
+import logging
+
+import aiohttp
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
+
+log = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = DEFAULT_POOLSIZE
+DEFAULT_POOL_BLOCK = False
+DEFAULT_KEEP_ALIVE = True
+DEFAULT_ASYNC_CONNECTION_LIMIT = 100
+DEFAULT_ASYNC_CONNECTION_LIMIT_PER_HOST = 0
+DEFAULT_ASYNC_DNS_CACHE_TTL = 10
+DEFAULT_ASYNC_KEEP_ALIVE_TIMEOUT = 15
+DEFAULT_DATAFEED_POOL_SIZE = 2
+DEFAULT_DATAFEED_CONNECT_TIMEOUT = 10
+DEFAULT_DATAFEED_READ_TIMEOUT = 60
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter reporting the utilization of its connection pools"""
+
+    def __init__(self, pool_maxsize=DEFAULT_POOL_SIZE, pool_block=DEFAULT_POOL_BLOCK, **kwargs):
+        super().__init__(pool_maxsize=pool_maxsize, pool_block=pool_block, **kwargs)
+
+    def get_pool_stats(self):
+        """Return a list of dicts per connection pool, one per host and proxy:
+            * host, port, scheme
+            * max_size: connections kept open
+            * in_use: connections currently used by a request
+            * idle: open connections waiting for a request
+            * connections_created, requests: totals since the pool was created
+        """
+        stats = []
+        for manager in [self.poolmanager] + list(self.proxy_manager.values()):
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                # The queue holds the idle connections, and None for each connection not opened yet
+                queued = list(pool.pool.queue)
+                stats.append({
+                    'host': pool.host,
+                    'port': pool.port,
+                    'scheme': pool.scheme,
+                    'max_size': pool.pool.maxsize,
+                    'in_use': max(pool.pool.maxsize - len(queued), 0),
+                    'idle': sum(1 for connection in queued if connection is not None),
+                    'connections_created': pool.num_connections,
+                    'requests': pool.num_requests,
+                })
+        return stats
+
+
+def mount_connection_pool(session, pool_config, *prefixes, adapter_class=PooledHTTPAdapter, **adapter_kwargs):
+    """Mount a single adapter configured by pool_config, from SymConfig.get_connection_pool_config,
+    on the session for the url prefixes, by default all http and https urls. Returns the adapter"""
+    adapter = adapter_class(pool_maxsize=pool_config['pool_maxsize'], pool_block=pool_config['pool_block'],
+                            **adapter_kwargs)
+    for prefix in prefixes or ('https://', 'http://'):
+        session.mount(prefix, adapter)
+    if not pool_config['keep_alive']:
+        session.headers['Connection'] = 'close'
+    return adapter
+
+
+def get_session_pool_stats(session):
+    """The pool stats of all the PooledHTTPAdapters of a requests session"""
+    stats = []
+    adapters = []
+    for adapter in session.adapters.values():
+        if isinstance(adapter, PooledHTTPAdapter) and adapter not in adapters:
+            adapters.append(adapter)
+            stats.extend(adapter.get_pool_stats())
+    return stats
+
+
+def create_tcp_connector(connector_config, ssl_context=None):
+    """Create the TCPConnector configured by connector_config, from
+    SymConfig.get_async_connector_config. Must be called from a running event loop"""
+    connector_kwargs = {
+        'limit': connector_config['limit'],
+        'limit_per_host': connector_config['limit_per_host'],
+        'ttl_dns_cache': connector_config['ttl_dns_cache'],
+        'ssl': ssl_context,
+    }
+    # aiohttp rejects a keepalive timeout for connections that are closed after each request
+    if connector_config['keep_alive']:
+        connector_kwargs['keepalive_timeout'] = connector_config['keepalive_timeout']
+    else:
+        connector_kwargs['force_close'] = True
+    log.debug('Creating TCPConnector: {}'.format(connector_config))
+    return aiohttp.TCPConnector(**connector_kwargs)
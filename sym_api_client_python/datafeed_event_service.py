@@ -1,4 +1,5 @@
 import asyncio
+import time
 import uuid
 from functools import partial
 import logging
@@ -15,9 +16,15 @@ from .exceptions.ServerErrorException import ServerErrorException
 from .exceptions.MaxRetryException import MaxRetryException
 
 from .services.abstract_datafeed_event_service import AbstractDatafeedEventService
+from .services.datafeed_events import (
+    DatafeedEvent, ConnectionAccepted, ConnectionRequested, ElementsAction,
+    InstantMessageCreated, MessageSent, MessageSuppressed, RoomCreated, RoomDeactivated,
+    RoomMemberDemotedFromOwner, RoomMemberPromotedToOwner, RoomReactivated, RoomUpdated,
+    SharedPost, UserJoinedRoom, UserLeftRoom)
 from .clients.constants.DatafeedVersion import DatafeedVersion
 from .services.datafeed_event_service_v1 import DataFeedEventServiceV1
 from .services.datafeed_event_service_v2 import DataFeedEventServiceV2
+from .services.latency_recorder import LatencyRecorder, DEFAULT_MAX_TRACES, DEFAULT_TRACE_TTL_SEC
 
 log = logging.getLogger(__name__)
 
@@ -29,19 +36,27 @@ def make_datetime(unix_timestamp_millis):
 
 EventTrace = namedtuple('EventTrace', 'message_id creation_time bot_received listeners_complete bot_complete')
 
+# Default number of listener coroutines running concurrently in the AsyncDataFeedEventService
+DEFAULT_MAX_IN_FLIGHT = 50
+# Default number of events buffered before reading the datafeed is paused. This matches the
+# capacity of a standard v1 datafeed
+DEFAULT_MAX_QUEUE_SIZE = 250
+
 
 class DataFeedEventService:
 
-    def __init__(self, sym_bot_client, error_timeout_sec=None, maximum_timeout_sec=None):
+    def __init__(self, sym_bot_client, error_timeout_sec=None, maximum_timeout_sec=None, **kwargs):
+        """Other keyword arguments, such as thread_pool_size, are passed on to the versioned service,
+        see AbstractDatafeedEventService"""
         config = sym_bot_client.get_sym_config()
 
         # Creating the DataFeed Event Service
         if DatafeedVersion.version_of(config.data.get("datafeedVersion")) == DatafeedVersion.V2:
             self.datafeed_event_service = DataFeedEventServiceV2(sym_bot_client, error_timeout_sec=error_timeout_sec,
-                                                                 maximum_timeout_sec=maximum_timeout_sec)
+                                                                 maximum_timeout_sec=maximum_timeout_sec, **kwargs)
         else:
             self.datafeed_event_service = DataFeedEventServiceV1(sym_bot_client, error_timeout_sec=error_timeout_sec,
-                                                                 maximum_timeout_sec=maximum_timeout_sec)
+                                                                 maximum_timeout_sec=maximum_timeout_sec, **kwargs)
 
     def start_datafeed(self):
         """Start reading events from datafeed.
@@ -54,8 +69,8 @@ class DataFeedEventService:
     def activate_datafeed(self):
         self.datafeed_event_service.activate_datafeed()
 
-    def deactivate_datafeed(self):
-        self.datafeed_event_service.deactivate_datafeed()
+    def deactivate_datafeed(self, wait_for_handler_completions=True):
+        self.datafeed_event_service.deactivate_datafeed(wait_for_handler_completions)
 
     def add_room_listener(self, room_listener):
         self.datafeed_event_service.add_room_listener(room_listener)
@@ -99,6 +114,12 @@ class DataFeedEventService:
     def handle_event(self, payload):
         self.datafeed_event_service.handle_event(payload)
 
+    def dispatch_event(self, event):
+        self.datafeed_event_service.dispatch_event(event)
+
+    def drain_events(self):
+        self.datafeed_event_service.drain_events()
+
     ### Handlers ###
     def msg_sent_handler(self, payload):
         self.datafeed_event_service.msg_sent_handler(payload)
@@ -173,8 +194,31 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
         * Listener methods that are expensive and not awaited will block reading the datafeed. For
           common IO-bound operations an asychronous version may be available, aiohttp instead of
           requests for example. If one is not, consider running it in a ThreadPoolExecutor
-        * Some assumptions about ordering will fail. For example a user sending two messages to a
-          bot in quick succession may get their responses in a different order.
+        * Unless ordered_by_stream is set, some assumptions about ordering will fail. For example a
+          user sending two messages to a bot in quick succession may get their responses in a
+          different order.
+
+    Concurrency is bounded: at most max_in_flight listener coroutines run at the same time and at
+    most max_queue_size events wait in the queue. When the queue is full read_datafeed stops
+    reading until handlers catch up, so a burst of events cannot exhaust connections or memory.
+    Both limits can be given as parameters or in the config as datafeedEventsMaxInFlight and
+    datafeedEventsQueueSize. The queue_depth and in_flight properties, with their peaks, can be
+    used to size them.
+
+    By default events are handled concurrently and ordering is not guaranteed. With
+    ordered_by_stream (or datafeedEventsOrderedByStream in the config) events of the same
+    conversation, as returned by get_stream_key, are handled one after the other in the order they
+    were read, while events of different conversations are still handled concurrently. Events
+    waiting for a previous event of their conversation count towards max_in_flight.
+
+    CPU-bound listeners can be run in worker processes by passing a ProcessPoolEventDispatcher as
+    process_pool, see services/process_pool_dispatcher.py.
+
+    Unless trace_enabled is False, the latencies of handled events are recorded by a
+    LatencyRecorder, available as latency_recorder: latency_recorder.snapshot() returns the
+    p50/p95/p99 of the queue wait, handler and end to end times per event type. At most
+    trace_max_size events are traced at once, for at most trace_ttl_sec. If a trace_recorder list
+    is given an EventTrace is also appended to it for each handled event.
 
     Potential improvements:
         * Provide a timeout to allow handlers to be cancelled after a certain period
@@ -193,20 +237,42 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
     """
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.queue = asyncio.Queue()
-        self.exception_queue = asyncio.Queue()
+        # Options specific to the async service are removed before reaching the abstract service
         self.exception_handler = kwargs.pop('exception_handler', None)
         self.trace_enabled = kwargs.pop('trace_enabled', True)
         self.trace_recorder = kwargs.pop('trace_recorder', None)
-        self.trace_dict = {}
+        trace_max_size = kwargs.pop('trace_max_size', DEFAULT_MAX_TRACES)
+        trace_ttl_sec = kwargs.pop('trace_ttl_sec', DEFAULT_TRACE_TTL_SEC)
+        max_in_flight = kwargs.pop('max_in_flight', None)
+        max_queue_size = kwargs.pop('max_queue_size', None)
+        super().__init__(*args, **kwargs)
+
+        self.max_in_flight = self._get_option(max_in_flight, 'datafeedEventsMaxInFlight', DEFAULT_MAX_IN_FLIGHT)
+        self.max_queue_size = self._get_option(max_queue_size, 'datafeedEventsQueueSize', DEFAULT_MAX_QUEUE_SIZE)
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.exception_queue = asyncio.Queue()
+        self.in_flight_semaphore = asyncio.Semaphore(self.max_in_flight)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.peak_queue_depth = 0
+        # Last scheduled handler of each conversation, the next event of the stream waits for it
+        self.stream_tails = {}
+        self.latency_recorder = LatencyRecorder(trace_max_size, trace_ttl_sec) if self.trace_enabled else None
         self.handle_events_task = None
         self.tasks = []
         self.datafeed_id = None
 
+    @property
+    def queue_depth(self):
+        """Number of events read from the datafeed and waiting for a handler"""
+        return self.queue.qsize()
+
     async def start_datafeed(self):
         log.debug('AsyncDataFeedEventService/start_datafeed()')
-        self.datafeed_id = self._get_from_file_or_create_datafeed_id()
+        if self.config.is_datafeed_v1():
+            self.datafeed_id = await self._get_from_file_or_create_datafeed_id_async()
+        else:
+            self.datafeed_id = await self._get_or_create_datafeed_id_v2_async()
         await asyncio.gather(self.read_datafeed(), self.handle_events(), self.handle_exceptions())
 
     async def deactivate_datafeed(self, wait_for_handler_completions=True):
@@ -225,15 +291,25 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
 
         if not self.stop:
             self.stop = True
+        self.reset_room_index()
 
+        if self.queue.full():
+            # read_datafeed may be blocked on the full queue, the remaining events are dropped
+            log.debug('AsyncDataFeedEventService/deactivate_datafeed() --> '
+                      'Dropping {} queued events'.format(self.queue.qsize()))
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.queue.task_done()
         await self.queue.put(None)
         await self.exception_queue.put(None)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False)
         await self.bot_client.close_async_sessions()
 
     async def read_datafeed(self):
         while not self.stop:
             try:
-                events = await self.datafeed_client.read_datafeed_async(self.datafeed_id)
+                events = await self._read_datafeed_async()
             except CancelledError as exc:
                 log.info("Cancel request received. Stopping datafeed...")
                 await self.deactivate_datafeed()
@@ -247,18 +323,23 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
                 continue
 
             self.decrease_timeout()
-            if events:
-                bot_id = self.bot_client.get_bot_user_info()['id']
+            bot_id = (await self.bot_client.get_bot_user_info_async())['id']
+            self.update_room_index(events or [], bot_id)
+            if events and events != [None]:
                 for event in events:
+                    event = DatafeedEvent.from_dict(event)
                     log.debug(
                         'AsyncDataFeedEventService/read_datafeed() --> '
-                        'Incoming event from read_datafeed() with id: {}'.format(event.get('id'))
+                        'Incoming event from read_datafeed() with id: {}'.format(event.id)
                     )
 
-                    if event['initiator']['user']['userId'] != bot_id:
+                    if event.initiator_user_id != bot_id and not self.is_duplicate_event(event):
                         e_id = self._get_event_id(event)
-                        self._add_trace(e_id, event["timestamp"])
+                        if self.latency_recorder is not None:
+                            self.latency_recorder.received(e_id, event.type, event.timestamp)
+                        # Blocks while the queue is full, pausing reads until handlers catch up
                         await self.queue.put(event)
+                        self.peak_queue_depth = max(self.peak_queue_depth, self.queue.qsize())
                     log.debug(f"Event queued. Current queue size: {self.queue.qsize()}")
 
             else:
@@ -287,87 +368,105 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
         except Exception as exc:
             log.exception('AsyncDataFeedEventService - Unknown exception: ' + str(exc))
 
+        self.reset_room_index()
         sleep_for = self.get_and_increase_timeout(thrown_exception)
         log.debug('AsyncDataFeedEventService/handle_event() --> Sleeping for {:.4g}s'.format(sleep_for))
         await asyncio.sleep(sleep_for)
+        if not self.config.is_datafeed_v1():
+            try:
+                log.debug('AsyncDataFeedEventService --> Deleting previous Datafeed')
+                await self.datafeed_client.delete_datafeed_async(self.datafeed_id)
+            except Exception as exc:
+                log.debug('AsyncDataFeedEventService --> Unable to delete previous Datafeed: ' + str(exc))
+            self.datafeed_client.reset_ack_id()
+
         try:
             log.debug('AsyncDataFeedEventService/handle_event() --> Restarting Datafeed')
-            self.datafeed_id = self._create_datafeed_and_persist()
+            if self.config.is_datafeed_v1():
+                self.datafeed_id = await self._create_datafeed_and_persist_async()
+            else:
+                self.datafeed_id = await self.datafeed_client.create_datafeed_async()
         except Exception as exc:
             await self.handle_datafeed_errors(exc)
 
+    async def _read_datafeed_async(self):
+        """Read the v1 datafeed, or the v2 datafeed acknowledging the events of the previous read"""
+        if self.config.is_datafeed_v1():
+            return await self.datafeed_client.read_datafeed_async(self.datafeed_id)
+        return await self.datafeed_client.read_datafeed_async(self.datafeed_id,
+                                                              self.datafeed_client.get_ack_id())
+
+    async def _get_from_file_or_create_datafeed_id_async(self):
+        if self.config.should_store_datafeed_id():
+            datafeed_id = self.datafeed_id_repository.read_datafeed_id_from_file()
+            if datafeed_id:
+                return datafeed_id
+        return await self._create_datafeed_and_persist_async()
+
+    async def _create_datafeed_and_persist_async(self):
+        datafeed_id = await self.datafeed_client.create_datafeed_async()
+        if self.config.should_store_datafeed_id():
+            self.datafeed_id_repository.store_datafeed_id_to_file(datafeed_id, self.config.get_agent_url())
+        return datafeed_id
+
+    async def _get_or_create_datafeed_id_v2_async(self):
+        """Reuse the first datafeed listed for the service account or create a new one"""
+        datafeed_ids = await self.datafeed_client.list_datafeed_id_async()
+        if datafeed_ids:
+            return datafeed_ids[0].get("id")
+        return await self.datafeed_client.create_datafeed_async()
+
     def _check_result(self, e_id, task):
         """Callback for task completion. If exceptions occurred add them for processing on the
         exceptions queue, otherwise they get swallowed by the future
         """
-        self._add_trace(e_id)
+        self.in_flight -= 1
+        self.in_flight_semaphore.release()
+        self._complete_trace(e_id)
         if task.exception() is not None:
             log.debug("Adding exception to exception queue for event: {}".format(e_id))
             self.exception_queue.put_nowait((e_id, task))
-        else:
-            self._process_full_trace(e_id)
         self.queue.task_done()
 
-    def _process_full_trace(self, id):
-        """Process all tracedata for the current request and append it to trace_recorder, if defined.
-
-        Use with messagedId if available
+    def _complete_trace(self, e_id):
+        """Record the latencies of a handled event and append its trace to trace_recorder, if
+        defined. Datetimes are only built when a trace_recorder needs them
         """
-
-        if not self.trace_enabled:
+        if self.latency_recorder is None:
             return
 
-        try:
-            intermediates = self.trace_dict[id]
-            if len(intermediates) != 4:
-                log.error("Error while computing trace results for id: " + id + ": trace item should have 4 elements")
-                return
-
-            trace = EventTrace(id, intermediates[0], intermediates[1], intermediates[2],
-                               intermediates[3])
-            total_time = intermediates[3] - intermediates[0]
-            time_in_bot = intermediates[3] - intermediates[1]
+        trace = self.latency_recorder.completed(e_id)
+        if trace is None:
+            return
+        server_timestamp, received_at, dequeued_at, completed_at = trace
 
+        if log.isEnabledFor(logging.DEBUG):
             # This just writes out total seconds instead of formatting into minutes and hours
             # for a typical bot response this seems reasonable
             log.debug("Responded to message in: {:.4g}s. Including {:.4g}s inside the bot"
-                      .format(total_time.total_seconds(), time_in_bot.total_seconds()))
-            if self.trace_recorder is not None:
-                self.trace_recorder.append(trace)
-            del self.trace_dict[id]
-        except Exception as exc:
-            log.error("Error while computing trace results for id: " + id)
-            log.exception(exc)
+                      .format(time.time() - server_timestamp / 1000, completed_at - received_at))
+
+        if self.trace_recorder is not None:
+            # Convert the monotonic times to wall clock times
+            wall_offset = time.time() - completed_at
+            self.trace_recorder.append(EventTrace(
+                e_id, make_datetime(server_timestamp),
+                *(datetime.datetime.utcfromtimestamp(monotonic_time + wall_offset)
+                  for monotonic_time in (received_at, dequeued_at, completed_at))
+            ))
 
     @staticmethod
     def _get_event_id(event):
-        event_id = event["messageId"] if "messageId" in event else event.get('id')
+        event = DatafeedEvent.from_dict(event)
+        event_id = event.message_id if "messageId" in event else event.id
         if event_id is None:
-            event['id'] = str(uuid.uuid4())
-            return event['id']
+            event.raw['id'] = str(uuid.uuid4())
+            return event.raw['id']
         return event_id
 
-    def _add_trace(self, e_id, first_timestamp=None):
-        """Take the current timestamp and add if to the trace_dict, used to trace the time taken
-        to process events.
-
-        Use with messageId if available
-        """
-        if not self.trace_enabled:
-            return
-
-        if first_timestamp is not None:
-            self.trace_dict[e_id] = [make_datetime(first_timestamp)]
-        try:
-            self.trace_dict[e_id].append(datetime.datetime.utcnow())
-        except KeyError:
-            log.error(
-                'Error making traces for {}. Has the same messageId appeared'
-                'more than once?'.format(e_id)
-            )
-
     async def handle_events(self):
-        """For each event resolve its handler and add it to the queue to be processed"""
+        """For each event resolve its handler and schedule it, waiting for a free slot when
+        max_in_flight handlers are already running"""
         while not self.stop:
             event = await self.queue.get()
 
@@ -377,21 +476,50 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
                 # issue as None will need to be added for each consumer
                 self.queue.task_done()
             else:
-                event_type = str(event['type'])
+                event = DatafeedEvent.from_dict(event)
+                event_type = str(event.type)
                 e_id = self._get_event_id(event)
-                self._add_trace(e_id)
 
                 log.debug('AsyncDataFeedEventService/handle_events() --> event-type:' + event_type)
                 try:
                     route = self.routing_dict[event_type]
                 except KeyError:
                     log.debug('Event with unsupported type ' + event_type + ' detected')
+                    if self.latency_recorder is not None:
+                        self.latency_recorder.discard(e_id)
                     self.queue.task_done()
                     continue
 
-                future = asyncio.ensure_future(route(event))
+                if self.process_pool is not None:
+                    route = self.process_pool.handle_event_async
+
+                await self.in_flight_semaphore.acquire()
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                if self.latency_recorder is not None:
+                    self.latency_recorder.dequeued(e_id)
+                stream_key = self.get_stream_key(event) if self.ordered_by_stream else None
+                if stream_key is None:
+                    future = asyncio.ensure_future(route(event))
+                else:
+                    previous = self.stream_tails.get(stream_key)
+                    future = asyncio.ensure_future(self._route_after(previous, route, event))
+                    self.stream_tails[stream_key] = future
+                    future.add_done_callback(partial(self._release_stream, stream_key))
                 future.add_done_callback(partial(self._check_result, e_id))
 
+    @staticmethod
+    async def _route_after(previous, route, event):
+        """Handle the event once the previous event of the same stream has been handled, whether
+        it succeeded or not"""
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        await route(event)
+
+    def _release_stream(self, stream_key, future):
+        if self.stream_tails.get(stream_key) is future:
+            del self.stream_tails[stream_key]
+
     async def handle_exceptions(self):
         """If exceptions are not excplicitly handled they'll silently fail in the co-routine.
         This method picks results one by one off the queue and checks if they were successful, using
@@ -412,17 +540,15 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
                     else:
                         raise exc
 
-                self._add_trace(e_id)
-                self._process_full_trace(e_id)
                 self.exception_queue.task_done()
 
     async def msg_sent_handler(self, payload):
         """This handler is used for both room messages and IMs. Which listener is invoked
         depends on the streamType"""
         log.debug('async msg_sent_handler function started')
-        stream_type = payload['payload']['messageSent']['message']['stream']['streamType']
-        message_sent_data = payload['payload']['messageSent']['message']
-        if str(stream_type) == 'ROOM':
+        event = MessageSent.wrap(payload)
+        message_sent_data = event.message
+        if event.stream_type == 'ROOM':
             for listener in self.room_listeners:
                 await listener.on_room_msg(message_sent_data)
         else:
@@ -431,83 +557,84 @@ class AsyncDataFeedEventService(AbstractDatafeedEventService):
 
     async def instant_msg_handler(self, payload):
         log.debug('async instant_msg_handler function started')
-        instant_message_data = payload['payload']['instantMessageCreated']
+        instant_message_data = InstantMessageCreated.wrap(payload).data
         for listener in self.im_listeners:
             await listener.on_im_created(instant_message_data)
 
     async def room_created_handler(self, payload):
         log.debug('async room_created_handler function started')
-        room_created_data = payload['payload']['roomCreated']
+        room_created_data = RoomCreated.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_room_created(room_created_data)
 
     async def room_updated_handler(self, payload):
         log.debug('async room_updated_handler')
-        room_updated_data = payload['payload']['roomUpdated']
+        room_updated_data = RoomUpdated.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_room_updated(room_updated_data)
 
     async def room_deactivated_handler(self, payload):
         log.debug('async room_deactivated_handler')
-        room_deactivated_data = payload['payload']['roomDeactivated']
+        room_deactivated_data = RoomDeactivated.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_room_deactivated(room_deactivated_data)
 
     async def room_reactivated_handler(self, payload):
         log.debug('async room_reactivated_handler')
-        room_reactivated_data = payload['payload']['roomReactivated']
+        room_reactivated_data = RoomReactivated.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_room_reactivated(room_reactivated_data)
 
     async def user_joined_room_handler(self, payload):
         log.debug('async user_joined_room_handler')
-        user_joined_room_data = payload['payload']['userJoinedRoom']
+        user_joined_room_data = UserJoinedRoom.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_user_joined_room(user_joined_room_data)
 
     async def user_left_room_handler(self, payload):
         log.debug('async user_left_room_handler')
-        user_left_room_data = payload['payload']['userLeftRoom']
+        user_left_room_data = UserLeftRoom.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_user_left_room(user_left_room_data)
 
     async def promoted_to_owner(self, payload):
         log.debug('async promoted_to_owner')
-        promoted_to_owner_data = payload['payload']['roomMemberPromotedToOwner']
+        promoted_to_owner_data = RoomMemberPromotedToOwner.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_room_member_promoted_to_owner(promoted_to_owner_data)
 
     async def demoted_from_owner(self, payload):
         log.debug('async demoted_from_owner')
-        demoted_to_owner_data = payload['payload']['roomMemberDemotedFromOwner']
+        demoted_to_owner_data = RoomMemberDemotedFromOwner.wrap(payload).data
         for listener in self.room_listeners:
             await listener.on_room_member_demoted_from_owner(demoted_to_owner_data)
 
     async def connection_accepted_handler(self, payload):
         log.debug('async connection_accepted_handler')
-        connection_accepted_data = payload['payload']['connectionAccepted']
+        connection_accepted_data = ConnectionAccepted.wrap(payload).data
         for listener in self.connection_listeners:
             await listener.on_connection_accepted(connection_accepted_data)
 
     async def connection_requested_handler(self, payload):
         log.debug('async connection_requested_handler')
-        connection_requested_data = payload['payload']['connectionRequested']
+        connection_requested_data = ConnectionRequested.wrap(payload).data
         for listener in self.connection_listeners:
             await listener.on_connection_requested(connection_requested_data)
 
     async def elements_action_handler(self, payload):
         log.debug('async elements_action_handler')
+        elements_action_data = ElementsAction.wrap(payload).raw
         for listener in self.elements_listeners:
-            await listener.on_elements_action(payload)
+            await listener.on_elements_action(elements_action_data)
 
     async def shared_post_handler(self, payload):
         log.debug('shared_post_handler')
-        shared_post = payload['payload']['sharedPost']
+        shared_post = SharedPost.wrap(payload).data
         for listener in self.wall_post_listeners:
             await listener.on_shared_post(shared_post)
 
     async def suppressed_message_handler(self, payload):
         log.debug('suppressed_message_handler')
-        message_suppressed = payload['payload']['messageSuppressed']
+        message_suppressed = MessageSuppressed.wrap(payload).data
         for listener in self.suppression_listeners:
             await listener.on_message_suppression(message_suppressed)
@@ -0,0 +1,10 @@
+from .APIClientErrorException import APIClientErrorException
+
+
+class TooManyRequestsException(APIClientErrorException):
+    """A 429 Too Many Requests left once the retries of the call are exhausted. retry_after is the
+    Retry-After of the response in seconds, or None"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,100 @@
+"""JSON encoding and decoding of REST request and response bodies
+
+Responses are decoded straight from the bytes received, without first decoding them to str, and
+request bodies are encoded to bytes. The codec is chosen with the jsonCodec config key:
+    * "auto" (default): orjson if installed, otherwise ujson if installed, otherwise json
+    * "orjson", "ujson": the given library, which must be installed
+    * "json": the standard library
+
+Decoding errors of every codec are ValueErrors, like json.JSONDecodeError.
+"""
+
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+log = logging.getLogger(__name__)
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+class StdlibJsonCodec:
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        # json.loads detects the encoding of bytes itself
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonCodec:
+    name = 'orjson'
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+class UjsonCodec:
+    name = 'ujson'
+
+    @staticmethod
+    def loads(data):
+        return ujson.loads(data)
+
+    @staticmethod
+    def dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+_CODECS = {
+    StdlibJsonCodec.name: (StdlibJsonCodec, lambda: True),
+    OrjsonCodec.name: (OrjsonCodec, lambda: orjson is not None),
+    UjsonCodec.name: (UjsonCodec, lambda: ujson is not None),
+}
+
+
+def get_json_codec(name=None):
+    """Return the codec of the given name, see the module documentation. None means auto"""
+    if name is None or name == 'auto':
+        for codec_name in (OrjsonCodec.name, UjsonCodec.name, StdlibJsonCodec.name):
+            codec, is_installed = _CODECS[codec_name]
+            if is_installed():
+                return codec
+    if name not in _CODECS:
+        raise ValueError('Unknown JSON codec: {}, expecting one of auto, {}'.format(name, ', '.join(_CODECS)))
+    codec, is_installed = _CODECS[name]
+    if not is_installed():
+        raise ImportError('JSON codec {} is configured but {} is not installed'.format(name, name))
+    log.debug('Using JSON codec: {}'.format(name))
+    return codec
+
+
+def encode_json_body(codec, kwargs):
+    """Replace the json keyword argument of a request with a data body encoded by the codec.
+    Returns the updated keyword arguments"""
+    if kwargs.get('json') is None or kwargs.get('data') is not None or kwargs.get('files') is not None:
+        return kwargs
+    kwargs = dict(kwargs)
+    kwargs['data'] = codec.dumps(kwargs.pop('json'))
+    headers = dict(kwargs.get('headers') or {})
+    headers.setdefault('Content-Type', JSON_CONTENT_TYPE)
+    kwargs['headers'] = headers
+    return kwargs
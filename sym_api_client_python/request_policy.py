@@ -0,0 +1,253 @@
+"""Timeouts and hedging of the REST calls of SymBotClient
+
+Each call gets connect and read timeouts according to its class, see classify_request and
+SymConfig.get_request_timeout:
+    * long_poll: datafeed reads, datafeedConnectTimeout and datafeedReadTimeout
+    * lookup: other GETs, lookupTimeout, 30 seconds by default
+    * send: POSTs, PUTs and DELETEs, such as sending messages, sendTimeout, 60 seconds by default
+    * upload: attachments, sent or downloaded, uploadTimeout, 300 seconds by default
+The connect timeout is connectTimeout, 10 seconds by default. A timeout set to 0 disables it. A
+timeout given to execute_rest_call or execute_rest_call_async is used as is.
+
+Idempotent GETs can be hedged: if hedgeDelay is set, in seconds, and the call has not returned by
+then, a second identical call is sent and the first response is used, see RequestHedger. Hedging
+is off by default.
+
+Identical GETs sent concurrently, same path and keyword arguments, are coalesced: only the first
+one is sent and the others wait for its decoded result, see RequestCoalescer. The result is shared
+by the callers and must not be modified. Coalescing is disabled with coalesceRequests set to false.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import aiohttp
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+
+log = logging.getLogger(__name__)
+
+LONG_POLL = 'long_poll'
+LOOKUP = 'lookup'
+SEND = 'send'
+UPLOAD = 'upload'
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_LOOKUP_TIMEOUT = 30
+DEFAULT_SEND_TIMEOUT = 60
+DEFAULT_UPLOAD_TIMEOUT = 300
+
+# Threads running the hedged synchronous calls, both attempts of a call run on them
+DEFAULT_HEDGE_WORKERS = 16
+
+# Datafeed v1 and v2 reads, long-polls answered after up to 30 seconds without events
+DATAFEED_READ_PATH = re.compile(r'^/agent/v\d+/datafeeds?/[^/]+/read$')
+
+_READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def classify_request(method, path, kwargs):
+    """Return the class of a REST call, one of LONG_POLL, LOOKUP, SEND or UPLOAD"""
+    if DATAFEED_READ_PATH.match(path):
+        return LONG_POLL
+    # Messages with attachments are sent as multipart forms, see APIClient.make_mulitpart_form
+    if isinstance(kwargs.get('data'), (MultipartEncoder, aiohttp.MultipartWriter)) or '/attachment' in path:
+        return UPLOAD
+    if method.upper() in _READ_METHODS:
+        return LOOKUP
+    return SEND
+
+
+def get_coalescing_key(method, path, kwargs):
+    """Return a hashable key identifying a REST call for RequestCoalescer, or None if it must not
+    be coalesced: calls other than GETs, datafeed reads and calls with unhashable arguments"""
+    if method.upper() != 'GET' or DATAFEED_READ_PATH.match(path):
+        return None
+    try:
+        key = ('GET', path, _freeze(kwargs))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def to_aiohttp_timeout(timeout):
+    """Convert a timeout of requests, (connect, read) or a number of seconds, to an
+    aiohttp.ClientTimeout"""
+    if isinstance(timeout, aiohttp.ClientTimeout):
+        return timeout
+    if isinstance(timeout, tuple):
+        connect_timeout, read_timeout = timeout
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout, sock_read=read_timeout)
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+class RequestHedger:
+    """Sends a second attempt of a call that has not returned after delay_sec, and returns the
+    first successful response. If both attempts fail the error of the first one is raised.
+
+    Only meant for idempotent calls. The slower synchronous attempt cannot be interrupted and
+    completes in the background, the slower asynchronous one is cancelled.
+
+    hedged counts the calls for which a second attempt was sent, and hedge_wins those for which it
+    returned first. A hedged ratio above a few percents means delay_sec is too low.
+    """
+
+    def __init__(self, delay_sec, max_workers=DEFAULT_HEDGE_WORKERS):
+        self.delay_sec = delay_sec
+        self.max_workers = max_workers
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.delay_sec is not None
+
+    def call(self, function, *args, **kwargs):
+        if not self.enabled:
+            return function(*args, **kwargs)
+        self._count('calls')
+        executor = self._get_executor()
+        first = executor.submit(function, *args, **kwargs)
+        done, _ = wait([first], timeout=self.delay_sec)
+        if done:
+            return first.result()
+        log.debug('RequestHedger/call() --> No response after {}s, sending a second attempt'.format(self.delay_sec))
+        self._count('hedged')
+        second = executor.submit(function, *args, **kwargs)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (first, second):
+                if future in done and future.exception() is None:
+                    if future is second:
+                        self._count('hedge_wins')
+                    return future.result()
+        return first.result()
+
+    async def call_async(self, coroutine_function, *args, **kwargs):
+        if not self.enabled:
+            return await coroutine_function(*args, **kwargs)
+        self._count('calls')
+        first = asyncio.ensure_future(coroutine_function(*args, **kwargs))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.delay_sec)
+            if done:
+                return first.result()
+            log.debug('RequestHedger/call_async() --> No response after {}s, sending a second attempt'
+                      .format(self.delay_sec))
+            self._count('hedged')
+            second = asyncio.ensure_future(coroutine_function(*args, **kwargs))
+            pending = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (first, second):
+                    if task in done and task.exception() is None:
+                        if task is second:
+                            self._count('hedge_wins')
+                        return task.result()
+            return first.result()
+        finally:
+            # The slower attempt, or both if the caller is cancelled
+            for task in pending:
+                task.cancel()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='HedgedRequest')
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class RequestCoalescer:
+    """Shares one call between the callers of identical concurrent calls, identified by a key. The
+    first caller makes the call and the others get its result, or its error.
+
+    Threads and tasks are coalesced separately, tasks of the same event loop only. A cancelled task
+    does not cancel the call for the others.
+
+    calls counts the calls with a key and coalesced those which did not have to be made.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._in_flight_async = {}
+        self._lock = threading.Lock()
+
+    def call(self, key, function, *args, **kwargs):
+        if not self.enabled or key is None:
+            return function(*args, **kwargs)
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            log.debug('RequestCoalescer/call() --> Waiting for the identical call in flight')
+            return future.result()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    async def call_async(self, key, coroutine_function, *args, **kwargs):
+        if not self.enabled or key is None:
+            return await coroutine_function(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.calls += 1
+            task = self._in_flight_async.get(key)
+            if task is None or task.get_loop() is not loop:
+                task = self._in_flight_async[key] = asyncio.ensure_future(coroutine_function(*args, **kwargs))
+                task.add_done_callback(lambda done: self._forget_async(key, done))
+            else:
+                self.coalesced += 1
+                log.debug('RequestCoalescer/call_async() --> Waiting for the identical call in flight')
+        # Shielded so that a cancelled caller does not cancel the call of the others
+        return await asyncio.shield(task)
+
+    def _forget_async(self, key, task):
+        with self._lock:
+            if self._in_flight_async.get(key) is task:
+                del self._in_flight_async[key]
+        if not task.cancelled():
+            # Retrieved even if all the callers were cancelled, to avoid the never retrieved warning
+            task.exception()
@@ -0,0 +1,106 @@
+"""Cache of the responses of the pod lookups which rarely change
+
+The cached endpoints and the config keys of their time to live in seconds, 0 disabling the cache:
+    * USER: get_user_from_id, get_user_from_email, get_user_from_user_name, userCacheTtl, 60 by default
+    * STREAM: stream_info_v2, streamCacheTtl, 60 by default
+    * ROOM: get_room_info, roomCacheTtl, 60 by default
+    * ATTACHMENT_TYPES: get_supported_attachment_types, attachmentTypesCacheTtl, 3600 by default
+    * POD_FEATURES: admin_list_pod_features, podFeaturesCacheTtl, 3600 by default
+The cache holds up to responseCacheSize responses, 10000 by default, the least recently used ones
+being evicted first. Updates made through the clients, such as update_room or admin_update_user,
+invalidate the responses they change. Cached responses are shared and must not be modified.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+USER = 'user'
+STREAM = 'stream'
+ROOM = 'room'
+ATTACHMENT_TYPES = 'attachmentTypes'
+POD_FEATURES = 'podFeatures'
+
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_TTLS = {
+    USER: 60,
+    STREAM: 60,
+    ROOM: 60,
+    ATTACHMENT_TYPES: 3600,
+    POD_FEATURES: 3600,
+}
+
+
+class ResponseCache:
+    """LRU cache of responses with a time to live per endpoint, shared by threads and event loops.
+
+    Keys are the request keys of request_policy.get_coalescing_key. hits and misses count the
+    lookups of endpoints with a time to live, evictions the responses evicted to make room.
+    """
+
+    def __init__(self, ttls, max_size=DEFAULT_CACHE_SIZE):
+        """ttls: {endpoint: seconds}, endpoints without a time to live are not cached"""
+        self.ttls = {endpoint: ttl for endpoint, ttl in ttls.items() if ttl}
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key: (endpoint, expiry as a time.monotonic() value, response), least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_cached(self, endpoint, key):
+        return key is not None and endpoint in self.ttls and self.max_size > 0
+
+    def get(self, key):
+        """Return (True, response) if a fresh response is cached, (False, None) otherwise"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, endpoint, key, response):
+        with self._lock:
+            self._entries[key] = (endpoint, time.monotonic() + self.ttls[endpoint], response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, endpoint=None, match=None):
+        """Remove the responses of endpoint, of all of them if None, for which match(key,
+        response) is true, all of them if match is None. Returns the number of responses removed"""
+        with self._lock:
+            keys = [key for key, (entry_endpoint, _, response) in self._entries.items()
+                    if (endpoint is None or entry_endpoint == endpoint) and (match is None or match(key, response))]
+            for key in keys:
+                del self._entries[key]
+        if keys:
+            log.debug('ResponseCache/invalidate() --> {} responses of {} removed'.format(len(keys), endpoint or 'all'))
+        return len(keys)
+
+    def invalidate_stream(self, stream_id):
+        """Remove the stream and room information of a stream"""
+        segment = '/{}/'.format(stream_id)
+        return sum(self.invalidate(endpoint, lambda key, response: segment in key[1]) for endpoint in (STREAM, ROOM))
+
+    def invalidate_user(self, user_id):
+        """Remove the responses about a user, whether looked up by id, email or user name"""
+        def is_user(key, response):
+            return isinstance(response, dict) and str(response.get('id')) == str(user_id)
+        return self.invalidate(USER, is_user)
+
+    def clear(self):
+        return self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
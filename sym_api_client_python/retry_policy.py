@@ -0,0 +1,154 @@
+"""Client side rate limiting and retries of the REST calls of SymBotClient
+
+Calls are grouped in endpoint families, see get_endpoint_family: message sends, other agent calls
+and pod calls. Each family can be rate limited by a token bucket allowing messageRateLimit,
+agentRateLimit or podRateLimit calls per second, with bursts of as many calls. Families are not
+rate limited by default. A 429 pauses its whole family for the Retry-After of the response.
+
+Failed calls are retried up to maxRetries times, 3 by default, see RetryPolicy:
+    * 429 Too Many Requests, after the Retry-After of the response if it is at most maxRetryAfter
+      seconds, 60 by default, otherwise after the backoff. The call was rejected without being
+      processed so it is retried whatever its method
+    * 5xx, connection errors and timeouts, after an exponential backoff with full jitter, for
+      idempotent methods only unless retryNonIdempotent is true: a message send that timed out
+      may have been sent
+Datafeed reads, retried by the datafeed event services, and uploads, whose body is a stream that
+cannot be sent twice, are never retried.
+"""
+
+import email.utils
+import logging
+import random
+import re
+import threading
+import time
+
+from .request_policy import LONG_POLL, UPLOAD
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_RETRY_AFTER_SEC = 60
+BACKOFF_BASE_SEC = 0.5
+BACKOFF_MAX_SEC = 30
+
+MESSAGE = 'message'
+AGENT = 'agent'
+POD = 'pod'
+DATAFEED = 'datafeed'
+
+_IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+_MESSAGE_PATH = re.compile(r'^/agent/v\d+/(stream/[^/]+/message/create|message/import)')
+
+
+def get_endpoint_family(path, request_class):
+    """Return the family of a call for rate limiting: MESSAGE, AGENT, POD or DATAFEED"""
+    if request_class == LONG_POLL:
+        return DATAFEED
+    if _MESSAGE_PATH.match(path):
+        return MESSAGE
+    if path.startswith('/pod/'):
+        return POD
+    return AGENT
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header, in seconds or an HTTP date, or None"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class TokenBucket:
+    """Allows rate calls per second on average, and bursts of up to capacity calls. Shared by
+    threads and event loops: reserve returns how long the caller must wait before its call"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Tokens may go negative, callers queue up behind the ones already waiting
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class RateLimiter:
+    """Token buckets per endpoint family, see the module documentation"""
+
+    def __init__(self, rates):
+        """rates: {family: calls per second}, families without a rate are not limited"""
+        self._buckets = {family: TokenBucket(rate) for family, rate in rates.items() if rate}
+        # Families paused by a 429, rate limited or not, until a time.monotonic() value
+        self._paused_until = {}
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def reserve(self, family):
+        """Seconds to wait before sending a call of the family"""
+        bucket = self._buckets.get(family)
+        delay = bucket.reserve() if bucket is not None else 0.0
+        delay = max(delay, self._paused_until.get(family, 0.0) - time.monotonic())
+        if delay > 0:
+            self.throttled += 1
+            log.debug('RateLimiter/reserve() --> {} call delayed by {:.3f}s'.format(family, delay))
+        return delay
+
+    def pause(self, family, seconds):
+        """Make every call of the family wait at least seconds, after a 429"""
+        with self._lock:
+            self._paused_until[family] = max(self._paused_until.get(family, 0.0), time.monotonic() + seconds)
+
+
+class RetryPolicy:
+    """Decides whether and when a failed call is retried, see the module documentation"""
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, retry_non_idempotent=False,
+                 max_retry_after_sec=DEFAULT_MAX_RETRY_AFTER_SEC):
+        self.max_retries = max_retries
+        self.retry_non_idempotent = retry_non_idempotent
+        self.max_retry_after_sec = max_retry_after_sec
+        self.retries = 0
+
+    def get_retry_delay(self, method, request_class, attempt, status=None, retry_after=None):
+        """Seconds to wait before retrying a call that got status, or failed to connect or timed
+        out if status is None, or None if it must not be retried. attempt counts from 0"""
+        if request_class in (LONG_POLL, UPLOAD) or attempt >= self.max_retries:
+            return None
+        if status == 429:
+            retry_after = parse_retry_after(retry_after)
+            if retry_after is not None and retry_after <= self.max_retry_after_sec:
+                return self._retrying(retry_after)
+            return self._retrying(self.get_backoff(attempt))
+        if status is not None and status < 500:
+            return None
+        if method.upper() not in _IDEMPOTENT_METHODS and not self.retry_non_idempotent:
+            return None
+        return self._retrying(self.get_backoff(attempt))
+
+    @staticmethod
+    def get_backoff(attempt):
+        """Exponential backoff with full jitter, so that clients throttled together do not retry
+        together"""
+        return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** attempt))
+
+    def _retrying(self, delay):
+        self.retries += 1
+        return delay
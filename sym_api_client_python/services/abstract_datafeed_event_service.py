@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
 import logging
 
+from .datafeed_events import (
+    DatafeedEvent, ConnectionAccepted, ConnectionRequested, ElementsAction,
+    InstantMessageCreated, MessageSent, MessageSuppressed, RoomCreated, RoomDeactivated,
+    RoomMemberDemotedFromOwner, RoomMemberPromotedToOwner, RoomReactivated, RoomUpdated,
+    SharedPost, UserJoinedRoom, UserLeftRoom)
 from .datafeed_id_repository import OnDiskDatafeedIdRepository
+from .event_deduplicator import EventDeduplicator, DEFAULT_MAX_SIZE as DEFAULT_DEDUPLICATION_SIZE
+from .event_dispatcher import ThreadPoolEventDispatcher, DEFAULT_MAX_PENDING_EVENTS
+from .room_index import normalize_stream_id
+from .prefetching_reader import PrefetchingDatafeedReader, DEFAULT_HIGH_WATERMARK, DEFAULT_LOW_WATERMARK
 from ..listeners.elements_listener import ElementsActionListener
 from ..listeners.connection_listener import ConnectionListener
 from ..listeners.im_listener import IMListener
 from ..listeners.room_listener import RoomListener
+from ..listeners.suppression_listener import SuppressionListener
+from ..listeners.wall_post_listener import WallPostListener
 
 from ..auth.auth_endpoint_constants import auth_endpoint_constants
 
@@ -14,7 +25,28 @@ log = logging.getLogger(__name__)
 
 class AbstractDatafeedEventService(ABC):
 
-    def __init__(self, sym_bot_client, error_timeout_sec=None, maximum_timeout_sec=None):
+    def __init__(self, sym_bot_client, error_timeout_sec=None, maximum_timeout_sec=None, ordered_by_stream=None,
+                 thread_pool_size=None, max_pending_events=None, prefetch=None, prefetch_high_watermark=None,
+                 prefetch_low_watermark=None, process_pool=None, deduplicate_events=None,
+                 deduplication_size=None, deduplication_ttl_sec=None):
+        """
+        ordered_by_stream: handle the events of a conversation in order, see get_stream_key
+        thread_pool_size: synchronous services only, handle events on a pool of this many threads
+                          instead of the thread reading the datafeed
+        max_pending_events: synchronous services only, number of events submitted to the thread
+                            pool before reading the datafeed is paused
+        prefetch: synchronous services only, read the datafeed on a dedicated thread into a buffer
+                  so slow listeners do not delay reads, see PrefetchingDatafeedReader
+        prefetch_high_watermark, prefetch_low_watermark: reads are paused when the buffer reaches
+                                                         the high watermark and resumed once it is
+                                                         down to the low watermark
+        process_pool: a ProcessPoolEventDispatcher handling events in worker processes, with
+                      listeners of their own. Not configurable from the config
+        deduplicate_events: drop events whose id was already seen, see EventDeduplicator
+        deduplication_size, deduplication_ttl_sec: number of ids remembered and how long for
+
+        Each parameter can also be set in the config, see _get_option for the keys.
+        """
         self.datafeed_events = []
         self.room_listeners = []
         self.im_listeners = []
@@ -71,6 +103,32 @@ class AbstractDatafeedEventService(ABC):
         # After every failure multiply the timeout by a factor
         self.timeout_multiplier = 2
 
+        self.ordered_by_stream = self._get_option(ordered_by_stream, 'datafeedEventsOrderedByStream', False)
+        self.thread_pool_size = self._get_option(thread_pool_size, 'datafeedEventsThreadPoolSize', None)
+        self.max_pending_events = self._get_option(max_pending_events, 'datafeedEventsMaxPendingEvents',
+                                                   DEFAULT_MAX_PENDING_EVENTS)
+        self.event_dispatcher = None
+        self.prefetch = self._get_option(prefetch, 'datafeedPrefetch', False)
+        self.prefetch_high_watermark = self._get_option(prefetch_high_watermark, 'datafeedPrefetchHighWatermark',
+                                                        DEFAULT_HIGH_WATERMARK)
+        self.prefetch_low_watermark = self._get_option(prefetch_low_watermark, 'datafeedPrefetchLowWatermark',
+                                                       DEFAULT_LOW_WATERMARK)
+        self.prefetching_reader = None
+        self.process_pool = process_pool
+        self.event_deduplicator = None
+        if self._get_option(deduplicate_events, 'datafeedEventsDeduplication', False):
+            self.event_deduplicator = EventDeduplicator(
+                self._get_option(deduplication_size, 'datafeedEventsDeduplicationSize', DEFAULT_DEDUPLICATION_SIZE),
+                self._get_option(deduplication_ttl_sec, 'datafeedEventsDeduplicationTtl', None))
+
+    def _get_option(self, value, config_key, default):
+        """Return the parameter value if given, otherwise the value from the config or the default"""
+        if value is None:
+            return self.config.data.get(config_key, default)
+        if config_key in self.config.data:
+            log.debug('{} listed in config, but overriden to {} by parameter'.format(config_key, value))
+        return value
+
     @abstractmethod
     def start_datafeed(self):
         pass
@@ -79,9 +137,15 @@ class AbstractDatafeedEventService(ABC):
         if self.stop:
             self.stop = False
 
-    def deactivate_datafeed(self):
+    def deactivate_datafeed(self, wait_for_handler_completions=True):
+        """Stop reading the datafeed. When events are dispatched to a thread pool, wait for the
+        pending ones to be handled unless called from a listener"""
         if not self.stop:
             self.stop = True
+        self.bot_client.room_index.reset()
+        dispatcher = self.process_pool or self.event_dispatcher
+        if wait_for_handler_completions and dispatcher is not None and not dispatcher.is_dispatcher_thread():
+            dispatcher.wait_until_idle()
 
     ### Listeners ###
     def add_listeners(self, *listeners):
@@ -94,6 +158,10 @@ class AbstractDatafeedEventService(ABC):
                 self.add_im_listener(listener)
             elif isinstance(listener, RoomListener):
                 self.add_room_listener(listener)
+            elif isinstance(listener, WallPostListener):
+                self.add_wall_post_listener(listener)
+            elif isinstance(listener, SuppressionListener):
+                self.add_suppression_listener(listener)
 
     def remove_listeners(self, *listeners):
         for listener in listeners:
@@ -105,6 +173,10 @@ class AbstractDatafeedEventService(ABC):
                 self.remove_im_listener(listener)
             elif isinstance(listener, RoomListener):
                 self.remove_room_listener(listener)
+            elif isinstance(listener, WallPostListener):
+                self.remove_wall_post_listener(listener)
+            elif isinstance(listener, SuppressionListener):
+                self.remove_suppression_listener(listener)
 
     def add_room_listener(self, room_listener):
         self.room_listeners.append(room_listener)
@@ -156,16 +228,130 @@ class AbstractDatafeedEventService(ABC):
         for event in events:
             if event is None:
                 continue
-            
+
+            event = DatafeedEvent.from_dict(event)
             log.debug(
                 'DataFeedEventService/read_datafeed() --> '
-                'Incoming event with id: {}'.format(event.get('id'))
+                'Incoming event with id: {}'.format(event.id)
             )
-            
-            if event['initiator']['user']['userId'] == self.bot_client.get_bot_user_info()['id']:
+
+            if event.initiator_user_id == self.bot_client.get_bot_user_info()['id']:
+                continue
+            elif self.is_duplicate_event(event):
                 continue
             else:
-                self.handle_event(event)
+                self.dispatch_event(event)
+
+    def update_room_index(self, events, bot_id):
+        """Apply the events of a successful read, possibly none, to the room index of the bot
+        client, including the events of the bot, and invalidate the cached information of the rooms
+        they change, see RoomIndex. Called when the events are read, before they are handled"""
+        for stream_id in self.bot_client.room_index.apply_events(events, bot_id):
+            for cached_stream_id in {stream_id, normalize_stream_id(stream_id)}:
+                self.bot_client.response_cache.invalidate_stream(cached_stream_id)
+
+    def reset_room_index(self):
+        """Called when the datafeed is recreated, events may have been missed"""
+        self.bot_client.room_index.reset()
+
+    def is_duplicate_event(self, event):
+        """True if event deduplication is enabled and the event was already received"""
+        if self.event_deduplicator is None or not self.event_deduplicator.is_duplicate(event):
+            return False
+        log.debug('DataFeedEventService --> Dropping duplicate event with id: {}'
+                  .format(self.event_deduplicator.get_key(event)))
+        return True
+
+    def dispatch_event(self, event):
+        """Handle the event on the current thread, on the thread pool if thread_pool_size is set or
+        in a worker process if a process_pool is set"""
+        if self.process_pool is not None:
+            stream_key = self.get_stream_key(event) if self.ordered_by_stream else None
+            self.process_pool.submit(event, stream_key)
+            return
+
+        if not self.thread_pool_size:
+            self.handle_event(event)
+            return
+
+        if self.event_dispatcher is None:
+            log.debug('DataFeedEventService/dispatch_event() --> Starting pool of {} threads'
+                      .format(self.thread_pool_size))
+            self.event_dispatcher = ThreadPoolEventDispatcher(self.thread_pool_size, self.max_pending_events)
+        stream_key = self.get_stream_key(event) if self.ordered_by_stream else None
+        self.event_dispatcher.submit(self.handle_event, event, stream_key)
+
+    def _read_events(self):
+        """Read the datafeed once, handling errors, and return the events read. Implemented by the
+        synchronous services to be used by _read_and_handle_events"""
+        raise NotImplementedError()
+
+    def _read_and_handle_events(self):
+        """Read the datafeed and handle its events until the datafeed is deactivated. Events still
+        pending in the thread pool are handled before returning"""
+        try:
+            if self.prefetch:
+                self._prefetch_and_handle_events()
+            else:
+                while not self.stop:
+                    events = self._read_events()
+                    if events:
+                        self.handle_events(events)
+        finally:
+            self.drain_events()
+
+    def _prefetch_and_handle_events(self):
+        """Let a PrefetchingDatafeedReader read the datafeed on its own thread and handle the
+        events it buffers on this thread. Events already read when the datafeed is deactivated
+        are still handled. A v2 datafeed acknowledges events once they are buffered"""
+        self.prefetching_reader = PrefetchingDatafeedReader(self._read_events, lambda: self.stop,
+                                                            self.prefetch_high_watermark,
+                                                            self.prefetch_low_watermark)
+        self.prefetching_reader.start()
+        while True:
+            if self.stop:
+                self.prefetching_reader.wake_up()
+            events = self.prefetching_reader.get_events(timeout=1)
+            if events:
+                self.handle_events(events)
+            elif not self.prefetching_reader.is_alive():
+                break
+        log.debug('DataFeedEventService/_prefetch_and_handle_events() --> Reader stopped: {}'
+                  .format(self.prefetching_reader.get_stats()))
+
+    def drain_events(self):
+        """Wait for the events submitted to the thread or process pool to be handled, then release
+        its threads or processes"""
+        if self.process_pool is not None:
+            log.debug('DataFeedEventService/drain_events() --> Waiting for {} events in worker processes'
+                      .format(self.process_pool.pending_events))
+            self.process_pool.shutdown(wait=True)
+        dispatcher, self.event_dispatcher = self.event_dispatcher, None
+        if dispatcher is not None:
+            log.debug('DataFeedEventService/drain_events() --> Waiting for {} events'
+                      .format(dispatcher.pending_events))
+            dispatcher.shutdown(wait=not dispatcher.is_dispatcher_thread())
+
+    @staticmethod
+    def get_stream_key(event):
+        """Return the id of the conversation an event belongs to, or None if it is not tied to a
+        stream (connections, shared posts). Elements actions use their stream, falling back on the
+        formStream and actionStream. Ids are normalised to the URL safe form used by the API so
+        events of one conversation always share the same key.
+        """
+        payload = event.get('payload')
+        if not payload:
+            return None
+        for event_data in payload.values():
+            if not isinstance(event_data, dict):
+                continue
+            if isinstance(event_data.get('message'), dict):
+                event_data = event_data['message']
+            for stream_field in ('stream', 'formStream', 'actionStream'):
+                stream = event_data.get(stream_field)
+                if isinstance(stream, dict) and stream.get('streamId'):
+                    return stream['streamId'].rstrip('=').replace('/', '_').replace('+', '-')
+        return None
 
     # function takes in single event --> Checks eventType --> forwards event
     # to proper handling function there is a handle_event function that
@@ -186,12 +372,13 @@ class AbstractDatafeedEventService(ABC):
         """This handler is used for both room messages and IMs. Which listener is invoked
         depends on the streamType"""
         log.debug('msg_sent_handler function started')
-        stream_type = payload['payload']['messageSent']['message']['stream']['streamType']
-        message_sent_data = payload['payload']['messageSent']['message']
-        if str(stream_type) == 'ROOM':
+        event = MessageSent.wrap(payload)
+        stream_type = event.stream_type
+        message_sent_data = event.message
+        if stream_type == 'ROOM':
             for listener in self.room_listeners:
                 listener.on_room_msg(message_sent_data)
-        elif str(stream_type) == 'POST':
+        elif stream_type == 'POST':
             for listener in self.wall_post_listeners:
                 listener.on_wall_post_msg(message_sent_data)
         else:
@@ -200,84 +387,85 @@ class AbstractDatafeedEventService(ABC):
 
     def instant_msg_handler(self, payload):
         log.debug('instant_msg_handler function started')
-        instant_message_data = payload['payload']['instantMessageCreated']
+        instant_message_data = InstantMessageCreated.wrap(payload).data
         for listener in self.im_listeners:
             listener.on_im_created(instant_message_data)
 
     def room_created_handler(self, payload):
         log.debug('room_created_handler function started')
-        room_created_data = payload['payload']['roomCreated']
+        room_created_data = RoomCreated.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_room_created(room_created_data)
 
     def room_updated_handler(self, payload):
         log.debug('room_updated_handler')
-        room_updated_data = payload['payload']['roomUpdated']
+        room_updated_data = RoomUpdated.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_room_updated(room_updated_data)
 
     def room_deactivated_handler(self, payload):
         log.debug('room_deactivated_handler')
-        room_deactivated_data = payload['payload']['roomDeactivated']
+        room_deactivated_data = RoomDeactivated.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_room_deactivated(room_deactivated_data)
 
     def room_reactivated_handler(self, payload):
         log.debug('room_reactivated_handler')
-        room_reactivated_data = payload['payload']['roomReactivated']
+        room_reactivated_data = RoomReactivated.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_room_reactivated(room_reactivated_data)
 
     def user_joined_room_handler(self, payload):
         log.debug('user_joined_room_handler')
-        user_joined_room_data = payload['payload']['userJoinedRoom']
+        user_joined_room_data = UserJoinedRoom.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_user_joined_room(user_joined_room_data)
 
     def user_left_room_handler(self, payload):
         log.debug('user_left_room_handler')
-        user_left_room_data = payload['payload']['userLeftRoom']
+        user_left_room_data = UserLeftRoom.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_user_left_room(user_left_room_data)
 
     def promoted_to_owner(self, payload):
         log.debug('promoted_to_owner')
-        promoted_to_owner_data = payload['payload']['roomMemberPromotedToOwner']
+        promoted_to_owner_data = RoomMemberPromotedToOwner.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_room_member_promoted_to_owner(promoted_to_owner_data)
 
     def demoted_from_owner(self, payload):
         log.debug('demoted_from_owner')
-        demoted_from_owner_data = payload['payload']['roomMemberDemotedFromOwner']
+        demoted_from_owner_data = RoomMemberDemotedFromOwner.wrap(payload).data
         for listener in self.room_listeners:
             listener.on_room_member_demoted_from_owner(demoted_from_owner_data)
 
     def connection_accepted_handler(self, payload):
         log.debug('connection_accepted_handler')
-        connection_accepted_data = payload['payload']['connectionAccepted']
+        connection_accepted_data = ConnectionAccepted.wrap(payload).data
         for listener in self.connection_listeners:
             listener.on_connection_accepted(connection_accepted_data)
 
     def connection_requested_handler(self, payload):
         log.debug('connection_requested_handler')
-        connection_requested_data = payload['payload']['connectionRequested']
+        connection_requested_data = ConnectionRequested.wrap(payload).data
         for listener in self.connection_listeners:
             listener.on_connection_requested(connection_requested_data)
 
     def elements_action_handler(self, payload):
         log.debug('elements_action_handler')
+        elements_action_data = ElementsAction.wrap(payload).raw
         for listener in self.elements_listeners:
-            listener.on_elements_action(payload)
+            listener.on_elements_action(elements_action_data)
 
     def shared_post_handler(self, payload):
         log.debug('shared_post_handler')
-        shared_post = payload['payload']['sharedPost']
+        shared_post = SharedPost.wrap(payload).data
         for listener in self.wall_post_listeners:
             listener.on_shared_post(shared_post)
 
     def suppressed_message_handler(self, payload):
         log.debug('suppressed_message_handler')
-        message_suppressed = payload['payload']['messageSuppressed']
+        message_suppressed = MessageSuppressed.wrap(payload).data
         for listener in self.suppression_listeners:
             listener.on_message_suppression(message_suppressed)
 
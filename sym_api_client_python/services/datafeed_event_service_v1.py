@@ -23,35 +23,32 @@ class DataFeedEventServiceV1(AbstractDatafeedEventService):
         self.datafeed_id = self._get_from_file_or_create_datafeed_id()
         self.read_datafeed()
 
-    def activate_datafeed(self):
-        if self.stop:
-            self.stop = False
-
-    def deactivate_datafeed(self):
-        if not self.stop:
-            self.stop = True
-
     def read_datafeed(self):
         """
             Read_datafeed function reads an array of events coming back from DataFeedClient.
 
             The json objects returned from read_datafeed() gets passed to handle_events().
+            When the datafeed is deactivated, events still pending in the thread pool are
+            handled before returning.
         """
-        while not self.stop:
-            try:
-                events = self.datafeed_client.read_datafeed(self.datafeed_id)
-            except Exception as exc:
-                self.handle_datafeed_errors(exc)
-                continue
+        self._read_and_handle_events()
 
-            self.decrease_timeout()
-            if events:
-                self.handle_events(events)
-            else:
-                log.debug(
-                    'DataFeedEventService() - no data coming in from '
-                    'datafeed: {}'.format(self.datafeed_id)
-                )
+    def _read_events(self):
+        try:
+            events = self.datafeed_client.read_datafeed(self.datafeed_id)
+        except Exception as exc:
+            self.handle_datafeed_errors(exc)
+            return []
+
+        self.decrease_timeout()
+        self.update_room_index(events or [], self.bot_client.get_bot_user_info()['id'])
+        if not events:
+            log.debug(
+                'DataFeedEventService() - no data coming in from '
+                'datafeed: {}'.format(self.datafeed_id)
+            )
+            return []
+        return events
 
     ### Handling errors ###
     def handle_datafeed_errors(self, thrown_exception):
@@ -72,6 +69,7 @@ class DataFeedEventServiceV1(AbstractDatafeedEventService):
             log.error('DataFeedEventService - ' + str(exc))
         except Exception as exc:
             log.exception('DataFeedEventService - Unknown exception: ' + str(exc))
+        self.reset_room_index()
         sleep_for = self.get_and_increase_timeout(thrown_exception)
         log.debug('DataFeedEventService/handle_event() --> Sleeping for {:.4g}s'.format(sleep_for))
         time.sleep(sleep_for)
@@ -23,19 +23,13 @@ class DataFeedEventServiceV2(AbstractDatafeedEventService):
         log.debug('DataFeedEventServiceV2/startDataFeed()')
         self.read_datafeed()
 
-    def activate_datafeed(self):
-        if self.stop:
-            self.stop = False
-
-    def deactivate_datafeed(self):
-        if not self.stop:
-            self.stop = True
-
     def read_datafeed(self):
         """
             Read_datafeed function reads an array of events coming back from DataFeedClient.
 
             The json objects returned from read_datafeed() gets passed to handle_events().
+            When the datafeed is deactivated, events still pending in the thread pool are
+            handled before returning.
         """
         datafeed_ids = self.datafeed_client.list_datafeed_id()
 
@@ -44,23 +38,25 @@ class DataFeedEventServiceV2(AbstractDatafeedEventService):
         else:
             self.datafeed_id = datafeed_ids[0].get("id")
 
-        while not self.stop:
-            try:
-                events = self.datafeed_client.read_datafeed(self.datafeed_id, self.datafeed_client.get_ack_id())
-            except Exception as exc:
-                self.handle_datafeed_errors(exc)
-                continue
+        self._read_and_handle_events()
 
-            self.decrease_timeout()
+    def _read_events(self):
+        try:
+            events = self.datafeed_client.read_datafeed(self.datafeed_id, self.datafeed_client.get_ack_id())
+        except Exception as exc:
+            self.handle_datafeed_errors(exc)
+            return []
 
-            if events and events != [None]:
-                self.handle_events(events)
-            else:
-                log.debug(
-                    'DataFeedEventServiceV2() - no data coming in from '
-                    'datafeed: {}'.format(self.datafeed_id)
-                )
+        self.decrease_timeout()
+        self.update_room_index(events or [], self.bot_client.get_bot_user_info()['id'])
 
+        if events and events != [None]:
+            return events
+        log.debug(
+            'DataFeedEventServiceV2() - no data coming in from '
+            'datafeed: {}'.format(self.datafeed_id)
+        )
+        return []
 
     def handle_datafeed_errors(self, thrown_exception):
         """Various errors may get thrown by the datafeed reader, from 500s when a server node is
@@ -80,6 +76,7 @@ class DataFeedEventServiceV2(AbstractDatafeedEventService):
             log.error('DataFeedEventService - ' + str(exc))
         except Exception as exc:
             log.exception('DataFeedEventService - Unknown exception: ' + str(exc))
+        self.reset_room_index()
         sleep_for = self.get_and_increase_timeout(thrown_exception)
         log.debug('DataFeedEventService/handle_event() --> Sleeping for {:.4g}s'.format(sleep_for))
         time.sleep(sleep_for)
@@ -89,6 +86,7 @@ class DataFeedEventServiceV2(AbstractDatafeedEventService):
             self.datafeed_client.delete_datafeed(self.datafeed_id)
         except Exception as exc:
             self.handle_datafeed_errors(exc)
+        self.datafeed_client.reset_ack_id()
 
         try:
             log.debug('DataFeedEventServiceV2/handle_event() --> Restarting Datafeed')
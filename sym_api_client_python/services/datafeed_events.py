@@ -0,0 +1,225 @@
+"""Typed datafeed events
+
+The datafeed returns events as nested dicts. DatafeedEvent.from_dict wraps such a dict once, when
+the event is read, in a small __slots__ object exposing the fields the datafeed event services
+use, so that routing an event does not walk the same nested dicts several times. Fields are only
+looked up on first access and then kept on the object.
+
+The dict is kept as raw and is what listeners receive, so listeners and SymMessageParser or
+SymElementsParser are unaffected. For code written against dicts, events also support
+event['payload'], event.get('id') and 'messageId' in event, which read the raw dict.
+"""
+
+# Marks a lazily decoded field that was not accessed yet, None being a valid value
+_UNSET = object()
+
+
+class DatafeedEvent:
+    """Event of a type without a dedicated class. Subclasses set payload_field to the key of their
+    data under payload, for instance messageSent"""
+
+    __slots__ = ('raw', '_data', '_initiator_user_id')
+
+    payload_field = None
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._data = _UNSET
+        self._initiator_user_id = _UNSET
+
+    @staticmethod
+    def from_dict(event):
+        """Wrap an event dict in the class of its type. Events already wrapped are returned as is"""
+        if isinstance(event, DatafeedEvent):
+            return event
+        return _EVENT_CLASSES.get(event.get('type'), DatafeedEvent)(event)
+
+    @classmethod
+    def wrap(cls, event):
+        """Return the event as an instance of this class, whatever its type field says. Used by the
+        handlers, which may be called directly with a dict"""
+        if isinstance(event, cls):
+            return event
+        return cls(event.raw if isinstance(event, DatafeedEvent) else event)
+
+    @property
+    def type(self):
+        return self.raw.get('type')
+
+    @property
+    def id(self):
+        return self.raw.get('id')
+
+    @property
+    def message_id(self):
+        return self.raw.get('messageId')
+
+    @property
+    def timestamp(self):
+        return self.raw.get('timestamp')
+
+    @property
+    def initiator_user_id(self):
+        if self._initiator_user_id is _UNSET:
+            self._initiator_user_id = self.raw['initiator']['user']['userId']
+        return self._initiator_user_id
+
+    @property
+    def data(self):
+        """The type specific part of the event, for instance payload['messageSent'] for a
+        MESSAGESENT event. None for events without a dedicated class"""
+        if self._data is _UNSET:
+            self._data = self.raw['payload'][self.payload_field] if self.payload_field else None
+        return self._data
+
+    # Read only access to the raw dict, for code written against dicts
+    def __getitem__(self, key):
+        return self.raw[key]
+
+    def __contains__(self, key):
+        return key in self.raw
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default)
+
+    def __reduce__(self):
+        # Only the dict is pickled, for instance when sent to a ProcessPoolEventDispatcher
+        return DatafeedEvent.from_dict, (self.raw,)
+
+    def __repr__(self):
+        return '{}(id={!r})'.format(type(self).__name__, self.id)
+
+
+class MessageSent(DatafeedEvent):
+    __slots__ = ('_message',)
+
+    payload_field = 'messageSent'
+
+    def __init__(self, raw):
+        super().__init__(raw)
+        self._message = _UNSET
+
+    @property
+    def message(self):
+        """The message_data given to the room, IM and wall post listeners"""
+        if self._message is _UNSET:
+            self._message = self.data['message']
+        return self._message
+
+    @property
+    def stream_id(self):
+        return self.message['stream']['streamId']
+
+    @property
+    def stream_type(self):
+        return str(self.message['stream']['streamType'])
+
+
+class MessageSuppressed(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'messageSuppressed'
+
+
+class InstantMessageCreated(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'instantMessageCreated'
+
+
+class RoomCreated(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'roomCreated'
+
+
+class RoomUpdated(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'roomUpdated'
+
+
+class RoomDeactivated(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'roomDeactivated'
+
+
+class RoomReactivated(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'roomReactivated'
+
+
+class RoomMembershipEvent(DatafeedEvent):
+    """Base of the events about a member of a room"""
+    __slots__ = ()
+
+    @property
+    def stream_id(self):
+        return self.data['stream']['streamId']
+
+    @property
+    def affected_user_id(self):
+        return self.data['affectedUser']['userId']
+
+
+class UserJoinedRoom(RoomMembershipEvent):
+    __slots__ = ()
+    payload_field = 'userJoinedRoom'
+
+
+class UserLeftRoom(RoomMembershipEvent):
+    __slots__ = ()
+    payload_field = 'userLeftRoom'
+
+
+class RoomMemberPromotedToOwner(RoomMembershipEvent):
+    __slots__ = ()
+    payload_field = 'roomMemberPromotedToOwner'
+
+
+class RoomMemberDemotedFromOwner(RoomMembershipEvent):
+    __slots__ = ()
+    payload_field = 'roomMemberDemotedFromOwner'
+
+
+class ConnectionAccepted(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'connectionAccepted'
+
+
+class ConnectionRequested(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'connectionRequested'
+
+
+class ElementsAction(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'symphonyElementsAction'
+
+    @property
+    def form_id(self):
+        return self.data.get('formId')
+
+    @property
+    def form_values(self):
+        return self.data.get('formValues')
+
+
+class SharedPost(DatafeedEvent):
+    __slots__ = ()
+    payload_field = 'sharedPost'
+
+
+_EVENT_CLASSES = {
+    'MESSAGESENT': MessageSent,
+    'MESSAGESUPPRESSED': MessageSuppressed,
+    'INSTANTMESSAGECREATED': InstantMessageCreated,
+    'ROOMCREATED': RoomCreated,
+    'ROOMUPDATED': RoomUpdated,
+    'ROOMDEACTIVATED': RoomDeactivated,
+    'ROOMREACTIVATED': RoomReactivated,
+    'USERJOINEDROOM': UserJoinedRoom,
+    'USERLEFTROOM': UserLeftRoom,
+    'ROOMMEMBERPROMOTEDTOOWNER': RoomMemberPromotedToOwner,
+    'ROOMMEMBERDEMOTEDFROMOWNER': RoomMemberDemotedFromOwner,
+    'CONNECTIONACCEPTED': ConnectionAccepted,
+    'CONNECTIONREQUESTED': ConnectionRequested,
+    'SYMPHONYELEMENTSACTION': ElementsAction,
+    'SHAREDPOST': SharedPost,
+}
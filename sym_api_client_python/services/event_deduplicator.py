@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 10000
+
+
+class EventDeduplicator:
+    """Remembers the ids of the latest events to detect events delivered more than once, which
+    happens after a datafeed is recreated or a read is retried.
+
+    Memory is bounded: at most max_size ids are kept, the least recently seen being evicted first.
+    If ttl_sec is given, ids are also forgotten after that many seconds.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl_sec=None):
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self.checked_events = 0
+        self.duplicate_events = 0
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(event):
+        """The event id, or the messageId for events without one. None if the event has neither"""
+        return event.get('id') or event.get('messageId')
+
+    def is_duplicate(self, event):
+        """Return True if the event was already seen, otherwise remember it and return False"""
+        key = self.get_key(event)
+        if key is None:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            self.checked_events += 1
+            if self.ttl_sec is not None:
+                self._evict_expired(now)
+
+            if key in self._seen:
+                self.duplicate_events += 1
+                self._seen[key] = now
+                self._seen.move_to_end(key)
+                return True
+
+            self._seen[key] = now
+            if len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+            return False
+
+    def _evict_expired(self, now):
+        # Ids are ordered by the time they were last seen, the oldest first
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.ttl_sec:
+                break
+            del self._seen[key]
+
+    @property
+    def hit_rate(self):
+        """Proportion of the checked events that were duplicates"""
+        if self.checked_events == 0:
+            return 0.0
+        return self.duplicate_events / self.checked_events
+
+    def get_stats(self):
+        return {
+            'size': len(self._seen),
+            'checked_events': self.checked_events,
+            'duplicate_events': self.duplicate_events,
+            'hit_rate': self.hit_rate,
+        }
@@ -0,0 +1,87 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# Default number of events submitted to the pool, running or waiting, before the datafeed reader
+# blocks. This matches the capacity of a standard v1 datafeed
+DEFAULT_MAX_PENDING_EVENTS = 250
+
+
+class ThreadPoolEventDispatcher:
+    """Runs event handlers on a pool of threads so that slow listeners do not block the thread
+    reading the datafeed.
+
+    At most max_pending_events events are held by the dispatcher: once reached, submit blocks
+    the caller until a handler completes, which pauses reading the datafeed.
+
+    Events submitted with a stream_key are handled one after the other in submission order,
+    events of different keys run in parallel. The backlog of a key is handled by the thread that
+    handled its previous event, so it never occupies more than one thread.
+    """
+
+    def __init__(self, pool_size, max_pending_events=DEFAULT_MAX_PENDING_EVENTS):
+        self.pool_size = pool_size
+        self.max_pending_events = max_pending_events
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='DatafeedHandler')
+        self.pending_events = 0
+        self.peak_pending_events = 0
+        self._slots = threading.Semaphore(max_pending_events)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._stream_backlogs = {}
+        self._local = threading.local()
+
+    def submit(self, handler, event, stream_key=None):
+        """Schedule handler(event), blocking while max_pending_events are already pending"""
+        self._slots.acquire()
+        with self._lock:
+            self.pending_events += 1
+            self.peak_pending_events = max(self.peak_pending_events, self.pending_events)
+            if stream_key is not None:
+                if stream_key in self._stream_backlogs:
+                    # A handler of this stream is running, it will pick this event up when done
+                    self._stream_backlogs[stream_key].append((handler, event))
+                    return
+                self._stream_backlogs[stream_key] = deque()
+        self.executor.submit(self._run, handler, event, stream_key)
+
+    def _run(self, handler, event, stream_key):
+        self._local.is_dispatcher_thread = True
+        while True:
+            try:
+                handler(event)
+            except Exception as exc:
+                log.exception('ThreadPoolEventDispatcher - Unhandled exception in listener: ' + str(exc))
+            finally:
+                self._slots.release()
+                with self._lock:
+                    self.pending_events -= 1
+                    if self.pending_events == 0:
+                        self._idle.notify_all()
+
+            if stream_key is None:
+                return
+            with self._lock:
+                backlog = self._stream_backlogs[stream_key]
+                if not backlog:
+                    del self._stream_backlogs[stream_key]
+                    return
+                handler, event = backlog.popleft()
+
+    def is_dispatcher_thread(self):
+        """True if called from one of the pool threads, for instance by a listener"""
+        return getattr(self._local, 'is_dispatcher_thread', False)
+
+    def wait_until_idle(self, timeout=None):
+        """Block until every submitted event has been handled. Returns False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.pending_events == 0, timeout)
+
+    def shutdown(self, wait=True):
+        """Stop the pool, after handling the pending events if wait is True"""
+        if wait:
+            self.wait_until_idle()
+        self.executor.shutdown(wait=wait)
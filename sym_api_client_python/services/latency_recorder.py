@@ -0,0 +1,151 @@
+import bisect
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_TRACES = 10000
+DEFAULT_TRACE_TTL_SEC = 600
+
+# Histogram bucket upper bounds in seconds, growing by 20% from 0.1ms to over an hour. Percentiles
+# are reported as the upper bound of their bucket, so they overestimate by at most 20%
+_BUCKET_GROWTH = 1.2
+_BUCKET_BOUNDS = []
+_bound = 0.0001
+while _bound < 3600:
+    _BUCKET_BOUNDS.append(_bound)
+    _bound *= _BUCKET_GROWTH
+_BUCKET_BOUNDS.append(float('inf'))
+
+QUEUE_WAIT = 'queue_wait'
+HANDLER = 'handler'
+END_TO_END = 'end_to_end'
+
+
+class LatencyHistogram:
+    """Fixed size histogram of durations in seconds, with logarithmic buckets"""
+
+    __slots__ = ('counts', 'count', 'total', 'maximum')
+
+    def __init__(self):
+        self.counts = [0] * len(_BUCKET_BOUNDS)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds):
+        seconds = max(seconds, 0.0)
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, percent):
+        if self.count == 0:
+            return None
+        rank = percent / 100 * self.count
+        cumulated = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulated += bucket_count
+            if cumulated >= rank and bucket_count:
+                return min(_BUCKET_BOUNDS[index], self.maximum)
+        return self.maximum
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.maximum if self.count else None,
+        }
+
+
+class LatencyRecorder:
+    """Traces events from the moment they are read to the moment their listeners complete, and
+    aggregates the durations in per event type histograms:
+        * queue_wait: from being read from the datafeed to being picked up by a handler
+        * handler: time spent in the listeners
+        * end_to_end: from the server timestamp of the event to the listeners completing
+
+    In-bot durations use the monotonic clock. At most max_traces events are traced at once and
+    traces older than ttl_sec are dropped, so events that never complete cannot leak memory.
+    """
+
+    def __init__(self, max_traces=DEFAULT_MAX_TRACES, ttl_sec=DEFAULT_TRACE_TTL_SEC):
+        self.max_traces = max_traces
+        self.ttl_sec = ttl_sec
+        self.evicted_traces = 0
+        self._traces = OrderedDict()
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._traces)
+
+    def received(self, event_id, event_type, server_timestamp_millis):
+        """Start tracing an event read from the datafeed"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            # [event type, server timestamp, received, picked up by a handler]
+            self._traces[event_id] = [event_type, server_timestamp_millis, now, None]
+
+    def dequeued(self, event_id):
+        """Mark the event as picked up by a handler"""
+        trace = self._traces.get(event_id)
+        if trace is not None:
+            trace[3] = time.monotonic()
+
+    def discard(self, event_id):
+        """Stop tracing an event that will not be handled"""
+        with self._lock:
+            self._traces.pop(event_id, None)
+
+    def completed(self, event_id):
+        """Record the durations of a handled event. Returns a tuple of the server timestamp in
+        milliseconds and the monotonic times it was received, dequeued and completed, or None if
+        the event was not traced"""
+        now = time.monotonic()
+        with self._lock:
+            trace = self._traces.pop(event_id, None)
+            if trace is None:
+                return None
+            event_type, server_timestamp_millis, received_at, dequeued_at = trace
+            if dequeued_at is None:
+                dequeued_at = received_at
+            histograms = self._histograms.get(event_type)
+            if histograms is None:
+                histograms = {QUEUE_WAIT: LatencyHistogram(), HANDLER: LatencyHistogram(),
+                              END_TO_END: LatencyHistogram()}
+                self._histograms[event_type] = histograms
+            histograms[QUEUE_WAIT].record(dequeued_at - received_at)
+            histograms[HANDLER].record(now - dequeued_at)
+            if server_timestamp_millis is not None:
+                histograms[END_TO_END].record(time.time() - server_timestamp_millis / 1000)
+        return server_timestamp_millis, received_at, dequeued_at, now
+
+    def _evict(self, now):
+        # Traces are ordered by reception time, the oldest first
+        while self._traces:
+            oldest = next(iter(self._traces.values()))
+            if len(self._traces) < self.max_traces and now - oldest[2] < self.ttl_sec:
+                break
+            self._traces.popitem(last=False)
+            self.evicted_traces += 1
+
+    def snapshot(self):
+        """Return {event type: {queue_wait|handler|end_to_end: {count, mean, p50, p95, p99, max}}}
+        with durations in seconds"""
+        with self._lock:
+            return {event_type: {name: histogram.snapshot() for name, histogram in histograms.items()}
+                    for event_type, histograms in self._histograms.items()}
+
+    def reset(self):
+        """Clear the histograms, for instance after each snapshot to report per period"""
+        with self._lock:
+            self._histograms = {}
@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+DEFAULT_HIGH_WATERMARK = 1000
+DEFAULT_LOW_WATERMARK = 500
+# Events handed to the consumer at once. Events being handled are no longer in the buffer, so
+# keeping batches small keeps the watermarks meaningful
+DEFAULT_BATCH_SIZE = 100
+
+
+class PrefetchingDatafeedReader:
+    """Reads the datafeed on a dedicated thread into an in-memory buffer, so that the datafeed
+    keeps being read while listeners are busy and does not expire on the server side.
+
+    read_events is called repeatedly on the reader thread until should_stop returns True. It is
+    expected to handle its own errors and return a list of events, possibly empty.
+
+    When the buffer holds high_watermark events or more, reading is paused until the consumer
+    brings it down to low_watermark, which bounds the memory used when listeners cannot keep up.
+    """
+
+    def __init__(self, read_events, should_stop, high_watermark=DEFAULT_HIGH_WATERMARK,
+                 low_watermark=DEFAULT_LOW_WATERMARK, batch_size=DEFAULT_BATCH_SIZE):
+        if low_watermark > high_watermark:
+            raise ValueError('Low watermark {} is above high watermark {}'.format(low_watermark, high_watermark))
+        self.read_events = read_events
+        self.should_stop = should_stop
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.batch_size = batch_size
+
+        self.read_count = 0
+        self.events_read = 0
+        self.peak_buffered_events = 0
+        self.pause_count = 0
+        self.paused_time_sec = 0.0
+
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    @property
+    def buffered_events(self):
+        return len(self._buffer)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='DatafeedReader', daemon=True)
+        self._thread.start()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake_up(self):
+        """Wake the reader if it is paused, so that it notices should_stop"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def _run(self):
+        log.debug('PrefetchingDatafeedReader --> Reader thread started')
+        while not self.should_stop():
+            with self._condition:
+                if len(self._buffer) >= self.high_watermark:
+                    log.debug('PrefetchingDatafeedReader --> {} events buffered, pausing reads'
+                              .format(len(self._buffer)))
+                    self.pause_count += 1
+                    paused_at = time.monotonic()
+                    self._condition.wait_for(
+                        lambda: len(self._buffer) <= self.low_watermark or self.should_stop())
+                    self.paused_time_sec += time.monotonic() - paused_at
+                    continue
+
+            events = self.read_events()
+            self.read_count += 1
+            if events:
+                with self._condition:
+                    self._buffer.extend(events)
+                    self.events_read += len(events)
+                    self.peak_buffered_events = max(self.peak_buffered_events, len(self._buffer))
+                    self._condition.notify_all()
+        log.debug('PrefetchingDatafeedReader --> Reader thread stopped')
+        with self._condition:
+            self._condition.notify_all()
+
+    def get_events(self, timeout=None):
+        """Return up to batch_size buffered events, oldest first, waiting up to timeout for one to
+        arrive. Returns an empty list on timeout or once the reader has stopped and the buffer is
+        empty"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._buffer or not self.is_alive(), timeout)
+            events = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            self._condition.notify_all()
+        return events
+
+    def get_stats(self):
+        return {
+            'buffered_events': self.buffered_events,
+            'peak_buffered_events': self.peak_buffered_events,
+            'read_count': self.read_count,
+            'events_read': self.events_read,
+            'pause_count': self.pause_count,
+            'paused_time_sec': self.paused_time_sec,
+        }
@@ -0,0 +1,195 @@
+"""Dispatch of datafeed events to a pool of worker processes
+
+Listeners doing CPU-bound work, like parsing PresentationML or rendering forms, are limited by the
+GIL when run in the process reading the datafeed. The ProcessPoolEventDispatcher sends the events
+to worker processes instead. Each worker builds its own SymBotClient and listeners once, from the
+factories given to the dispatcher, and handles the events it receives with them.
+
+The factories are sent to the workers so they must be picklable, typically module level functions
+or functools.partial objects wrapping them:
+
+    def create_bot_client():
+        configure = SymConfig('config.json')
+        configure.load_config()
+        auth = SymBotRSAAuth(configure)
+        auth.authenticate()
+        return SymBotClient(auth, configure)
+
+    def create_listeners(bot_client):
+        return [RoomListenerImp(bot_client), IMListenerImp(bot_client)]
+
+    process_pool = ProcessPoolEventDispatcher(4, create_bot_client, create_listeners)
+    datafeed_event_service = bot_client.get_datafeed_event_service(process_pool=process_pool)
+
+Listeners added to the datafeed event service itself are not called when a process pool is used.
+Exceptions raised by listeners in the workers are sent back to the parent process.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .abstract_datafeed_event_service import AbstractDatafeedEventService
+from .event_dispatcher import DEFAULT_MAX_PENDING_EVENTS
+
+log = logging.getLogger(__name__)
+
+# State of a worker process, set up once by _initialize_worker
+_worker_state = {}
+
+
+class WorkerDatafeedEventService(AbstractDatafeedEventService):
+    """Routes events to the listeners of a worker process. Events are read by the parent process"""
+
+    def start_datafeed(self):
+        raise RuntimeError('The datafeed is read by the parent process')
+
+
+def _initialize_worker(bot_client_factory, listeners_factory, asynchronous):
+    bot_client = bot_client_factory()
+    if asynchronous:
+        # Imported here as the async service module depends on this package
+        from ..datafeed_event_service import AsyncDataFeedEventService
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        service = AsyncDataFeedEventService(bot_client)
+        _worker_state['loop'] = loop
+    else:
+        service = WorkerDatafeedEventService(bot_client)
+    service.add_listeners(*listeners_factory(bot_client))
+    _worker_state['service'] = service
+    log.debug('ProcessPoolEventDispatcher --> Worker initialised')
+
+
+def _handle_event_in_worker(event):
+    route = _worker_state['service'].routing_dict.get(str(event['type']))
+    if route is None:
+        return
+    result = route(event)
+    if asyncio.iscoroutine(result):
+        _worker_state['loop'].run_until_complete(result)
+
+
+class ProcessPoolEventDispatcher:
+    """Handles events in a pool of worker processes, see the module documentation.
+
+    For the synchronous services at most max_pending_events events are held by the dispatcher,
+    submit blocks the reader beyond that. For the AsyncDataFeedEventService the number of events
+    in flight is bounded by the service itself. Events submitted with a stream_key are handled in
+    submission order.
+    """
+
+    def __init__(self, pool_size, bot_client_factory, listeners_factory,
+                 max_pending_events=DEFAULT_MAX_PENDING_EVENTS):
+        self.pool_size = pool_size
+        self.bot_client_factory = bot_client_factory
+        self.listeners_factory = listeners_factory
+        self.max_pending_events = max_pending_events
+        self.executor = None
+        self.asynchronous = None
+
+        self.pending_events = 0
+        self.peak_pending_events = 0
+        self.handled_events = 0
+        self.failed_events = 0
+
+        self._slots = threading.Semaphore(max_pending_events)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._stream_backlogs = {}
+
+    def _get_executor(self, asynchronous):
+        """Start the workers on first use, in the mode of the service using the dispatcher"""
+        with self._lock:
+            if self.executor is None:
+                log.debug('ProcessPoolEventDispatcher --> Starting {} worker processes'.format(self.pool_size))
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.pool_size, initializer=_initialize_worker,
+                    initargs=(self.bot_client_factory, self.listeners_factory, asynchronous))
+                self.asynchronous = asynchronous
+            elif self.asynchronous != asynchronous:
+                raise RuntimeError('Process pool already used by a {} datafeed event service'
+                                   .format('asynchronous' if self.asynchronous else 'synchronous'))
+            return self.executor
+
+    def submit(self, event, stream_key=None):
+        """Send the event to a worker, blocking while max_pending_events are already pending"""
+        self._slots.acquire()
+        with self._lock:
+            self._add_pending()
+            if stream_key is not None:
+                if stream_key in self._stream_backlogs:
+                    self._stream_backlogs[stream_key].append(event)
+                    return
+                self._stream_backlogs[stream_key] = deque()
+        self._submit_to_worker(event, stream_key)
+
+    def _submit_to_worker(self, event, stream_key):
+        future = self._get_executor(asynchronous=False).submit(_handle_event_in_worker, event)
+        future.add_done_callback(partial(self._on_event_handled, stream_key))
+
+    def _on_event_handled(self, stream_key, future):
+        exc = None if future.cancelled() else future.exception()
+        if exc is not None:
+            log.error('ProcessPoolEventDispatcher - Unhandled exception in listener: ' + str(exc), exc_info=exc)
+        self._slots.release()
+
+        next_event = None
+        with self._lock:
+            self._remove_pending(failed=exc is not None)
+            if stream_key is not None:
+                backlog = self._stream_backlogs[stream_key]
+                if backlog:
+                    next_event = backlog.popleft()
+                else:
+                    del self._stream_backlogs[stream_key]
+        if next_event is not None:
+            self._submit_to_worker(next_event, stream_key)
+
+    async def handle_event_async(self, event):
+        """Handle the event in a worker, to be awaited by the AsyncDataFeedEventService in place
+        of its own handlers. Exceptions raised by the listeners are raised here"""
+        executor = self._get_executor(asynchronous=True)
+        with self._lock:
+            self._add_pending()
+        failed = True
+        try:
+            await asyncio.wrap_future(executor.submit(_handle_event_in_worker, event))
+            failed = False
+        finally:
+            with self._lock:
+                self._remove_pending(failed)
+
+    def _add_pending(self):
+        self.pending_events += 1
+        self.peak_pending_events = max(self.peak_pending_events, self.pending_events)
+
+    def _remove_pending(self, failed):
+        self.pending_events -= 1
+        self.handled_events += 1
+        if failed:
+            self.failed_events += 1
+        if self.pending_events == 0:
+            self._idle.notify_all()
+
+    def is_dispatcher_thread(self):
+        # Listeners run in the worker processes, never on a thread of this process
+        return False
+
+    def wait_until_idle(self, timeout=None):
+        """Block until every submitted event has been handled. Returns False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.pending_events == 0, timeout)
+
+    def shutdown(self, wait=True):
+        """Stop the workers, after handling the pending events if wait is True. The workers are
+        started again if the dispatcher is used afterwards"""
+        if wait:
+            self.wait_until_idle()
+        with self._lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,182 @@
+import logging
+import threading
+
+from .datafeed_events import (DatafeedEvent, RoomDeactivated, RoomMemberDemotedFromOwner, RoomMembershipEvent,
+                              RoomMemberPromotedToOwner, RoomReactivated, RoomUpdated, UserJoinedRoom,
+                              UserLeftRoom)
+
+log = logging.getLogger(__name__)
+
+ROOM_INFO = 'room_info'
+STREAM_INFO = 'stream_info'
+MEMBERS = 'members'
+
+
+def normalize_stream_id(stream_id):
+    """The URL safe form of a stream id without padding, as in get_stream_key of the datafeed
+    event services"""
+    return str(stream_id).rstrip('=').replace('/', '_').replace('+', '-')
+
+
+class RoomIndex:
+    """Room information, stream information and members of the streams of the bot, kept up to date
+    by the events of the datafeed so that StreamClient answers get_room_info, stream_info_v2 and
+    get_room_members without calling the pod.
+
+    The datafeed event services apply the events of each read with apply_events, before the
+    listeners are called and including the events of the bot, and reset the index when the
+    datafeed is recreated or deactivated, as events may have been missed. The index only answers
+    while live, between the first read and the next reset.
+
+    Only streams the bot is a member of are indexed: the datafeed sends their events, and only
+    theirs. A stream is known from its first event, or from a list of members including the bot.
+    Lookups are stored the first time they are made, with put, unless an event of the stream was
+    applied while they were in flight, see get_version.
+
+    Responses are replaced rather than modified by the events, but they are shared and must not be
+    modified by callers.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.live = False
+        self.bot_id = None
+        self.hits = 0
+        self.misses = 0
+        # Stream key: {ROOM_INFO: ..., STREAM_INFO: ..., MEMBERS: ...} of the streams of the bot
+        self._streams = {}
+        # Stream key: number of events applied, kept when a stream is forgotten
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, stream_id, kind):
+        """Return (True, response) if the index holds the response of kind for the stream,
+        (False, None) otherwise"""
+        if not self.live:
+            return False, None
+        with self._lock:
+            response = self._streams.get(normalize_stream_id(stream_id), {}).get(kind)
+            if response is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, response
+
+    def get_version(self, stream_id, kind):
+        """Version to pass to put after looking up a response of kind for the stream, or None if
+        the response cannot be indexed"""
+        if not self.live:
+            return None
+        key = normalize_stream_id(stream_id)
+        with self._lock:
+            if kind != MEMBERS and key not in self._streams:
+                return None
+            return self._versions.get(key, 0)
+
+    def put(self, stream_id, kind, response, version):
+        """Store a response looked up at version, unless the stream changed since"""
+        key = normalize_stream_id(stream_id)
+        with self._lock:
+            if not self.live or version is None or self._versions.get(key, 0) != version:
+                return
+            if kind == MEMBERS and key not in self._streams:
+                if not any(str(member.get('id')) == str(self.bot_id) for member in response or ()):
+                    return
+            self._streams.setdefault(key, {})[kind] = response
+
+    def apply_events(self, events, bot_id):
+        """Apply the events of a datafeed read and make the index live. Returns the ids of the
+        streams whose room or stream information changed"""
+        changed = set()
+        with self._lock:
+            self.bot_id = bot_id
+            self.live = self.enabled
+            if not self.enabled:
+                return changed
+            for event in events:
+                if event is None:
+                    continue
+                stream_id = self._apply_event(DatafeedEvent.from_dict(event))
+                if stream_id is not None:
+                    changed.add(stream_id)
+        return changed
+
+    def reset(self):
+        """Forget everything, until the next read. Called when events may have been missed"""
+        with self._lock:
+            if self.live:
+                log.debug('RoomIndex/reset() --> Forgetting {} streams'.format(len(self._streams)))
+            self.live = False
+            self._streams.clear()
+            # Versions are kept so that lookups in flight are not stored
+            for key in self._versions:
+                self._versions[key] += 1
+
+    def _apply_event(self, event):
+        stream_id = self._get_stream_id(event)
+        if stream_id is None:
+            return None
+        key = normalize_stream_id(stream_id)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+        if isinstance(event, UserLeftRoom) and str(event.affected_user_id) == str(self.bot_id):
+            self._streams.pop(key, None)
+            return None
+        stream = self._streams.setdefault(key, {})
+
+        if isinstance(event, RoomUpdated):
+            properties = event.data.get('newRoomProperties') or {}
+            room_info = stream.get(ROOM_INFO)
+            if room_info is not None:
+                stream[ROOM_INFO] = dict(room_info, roomAttributes=dict(room_info.get('roomAttributes') or {},
+                                                                        **properties))
+            stream_info = stream.get(STREAM_INFO)
+            if stream_info is not None and 'name' in properties:
+                stream[STREAM_INFO] = dict(stream_info, roomAttributes=dict(stream_info.get('roomAttributes') or {},
+                                                                            name=properties['name']))
+            return stream_id
+        if isinstance(event, (RoomDeactivated, RoomReactivated)):
+            active = isinstance(event, RoomReactivated)
+            room_info = stream.get(ROOM_INFO)
+            if room_info is not None:
+                stream[ROOM_INFO] = dict(room_info, roomSystemInfo=dict(room_info.get('roomSystemInfo') or {},
+                                                                        active=active))
+            if stream.get(STREAM_INFO) is not None:
+                stream[STREAM_INFO] = dict(stream[STREAM_INFO], active=active)
+            return stream_id
+
+        members = stream.get(MEMBERS)
+        if members is None or not isinstance(event, RoomMembershipEvent):
+            return None
+        user_id = str(event.affected_user_id)
+        if isinstance(event, UserJoinedRoom):
+            if not any(str(member.get('id')) == user_id for member in members):
+                stream[MEMBERS] = members + [{'id': event.affected_user_id, 'owner': False,
+                                              'joinDate': event.timestamp}]
+        elif isinstance(event, UserLeftRoom):
+            stream[MEMBERS] = [member for member in members if str(member.get('id')) != user_id]
+        elif isinstance(event, (RoomMemberPromotedToOwner, RoomMemberDemotedFromOwner)):
+            owner = isinstance(event, RoomMemberPromotedToOwner)
+            if any(str(member.get('id')) == user_id for member in members):
+                stream[MEMBERS] = [dict(member, owner=owner) if str(member.get('id')) == user_id else member
+                                   for member in members]
+            else:
+                # Looked up again rather than guessing the other fields of the member
+                del stream[MEMBERS]
+        return None
+
+    @staticmethod
+    def _get_stream_id(event):
+        """The streamId of the stream of an event, or None for events outside of a stream"""
+        payload = event.get('payload')
+        if not payload:
+            return None
+        for event_data in payload.values():
+            if not isinstance(event_data, dict):
+                continue
+            if isinstance(event_data.get('message'), dict):
+                event_data = event_data['message']
+            stream = event_data.get('stream')
+            if isinstance(stream, dict) and stream.get('streamId'):
+                return stream['streamId']
+        return None
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import tempfile
+import time
+
+SESSION_TOKEN_FILE = 'session.tokens'
+
+# Cached tokens are used for at most that long, the default of authTokenRefreshPeriod
+DEFAULT_SESSION_TOKEN_TTL_SEC = 30 * 60
+
+log = logging.getLogger(__name__)
+
+
+class OnDiskSessionTokenRepository:
+    """Keeps the session and key manager tokens of a bot in a file, so that a restarted bot can
+    reuse them instead of authenticating again.
+
+    The file is only readable by its owner and replaced atomically. Tokens are only read back
+    for the same bot and authentication endpoints and before their expiration. They are not
+    validated here: a bot using expired or revoked tokens gets a 401 on its first call, which
+    triggers a full authentication as usual.
+    """
+
+    def __init__(self, session_token_folder, config, ttl_sec=DEFAULT_SESSION_TOKEN_TTL_SEC):
+        self.session_token_file_path = self._get_session_token_file_path(session_token_folder)
+        self.ttl_sec = ttl_sec
+        # Tokens are only reused by the same bot, on the same pod and key manager
+        self.owner = {
+            'botUsername': config.data.get('botUsername'),
+            'sessionAuthUrl': config.data.get('sessionAuthUrl'),
+            'keyAuthUrl': config.data.get('keyAuthUrl'),
+        }
+
+    def read_tokens_from_file(self):
+        """Return the cached (session token, key manager token), or None if there are no valid ones"""
+        try:
+            with open(self.session_token_file_path, 'r') as session_token_file:
+                content = json.load(session_token_file)
+            if content.get('owner') != self.owner:
+                log.debug(f'Ignoring tokens of another bot or pod in {self.session_token_file_path}')
+                return None
+            if content['expiresAt'] <= time.time():
+                log.debug(f'Ignoring expired tokens in {self.session_token_file_path}')
+                return None
+            log.debug(f'Retrieved tokens from file {self.session_token_file_path}')
+            return content['sessionToken'], content['keyManagerToken']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            log.warning(f'Could not read tokens from file {self.session_token_file_path}: {exc}')
+        return None
+
+    def store_tokens_to_file(self, session_token, key_manager_token):
+        content = {
+            'owner': self.owner,
+            'sessionToken': session_token,
+            'keyManagerToken': key_manager_token,
+            'expiresAt': time.time() + self.ttl_sec,
+        }
+        folder = os.path.dirname(self.session_token_file_path)
+        # mkstemp creates the file readable and writable by its owner only
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=folder, prefix='.' + SESSION_TOKEN_FILE)
+        try:
+            with os.fdopen(file_descriptor, 'w') as session_token_file:
+                json.dump(content, session_token_file)
+            os.replace(temporary_path, self.session_token_file_path)
+            log.debug(f'Stored tokens to {self.session_token_file_path}')
+        except OSError as exc:
+            log.warning(f'Could not store tokens to file {self.session_token_file_path}: {exc}')
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def delete_tokens_file(self):
+        try:
+            os.remove(self.session_token_file_path)
+        except FileNotFoundError:
+            pass
+
+    def restore_tokens(self, auth):
+        """Set the cached tokens on an authenticator that has none yet, the first time it
+        authenticates. Returns whether tokens were restored"""
+        if auth.session_token is not None:
+            return False
+        tokens = self.read_tokens_from_file()
+        if tokens is None:
+            return False
+        auth.session_token, auth.key_manager_token = tokens
+        return True
+
+    def save_tokens(self, auth):
+        self.store_tokens_to_file(auth.session_token, auth.key_manager_token)
+
+    def _get_session_token_file_path(self, session_token_folder):
+        session_token_file_path = os.path.join(session_token_folder, SESSION_TOKEN_FILE)
+        if os.path.exists(session_token_file_path) and os.path.isdir(session_token_file_path):
+            session_token_file_path = os.path.join(session_token_file_path, SESSION_TOKEN_FILE)
+        return os.path.abspath(session_token_file_path)
+
+
+def create_session_token_repository(config):
+    """The repository of the tokens if reuseSessionTokens is enabled in the config, else None"""
+    if not config.is_session_token_reused():
+        return None
+    refresh_period_min = config.data.get('authTokenRefreshPeriod')
+    ttl_sec = float(refresh_period_min) * 60 if refresh_period_min else DEFAULT_SESSION_TOKEN_TTL_SEC
+    return OnDiskSessionTokenRepository(config.get_session_token_folder_path(), config, ttl_sec)
@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+import os
+import ssl
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch, AsyncMock
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import BestAvailableEncryption, pkcs12
+from cryptography.x509.oid import NameOID
+
+from sym_api_client_python.auth.auth import Auth
+from sym_api_client_python.auth.rsa_auth import SymBotRSAAuth
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.exceptions.MaxRetryException import MaxRetryException
+from tests.clients.test_sym_bot_client import MockAsyncResponse
+from tests.util.loop_lag import LoopLagMonitor
+from tests.util.resource_util import get_resource_filepath
+
+
+class TokenEndpoints:
+    """Replaces aiohttp.ClientSession.post, answering with a token per endpoint after a delay"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.running = 0
+        self.peak_running = 0
+        self.calls = []
+
+    async def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        self.running += 1
+        self.peak_running = max(self.peak_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        if self.failures:
+            self.failures -= 1
+            return MockAsyncResponse(503, {'message': 'Service Unavailable'})
+        return MockAsyncResponse(200, {'token': url.rsplit('/', 3)[-3]})
+
+
+@patch.dict('sym_api_client_python.auth.async_token_request.auth_endpoint_constants', TIMEOUT=0)
+class TestRSAAuthenticateAsync(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.auth = SymBotRSAAuth(self.config)
+        self.auth.create_jwt = lambda: 'jwt'
+
+    async def test_tokens_are_requested_concurrently(self):
+        endpoints = TokenEndpoints()
+        with patch('aiohttp.ClientSession.post', new_callable=AsyncMock, side_effect=endpoints.post):
+            async with LoopLagMonitor() as monitor:
+                await self.auth.authenticate_async()
+
+        self.assertEqual(self.auth.get_session_token(), 'login')
+        self.assertEqual(self.auth.get_key_manager_token(), 'relay')
+        self.assertEqual(endpoints.peak_running, 2)
+        self.assertEqual(sorted(url for url, _ in endpoints.calls), [
+            self.config.data['keyAuthUrl'] + '/relay/pubkey/authenticate',
+            self.config.data['sessionAuthUrl'] + '/login/pubkey/authenticate'])
+        for _, kwargs in endpoints.calls:
+            self.assertEqual(kwargs['data'], b'{"token":"jwt"}')
+            self.assertIsInstance(kwargs['ssl'], ssl.SSLContext)
+        self.assertLess(monitor.max_lag, 0.1)
+
+    async def test_failed_attempts_are_retried(self):
+        endpoints = TokenEndpoints(failures=2)
+        with patch('aiohttp.ClientSession.post', new_callable=AsyncMock, side_effect=endpoints.post):
+            await self.auth.authenticate_async()
+
+        self.assertEqual(len(endpoints.calls), 4)
+        self.assertEqual(self.auth.get_session_token(), 'login')
+        self.assertEqual(self.auth.get_key_manager_token(), 'relay')
+
+    async def test_max_retries(self):
+        endpoints = TokenEndpoints(failures=100)
+        with patch('aiohttp.ClientSession.post', new_callable=AsyncMock, side_effect=endpoints.post):
+            with self.assertRaises(MaxRetryException):
+                await self.auth.authenticate_async()
+
+        self.assertIsNone(self.auth.get_session_token())
+
+
+class TestCertificateAuthenticateAsync(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.config.data['p.12'] = create_pkcs12_file(tempfile.mkdtemp(), b'changeit')
+        self.config.data['botCertPassword'] = 'changeit'
+        self.auth = Auth(self.config)
+
+    async def test_tokens_are_requested_with_the_certificate(self):
+        endpoints = TokenEndpoints()
+        with patch('aiohttp.ClientSession.post', new_callable=AsyncMock, side_effect=endpoints.post):
+            await self.auth.authenticate_async()
+
+        self.assertEqual(self.auth.get_session_token(), 'sessionauth')
+        self.assertEqual(self.auth.get_key_manager_token(), 'keyauth')
+        self.assertEqual(endpoints.peak_running, 2)
+        for _, kwargs in endpoints.calls:
+            self.assertIs(kwargs['ssl'], self.auth.get_async_ssl_context())
+
+
+def create_pkcs12_file(folder, password):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'bot')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256())
+    path = os.path.join(folder, 'bot.p12')
+    with open(path, 'wb') as pkcs12_file:
+        pkcs12_file.write(pkcs12.serialize_key_and_certificates(b'bot', key, certificate, None,
+                                                                BestAvailableEncryption(password)))
+    return path
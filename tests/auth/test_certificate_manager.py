@@ -0,0 +1,103 @@
+import datetime
+import json
+import os
+import ssl
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, pkcs12
+from cryptography.x509.oid import NameOID
+
+from sym_api_client_python.auth.auth import Auth
+from sym_api_client_python.configure.configure import SymConfig
+from tests.auth.test_authenticate_async import create_pkcs12_file
+from tests.util.resource_util import get_resource_filepath
+
+
+class TokenHandler(BaseHTTPRequestHandler):
+    """Answers with the common name of the client certificate as token"""
+
+    def do_POST(self):
+        subject = dict(item[0] for item in self.connection.getpeercert()['subject'])
+        body = json.dumps({'token': subject['commonName']}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCertificateManager(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.config.data['p.12'] = create_pkcs12_file(self.folder, b'changeit')
+        self.config.data['botCertPassword'] = 'changeit'
+
+    def test_certificate_is_loaded_once(self):
+        with patch.object(pkcs12, 'load_key_and_certificates', wraps=pkcs12.load_key_and_certificates) as load:
+            auth = Auth(self.config)
+            ssl_context = auth.get_async_ssl_context()
+
+        load.assert_called_once()
+        for session in (auth.auth_session, auth.key_manager_auth_session):
+            for url in (self.config.data['sessionAuthUrl'], self.config.data['keyAuthUrl']):
+                self.assertIs(session.get_adapter(url).ssl_context, ssl_context)
+
+    def test_client_certificate_is_presented_over_tls(self):
+        server_cert_path, server_key_path = create_server_certificate(self.folder)
+        with open(self.config.data['p.12'], 'rb') as pkcs12_file:
+            bot_certificate = pkcs12.load_key_and_certificates(pkcs12_file.read(), b'changeit')[1]
+        bot_cert_path = os.path.join(self.folder, 'bot.pem')
+        with open(bot_cert_path, 'wb') as bot_cert_file:
+            bot_cert_file.write(bot_certificate.public_bytes(Encoding.PEM))
+
+        server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH, cafile=bot_cert_path)
+        server_context.verify_mode = ssl.CERT_REQUIRED
+        server_context.load_cert_chain(server_cert_path, server_key_path)
+        server = HTTPServer(('localhost', 0), TokenHandler)
+        server.socket = server_context.wrap_socket(server.socket, server_side=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        url = 'https://localhost:{}'.format(server.server_address[1])
+        self.config.data['sessionAuthUrl'] = url
+        self.config.data['keyAuthUrl'] = url
+        self.config.data['truststorePath'] = server_cert_path
+        auth = Auth(self.config)
+        auth.authenticate()
+
+        self.assertEqual(auth.get_session_token(), 'bot')
+        self.assertEqual(auth.get_key_manager_token(), 'bot')
+
+
+def create_server_certificate(folder):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)) \
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName('localhost')]), critical=False) \
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True) \
+        .sign(key, hashes.SHA256())
+    cert_path = os.path.join(folder, 'server.pem')
+    key_path = os.path.join(folder, 'server.key')
+    with open(cert_path, 'wb') as cert_file:
+        cert_file.write(certificate.public_bytes(Encoding.PEM))
+    with open(key_path, 'wb') as key_file:
+        key_file.write(key.private_bytes(Encoding.PEM, PrivateFormat.TraditionalOpenSSL, NoEncryption()))
+    return cert_path, key_path
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+from jose import jwt
+
+from sym_api_client_python.auth import jwt_signer
+from sym_api_client_python.auth.jwt_signer import RSAJwtSigner, JWT_VALIDITY_SEC, JWT_REUSE_MARGIN_SEC
+from sym_api_client_python.auth.rsa_auth import SymBotRSAAuth
+from sym_api_client_python.configure.configure import SymConfig
+from tests.util.resource_util import get_resource_filepath
+
+
+class TestRSAJwtSigner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        with tempfile.NamedTemporaryFile('wb', suffix='.pem', delete=False) as key_file:
+            key_file.write(cls.private_key.private_bytes(Encoding.PEM, PrivateFormat.TraditionalOpenSSL,
+                                                         NoEncryption()))
+        cls.key_path = key_file.name
+        public_key = cls.private_key.public_key()
+        cls.public_key_pem = public_key.public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo).decode('ascii')
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.key_path)
+
+    def test_jwt_is_verified_by_jose(self):
+        signer = RSAJwtSigner(self.key_path, 'bot-user')
+
+        claims = jwt.decode(signer.create_jwt(), self.public_key_pem, algorithms=['RS512'])
+
+        self.assertEqual(claims['sub'], 'bot-user')
+        self.assertAlmostEqual(claims['exp'], time.time() + JWT_VALIDITY_SEC, delta=5)
+
+    def test_key_is_read_once_and_jwt_reused_while_valid(self):
+        signer = RSAJwtSigner(self.key_path, 'bot-user')
+
+        with patch('builtins.open', wraps=open) as open_mock:
+            first = signer.create_jwt()
+            second = signer.create_jwt()
+            signer.sign({'sub': 'other-user'})
+
+        self.assertEqual(first, second)
+        open_mock.assert_called_once()
+
+    def test_jwt_renewed_near_expiration(self):
+        signer = RSAJwtSigner(self.key_path, 'bot-user')
+        first = signer.create_jwt()
+
+        later = time.time() + JWT_VALIDITY_SEC - JWT_REUSE_MARGIN_SEC + 1
+        with patch.object(jwt_signer, 'datetime') as datetime_mock:
+            datetime_mock.datetime.now.return_value.timestamp.return_value = later
+            second = signer.create_jwt()
+
+        self.assertNotEqual(first, second)
+        claims = jwt.decode(second, self.public_key_pem, algorithms=['RS512'],
+                            options={'verify_exp': False})
+        self.assertEqual(claims['exp'], int(later) + JWT_VALIDITY_SEC)
+
+    def test_session_and_key_manager_authentications_share_the_jwt(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        config.data['botRSAPath'] = self.key_path
+        auth = SymBotRSAAuth(config)
+
+        self.assertEqual(auth.create_jwt_body(), auth.create_jwt_body())
+        self.assertEqual(jwt.get_unverified_claims(auth.create_jwt())['sub'], config.data['botUsername'])
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, AsyncMock
+
+from sym_api_client_python.auth.token_manager import TokenManager
+from sym_api_client_python.configure.configure import SymConfig
+from tests.util.resource_util import get_resource_filepath
+
+
+class SlowAuth:
+    """Authenticator whose authentication takes a while, counting the calls"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = 0
+
+    def authenticate(self):
+        self.calls += 1
+        time.sleep(self.delay)
+
+
+class SlowAsyncAuth(SlowAuth):
+
+    async def authenticate_async(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+
+
+class TestTokenManager(unittest.TestCase):
+
+    def test_concurrent_threads_refresh_once(self):
+        auth = SlowAuth()
+        on_refresh = MagicMock()
+        manager = TokenManager(auth, on_refresh)
+        generation = manager.generation
+
+        threads = [threading.Thread(target=manager.refresh, args=(generation,)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(auth.calls, 1)
+        on_refresh.assert_called_once()
+        self.assertEqual(manager.generation, generation + 1)
+        self.assertEqual(manager.coalesced_count, 9)
+
+    def test_refresh_skipped_for_stale_generation(self):
+        auth = SlowAuth(delay=0)
+        manager = TokenManager(auth)
+        stale_generation = manager.generation
+        manager.refresh()
+
+        manager.refresh(stale_generation)
+        self.assertEqual(auth.calls, 1)
+        manager.refresh(manager.generation)
+        self.assertEqual(auth.calls, 2)
+
+    def test_background_refresh_on_thread_when_due(self):
+        auth = SlowAuth(delay=0)
+        on_refresh = MagicMock()
+        manager = TokenManager(auth, on_refresh, refresh_period_sec=60)
+
+        manager.refresh_in_background_if_due()
+        self.assertFalse(manager.is_refresh_due())
+
+        manager.last_refresh -= 61
+        manager.refresh_in_background_if_due()
+        for _ in range(100):
+            if manager.generation:
+                break
+            time.sleep(0.01)
+        self.assertEqual(auth.calls, 1)
+        on_refresh.assert_called_once()
+        self.assertFalse(manager.is_refresh_due())
+
+    def test_get_refresh_period_sec(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        self.assertEqual(TokenManager.get_refresh_period_sec(config), 30 * 60)
+        config.data['authTokenRefreshPeriod'] = 0
+        self.assertIsNone(TokenManager.get_refresh_period_sec(config))
+
+
+class TestTokenManagerAsync(IsolatedAsyncioTestCase):
+
+    async def test_concurrent_tasks_refresh_once(self):
+        auth = SlowAsyncAuth()
+        auth.authenticate = MagicMock()
+        manager = TokenManager(auth)
+        generation = manager.generation
+
+        await asyncio.gather(*[manager.refresh_async(generation) for _ in range(10)])
+
+        self.assertEqual(auth.calls, 1)
+        auth.authenticate.assert_not_called()
+        self.assertEqual(manager.generation, generation + 1)
+
+    async def test_tasks_and_threads_refresh_once(self):
+        # Without authenticate_async, authenticate runs in the executor
+        auth = SlowAuth()
+        manager = TokenManager(auth)
+        generation = manager.generation
+
+        thread = threading.Thread(target=manager.refresh, args=(generation,))
+        thread.start()
+        await asyncio.sleep(0.02)
+        await asyncio.gather(*[manager.refresh_async(generation) for _ in range(5)])
+        thread.join()
+
+        self.assertEqual(auth.calls, 1)
+        self.assertEqual(manager.generation, generation + 1)
+
+    async def test_cancelled_caller_does_not_cancel_refresh(self):
+        auth = SlowAsyncAuth()
+        manager = TokenManager(auth)
+
+        cancelled = asyncio.ensure_future(manager.refresh_async(0))
+        waiting = asyncio.ensure_future(manager.refresh_async(0))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await waiting
+
+        self.assertEqual(auth.calls, 1)
+        self.assertEqual(manager.generation, 1)
+
+    async def test_background_refresh_as_task_when_due(self):
+        auth = SlowAsyncAuth(delay=0.01)
+        auth.authenticate_async = AsyncMock(wraps=auth.authenticate_async)
+        manager = TokenManager(auth, refresh_period_sec=60)
+        manager.last_refresh -= 61
+
+        manager.refresh_in_background_if_due()
+        manager.refresh_in_background_if_due()
+        await asyncio.sleep(0.05)
+
+        auth.authenticate_async.assert_awaited_once()
+        self.assertEqual(manager.generation, 1)
+
+    async def test_failed_background_refresh_is_retried_after_a_period(self):
+        auth = MagicMock()
+        auth.authenticate_async = AsyncMock(side_effect=Exception('Key manager unavailable'))
+        manager = TokenManager(auth, refresh_period_sec=60)
+        manager.last_refresh -= 61
+
+        with self.assertLogs('sym_api_client_python.auth.token_manager', level='ERROR'):
+            manager.refresh_in_background_if_due()
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(manager.generation, 0)
+        self.assertFalse(manager.is_refresh_due())
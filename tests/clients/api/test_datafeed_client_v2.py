@@ -1,7 +1,9 @@
+import asyncio
 import json
 import os
 import unittest
-from unittest.mock import patch
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch, AsyncMock
 
 from sym_api_client_python.auth.rsa_auth import SymBotRSAAuth
 from sym_api_client_python.clients.sym_bot_client import SymBotClient
@@ -26,7 +28,7 @@ class TestDataFeedClientV2(unittest.TestCase):
 
         self.assertEqual(mock_response.status_code, 201)
         self.assertEqual(datafeed_id, '21449143d35a86461e254d28697214b4_f')
-        mock_request.assert_called_with('POST', url_call)
+        mock_request.assert_called_with('POST', url_call, timeout=(10, 60))
 
     def test_list_datafeed(self, mock_request):
         mock_response, url_call = mocked_response('LIST_DATAFEED', self.datafeed_client.config.data['agentUrl'])
@@ -37,7 +39,7 @@ class TestDataFeedClientV2(unittest.TestCase):
         self.assertEqual(datafeed_ids[0]['id'], mock_response.get_json()[0]['id'])
         self.assertEqual(datafeed_ids[1]['id'], mock_response.get_json()[1]['id'])
         self.assertEqual(datafeed_ids[2]['id'], mock_response.get_json()[2]['id'])
-        mock_request.assert_called_with('GET', url_call)
+        mock_request.assert_called_with('GET', url_call, timeout=(10, 30))
 
     def test_read_datafeed_empty_ackid(self, mock_request):
         """Test Datafeed Read first call conversation
@@ -52,7 +54,8 @@ class TestDataFeedClientV2(unittest.TestCase):
         self.assertEqual(mock_response.status_code, 200)
         self.assertEqual(ack_id, mock_response.get_json()['ackId'])
         self.assertEqual(events, mock_response.get_json()['events'])
-        mock_request.assert_called_with('POST', url_call, json={'ackId': ''})
+        mock_request.assert_called_with('POST', url_call, data=b'{"ackId":""}',
+                                        headers={'Content-Type': 'application/json'}, timeout=(10, 60))
 
     def test_read_datafeed(self, mock_request):
         """Test a datafeed read during conversation
@@ -67,7 +70,8 @@ class TestDataFeedClientV2(unittest.TestCase):
         self.assertEqual(mock_response.status_code, 200)
         self.assertEqual(ack_id, mock_response.get_json()['ackId'])
         self.assertEqual(events, mock_response.get_json()['events'])
-        mock_request.assert_called_with('POST', url_call, json={'ackId': 'test_ack_id'})
+        mock_request.assert_called_with('POST', url_call, data=b'{"ackId":"test_ack_id"}',
+                                        headers={'Content-Type': 'application/json'}, timeout=(10, 60))
 
     def test_delete_datafeed(self, mock_request):
         """Test deleting the datafeed
@@ -79,7 +83,72 @@ class TestDataFeedClientV2(unittest.TestCase):
         self.datafeed_client.delete_datafeed('test_datafeed_id')
 
         self.assertEqual(mock_response.status_code, 204)
-        mock_request.assert_called_with('DELETE', url_call)
+        mock_request.assert_called_with('DELETE', url_call, timeout=(10, 60))
+
+
+class TestDataFeedClientV2Async(IsolatedAsyncioTestCase):
+    def setUp(self):
+        configure = SymConfig(get_path_relative_to_resources_folder('./bot-config.json'))
+        configure.load_config()
+        configure.data['datafeedVersion'] = 'v2'
+
+        self.bot_client = SymBotClient(SymBotRSAAuth(configure), configure)
+        self.bot_client.execute_rest_call_async = AsyncMock()
+
+        self.datafeed_client = self.bot_client.get_datafeed_client()
+
+    async def test_create_datafeed_async(self):
+        self.bot_client.execute_rest_call_async.return_value = MockResponse(
+            201, get_path_relative_to_resources_folder('./response_content/datafeed_v2/create_datafeed_v2.json')
+        ).get_json()
+        datafeed_id = await self.datafeed_client.create_datafeed_async()
+
+        self.assertEqual(datafeed_id, '21449143d35a86461e254d28697214b4_f')
+        self.bot_client.execute_rest_call_async.assert_called_with('POST', '/agent/v5/datafeeds')
+
+    async def test_list_and_delete_datafeed_async(self):
+        self.bot_client.execute_rest_call_async.return_value = MockResponse(
+            200, get_path_relative_to_resources_folder('./response_content/datafeed_v2/list_datafeed_v2.json')
+        ).get_json()
+        datafeed_ids = await self.datafeed_client.list_datafeed_id_async()
+        self.assertEqual(datafeed_ids[0]['id'], '2c2e8bb339c5da5711b55e32ba7c4687_f')
+        self.bot_client.execute_rest_call_async.assert_called_with('GET', '/agent/v5/datafeeds')
+
+        self.bot_client.execute_rest_call_async.return_value = []
+        await self.datafeed_client.delete_datafeed_async('test_datafeed_id')
+        self.bot_client.execute_rest_call_async.assert_called_with('DELETE', '/agent/v5/datafeeds/test_datafeed_id')
+
+    async def test_read_datafeed_async_uses_previous_ack_id(self):
+        read_response = MockResponse(
+            200, get_path_relative_to_resources_folder('./response_content/datafeed_v2/read_datafeed_v2.json')
+        ).get_json()
+        self.bot_client.execute_rest_call_async.return_value = read_response
+
+        events = await self.datafeed_client.read_datafeed_async('test_datafeed_id')
+        self.assertEqual(events, read_response['events'])
+        self.assertEqual(self.datafeed_client.get_ack_id(), 'ack_id_string')
+        self.bot_client.execute_rest_call_async.assert_called_with(
+            'POST', '/agent/v5/datafeeds/test_datafeed_id/read', json={'ackId': ''})
+
+        await self.datafeed_client.read_datafeed_async('test_datafeed_id')
+        self.bot_client.execute_rest_call_async.assert_called_with(
+            'POST', '/agent/v5/datafeeds/test_datafeed_id/read', json={'ackId': 'ack_id_string'})
+
+    async def test_concurrent_reads_are_serialised(self):
+        """Two concurrent reads must not send the same ackId"""
+        sent_ack_ids = []
+        counter = iter(range(100))
+
+        async def read(method, url, json):
+            sent_ack_ids.append(json['ackId'])
+            await asyncio.sleep(0)
+            return {'ackId': 'ack_{}'.format(next(counter)), 'events': []}
+
+        self.bot_client.execute_rest_call_async.side_effect = read
+        await asyncio.gather(*(self.datafeed_client.read_datafeed_async('test_datafeed_id') for _ in range(3)))
+
+        self.assertEqual(sent_ack_ids, ['', 'ack_0', 'ack_1'])
+        self.assertEqual(self.datafeed_client.get_ack_id(), 'ack_2')
 
 
 def get_path_relative_to_resources_folder(path_relative_to_resources):
@@ -124,6 +193,7 @@ class MockResponse:
             with open(os.path.realpath(path)) as json_file:
                 self.data = json.load(json_file)
         self.text = json.dumps(self.data)
+        self.content = self.text.encode('utf-8')
 
     def get_json(self):
         return self.data
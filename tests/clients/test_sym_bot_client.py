@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from tests.util.loop_lag import LoopLagMonitor
+from tests.util.resource_util import get_resource_filepath
+
+# Loop lag above which the event loop is considered blocked, well below the blocking calls mocked
+MAX_LOOP_LAG_SEC = 0.1
+BLOCKING_CALL_SEC = 0.3
+
+
+class TestSymBotClientAsync(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.auth = MagicMock()
+        self.auth.get_session_token.return_value = 'session_token'
+        self.auth.get_key_manager_token.return_value = 'key_manager_token'
+        self.bot_client = SymBotClient(self.auth, self.config)
+
+    async def asyncTearDown(self):
+        await self.bot_client.close_async_sessions()
+
+    async def test_reauthentication_does_not_block_the_loop(self):
+        # Like the authenticators, which use requests and sleep between retries
+        self.auth.authenticate.side_effect = lambda: time.sleep(BLOCKING_CALL_SEC)
+        responses = [MockAsyncResponse(401, {'message': 'Invalid session'}), MockAsyncResponse(200, {'id': 456})]
+
+        with patch('aiohttp.ClientSession.request', new_callable=AsyncMock, side_effect=responses) as request:
+            async with LoopLagMonitor() as monitor:
+                bot_user_info = await self.bot_client.get_bot_user_info_async()
+
+        self.assertEqual(bot_user_info, {'id': 456})
+        self.auth.authenticate.assert_called_once()
+        self.assertEqual(request.call_count, 2)
+        self.assertLess(monitor.max_lag, MAX_LOOP_LAG_SEC)
+        # Cached afterwards
+        self.assertEqual(await self.bot_client.get_bot_user_info_async(), {'id': 456})
+
+    async def test_reauthentication_uses_authenticate_async(self):
+        self.auth.authenticate_async = AsyncMock()
+        self.bot_client.get_pod_session()
+
+        await self.bot_client.reauth_client_async()
+
+        self.auth.authenticate_async.assert_awaited_once()
+        self.auth.authenticate.assert_not_called()
+        self.assertEqual(self.bot_client.pod_session.headers['sessionToken'], 'session_token')
+
+    async def test_concurrent_unauthorized_calls_reauthenticate_once(self):
+        async def authenticate_async():
+            await asyncio.sleep(0.05)
+        self.auth.authenticate_async = AsyncMock(side_effect=authenticate_async)
+
+        async def request(session, method, url, **kwargs):
+            # Rejected until the tokens are refreshed, as if the session token expired
+            if self.bot_client.token_manager.generation == 0:
+                return MockAsyncResponse(401, {'message': 'Invalid session'})
+            return MockAsyncResponse(200, {'id': 456})
+
+        with patch('aiohttp.ClientSession.request', new=request):
+            results = await asyncio.gather(*[self.bot_client.execute_rest_call_async(
+                'GET', '/pod/v2/sessioninfo', params={'call': call}) for call in range(5)])
+
+        self.assertEqual(results, [{'id': 456}] * 5)
+        self.auth.authenticate_async.assert_awaited_once()
+
+    async def test_reauthentication_keeps_the_sessions_and_connections(self):
+        tokens = iter(['session_token', 'new_session_token'])
+        self.auth.get_session_token.side_effect = lambda: current_token
+        current_token = next(tokens)
+        requests_headers = []
+
+        async def request(session, method, url, **kwargs):
+            nonlocal current_token
+            requests_headers.append((session, kwargs['headers']))
+            if kwargs['headers']['sessionToken'] == 'session_token':
+                current_token = next(tokens)
+                return MockAsyncResponse(401, {'message': 'Invalid session'})
+            return MockAsyncResponse(200, {'id': 456})
+
+        with patch('aiohttp.ClientSession.request', new=request):
+            await self.bot_client.execute_rest_call_async('GET', '/agent/v1/info')
+            await self.bot_client.execute_rest_call_async('GET', '/pod/v2/sessioninfo')
+
+        agent_session = self.bot_client.get_async_agent_session()
+        pod_session = self.bot_client.get_async_pod_session()
+        self.assertEqual(requests_headers, [
+            (agent_session, {'sessionToken': 'session_token', 'keyManagerToken': 'key_manager_token'}),
+            (agent_session, {'sessionToken': 'new_session_token', 'keyManagerToken': 'key_manager_token'}),
+            (pod_session, {'sessionToken': 'new_session_token'})])
+        self.assertIs(agent_session.connector, pod_session.connector)
+        self.assertFalse(agent_session.closed)
+
+    async def test_sessions_share_the_configured_connector(self):
+        self.config.data['asyncConnectionLimit'] = 50
+        self.config.data['asyncConnectionLimitPerHost'] = 20
+        self.config.data['asyncDnsCacheTtl'] = 300
+        connector = self.bot_client.get_async_connector()
+
+        self.assertIs(self.bot_client.get_async_pod_session().connector, connector)
+        self.assertIs(self.bot_client.get_async_agent_session().connector, connector)
+        self.assertEqual((connector.limit, connector.limit_per_host), (50, 20))
+
+        await self.bot_client.close_async_sessions()
+        self.assertTrue(connector.closed)
+
+    async def test_datafeed_reads_use_their_own_session(self):
+        self.config.data['datafeedReadTimeout'] = 45
+        sessions = {}
+
+        async def request(session, method, url, **kwargs):
+            sessions[url.rsplit('/', 1)[-1]] = session
+            return MockAsyncResponse(200, {'id': 456})
+
+        with patch('aiohttp.ClientSession.request', new=request):
+            await self.bot_client.execute_rest_call_async('GET', '/agent/v4/datafeed/datafeed_id/read')
+            await self.bot_client.execute_rest_call_async('GET', '/agent/v1/info')
+
+        datafeed_session = self.bot_client.get_async_datafeed_session()
+        self.assertIs(sessions['read'], datafeed_session)
+        self.assertIs(sessions['info'], self.bot_client.get_async_agent_session())
+        self.assertIsNot(datafeed_session.connector, self.bot_client.get_async_connector())
+        self.assertEqual(datafeed_session.connector.limit, 2)
+        self.assertEqual(datafeed_session.timeout.sock_read, 45)
+
+        await self.bot_client.close_async_sessions()
+        self.assertTrue(datafeed_session.closed)
+
+
+class MockAsyncResponse:
+    """The parts of aiohttp.ClientResponse used by execute_rest_call_async"""
+
+    def __init__(self, status, payload, headers=None):
+        self.status = status
+        self.body = json.dumps(payload).encode('utf-8')
+        self.headers = headers or {}
+
+    def release(self):
+        pass
+
+    async def read(self):
+        return self.body
+
+    async def text(self):
+        return self.body.decode('utf-8')
@@ -15,3 +15,18 @@ class TestSymConfig(unittest.TestCase):
 		self.assertEqual(self.config.data['keyAuthHost'], "https://MY_ENVIRONMENT.symphony.com:443/keyAuthContext")
 		self.assertEqual(self.config.data['podHost'], "https://MY_ENVIRONMENT.symphony.com:443/podContext")
 		self.assertEqual(self.config.data['agentHost'], "https://MY_ENVIRONMENT.symphony.com:443")
+
+	def test_connection_pool_config(self):
+		self.assertEqual(self.config.get_connection_pool_config('pod'),
+						 {'pool_maxsize': 10, 'pool_block': False, 'keep_alive': True})
+
+		self.config.data['connectionPoolSize'] = 20
+		self.config.data['agentConnectionPoolSize'] = 50
+		self.config.data['agentConnectionPoolBlock'] = True
+		self.config.data['keyManagerKeepAlive'] = False
+		self.assertEqual(self.config.get_connection_pool_config('pod'),
+						 {'pool_maxsize': 20, 'pool_block': False, 'keep_alive': True})
+		self.assertEqual(self.config.get_connection_pool_config('agent'),
+						 {'pool_maxsize': 50, 'pool_block': True, 'keep_alive': True})
+		self.assertEqual(self.config.get_connection_pool_config('keyManager'),
+						 {'pool_maxsize': 20, 'pool_block': False, 'keep_alive': False})
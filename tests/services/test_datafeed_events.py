@@ -0,0 +1,61 @@
+import pickle
+import unittest
+
+from sym_api_client_python.services.datafeed_events import (
+    DatafeedEvent, ElementsAction, MessageSent, UserJoinedRoom)
+
+
+def message_sent_event():
+    return {'id': 'event-1', 'messageId': 'message-1', 'timestamp': 1000, 'type': 'MESSAGESENT',
+            'initiator': {'user': {'userId': 123}},
+            'payload': {'messageSent': {'message': {'messageId': 'message-1',
+                                                    'stream': {'streamId': 'abc', 'streamType': 'IM'}}}}}
+
+
+class TestDatafeedEvents(unittest.TestCase):
+
+    def test_from_dict_uses_the_class_of_the_type(self):
+        event = DatafeedEvent.from_dict(message_sent_event())
+        self.assertIsInstance(event, MessageSent)
+        self.assertIs(DatafeedEvent.from_dict(event), event)
+
+        unknown = DatafeedEvent.from_dict({'type': 'UNKNOWN'})
+        self.assertIs(type(unknown), DatafeedEvent)
+        self.assertIsNone(unknown.data)
+
+    def test_fields(self):
+        raw = message_sent_event()
+        event = DatafeedEvent.from_dict(raw)
+
+        self.assertEqual(event.id, 'event-1')
+        self.assertEqual(event.message_id, 'message-1')
+        self.assertEqual(event.timestamp, 1000)
+        self.assertEqual(event.initiator_user_id, 123)
+        self.assertIs(event.message, raw['payload']['messageSent']['message'])
+        self.assertEqual(event.stream_id, 'abc')
+        self.assertEqual(event.stream_type, 'IM')
+
+        joined = UserJoinedRoom.wrap({'payload': {'userJoinedRoom': {
+            'stream': {'streamId': 'room'}, 'affectedUser': {'userId': 456}}}})
+        self.assertEqual(joined.stream_id, 'room')
+        self.assertEqual(joined.affected_user_id, 456)
+
+    def test_fields_are_decoded_lazily(self):
+        event = DatafeedEvent.from_dict({'type': 'MESSAGESENT', 'payload': {}})
+        with self.assertRaises(KeyError):
+            event.message
+        self.assertFalse(hasattr(event, '__dict__'))
+
+    def test_dict_access(self):
+        raw = message_sent_event()
+        event = ElementsAction.wrap(DatafeedEvent.from_dict(raw))
+
+        self.assertIs(event.raw, raw)
+        self.assertEqual(event['type'], 'MESSAGESENT')
+        self.assertIn('messageId', event)
+        self.assertEqual(event.get('missing', 'default'), 'default')
+
+    def test_pickle(self):
+        event = pickle.loads(pickle.dumps(DatafeedEvent.from_dict(message_sent_event())))
+        self.assertIsInstance(event, MessageSent)
+        self.assertEqual(event.raw, message_sent_event())
@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+
+from sym_api_client_python.services.event_deduplicator import EventDeduplicator
+
+
+class TestEventDeduplicator(unittest.TestCase):
+
+    def test_duplicates_are_detected(self):
+        deduplicator = EventDeduplicator()
+
+        self.assertFalse(deduplicator.is_duplicate({'id': 'a', 'messageId': 'm1'}))
+        self.assertFalse(deduplicator.is_duplicate({'id': 'b', 'messageId': 'm1'}))
+        self.assertTrue(deduplicator.is_duplicate({'id': 'a', 'messageId': 'm1'}))
+        self.assertFalse(deduplicator.is_duplicate({'messageId': 'm2'}))
+        self.assertTrue(deduplicator.is_duplicate({'messageId': 'm2'}))
+        # Events without ids are never considered duplicates, nor counted
+        self.assertFalse(deduplicator.is_duplicate({}))
+        self.assertFalse(deduplicator.is_duplicate({}))
+
+        self.assertEqual(deduplicator.get_stats(), {'size': 3, 'checked_events': 5, 'duplicate_events': 2,
+                                                    'hit_rate': 0.4})
+
+    def test_least_recently_seen_is_evicted(self):
+        deduplicator = EventDeduplicator(max_size=2)
+        deduplicator.is_duplicate({'id': 'a'})
+        deduplicator.is_duplicate({'id': 'b'})
+        # a becomes the most recently seen, b is evicted when c comes in
+        self.assertTrue(deduplicator.is_duplicate({'id': 'a'}))
+        deduplicator.is_duplicate({'id': 'c'})
+
+        self.assertFalse(deduplicator.is_duplicate({'id': 'b'}))
+        self.assertEqual(deduplicator.get_stats()['size'], 2)
+
+    @patch('sym_api_client_python.services.event_deduplicator.time.monotonic')
+    def test_ids_expire_after_ttl(self, monotonic):
+        deduplicator = EventDeduplicator(ttl_sec=10)
+        monotonic.return_value = 100
+        deduplicator.is_duplicate({'id': 'a'})
+        monotonic.return_value = 105
+        self.assertTrue(deduplicator.is_duplicate({'id': 'a'}))
+        monotonic.return_value = 114
+        self.assertTrue(deduplicator.is_duplicate({'id': 'a'}))
+        monotonic.return_value = 125
+        self.assertFalse(deduplicator.is_duplicate({'id': 'a'}))
@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.datafeed_event_service import DataFeedEventService
+from sym_api_client_python.listeners.im_listener import IMListener
+from sym_api_client_python.services.event_dispatcher import ThreadPoolEventDispatcher
+from tests.util.resource_util import get_resource_filepath
+
+
+class TestThreadPoolEventDispatcher(unittest.TestCase):
+
+    def test_events_run_in_parallel(self):
+        dispatcher = ThreadPoolEventDispatcher(pool_size=2)
+        barrier = threading.Barrier(2, timeout=2)
+
+        # Both handlers have to run at the same time to pass the barrier
+        dispatcher.submit(lambda event: barrier.wait(), 'a')
+        dispatcher.submit(lambda event: barrier.wait(), 'b')
+        dispatcher.shutdown()
+
+        self.assertFalse(barrier.broken)
+        self.assertEqual(dispatcher.pending_events, 0)
+
+    def test_stream_order_is_preserved(self):
+        dispatcher = ThreadPoolEventDispatcher(pool_size=4)
+        handled = []
+
+        def handler(event):
+            if event == ('a', 0):
+                time.sleep(0.05)
+            handled.append(event)
+
+        for index in range(3):
+            dispatcher.submit(handler, ('a', index), stream_key='a')
+        dispatcher.submit(handler, ('b', 0), stream_key='b')
+        dispatcher.shutdown()
+
+        self.assertEqual([event for event in handled if event[0] == 'a'], [('a', 0), ('a', 1), ('a', 2)])
+        # b is not held back by the slow first event of a
+        self.assertEqual(handled[0], ('b', 0))
+
+    def test_submit_blocks_when_max_pending_reached(self):
+        dispatcher = ThreadPoolEventDispatcher(pool_size=1, max_pending_events=1)
+        release = threading.Event()
+        dispatcher.submit(lambda event: release.wait(), 'a')
+
+        second_submit = threading.Thread(target=dispatcher.submit, args=(lambda event: None, 'b'))
+        second_submit.start()
+        second_submit.join(0.05)
+        self.assertTrue(second_submit.is_alive())
+
+        release.set()
+        second_submit.join(1)
+        self.assertFalse(second_submit.is_alive())
+        dispatcher.shutdown()
+        self.assertEqual(dispatcher.peak_pending_events, 1)
+
+    def test_listener_exception_does_not_stop_dispatcher(self):
+        dispatcher = ThreadPoolEventDispatcher(pool_size=1)
+        handled = []
+
+        def handler(event):
+            if event == 'fail':
+                raise ValueError(event)
+            handled.append(event)
+
+        with self.assertLogs('sym_api_client_python.services.event_dispatcher', level='ERROR'):
+            dispatcher.submit(handler, 'fail', stream_key='a')
+            dispatcher.submit(handler, 'ok', stream_key='a')
+            dispatcher.shutdown()
+        self.assertEqual(handled, ['ok'])
+
+
+class TestDataFeedEventServiceThreadPool(unittest.TestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.client = SymBotClient(None, self.config)
+        self.client.get_bot_user_info = MagicMock(return_value={'id': 456})
+
+    def test_read_datafeed_with_thread_pool(self):
+        service = DataFeedEventService(self.client, thread_pool_size=4)
+        listener = RecordingIMListener()
+        service.add_im_listener(listener)
+
+        events = [{'type': 'MESSAGESENT', 'timestamp': 0, 'messageId': str(i),
+                   'payload': {'messageSent': {'message': {'messageId': str(i),
+                                                           'stream': {'streamId': 's', 'streamType': 'IM'}}}},
+                   'initiator': {'user': {'userId': 123}}} for i in range(10)]
+
+        def read_datafeed(datafeed_id):
+            service.deactivate_datafeed(wait_for_handler_completions=False)
+            return events
+
+        datafeed_service = service.datafeed_event_service
+        datafeed_service.datafeed_client = MagicMock()
+        datafeed_service.datafeed_client.read_datafeed.side_effect = read_datafeed
+        service.read_datafeed()
+
+        # All events were handled before read_datafeed returned, on the pool threads
+        self.assertEqual(sorted(listener.handled), sorted(str(i) for i in range(10)))
+        self.assertNotIn(threading.get_ident(), listener.threads)
+        self.assertIsNone(datafeed_service.event_dispatcher)
+
+
+class RecordingIMListener(IMListener):
+
+    def __init__(self):
+        self.handled = []
+        self.threads = set()
+
+    def on_im_message(self, message):
+        time.sleep(0.01)
+        self.threads.add(threading.get_ident())
+        self.handled.append(message['messageId'])
+
+    def on_im_created(self, stream):
+        pass  # Not used
@@ -0,0 +1,76 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from sym_api_client_python.services.latency_recorder import LatencyHistogram, LatencyRecorder
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 101):
+            histogram.record(millis / 1000)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        self.assertAlmostEqual(snapshot['mean'], 0.0505)
+        self.assertEqual(snapshot['max'], 0.1)
+        # Buckets are 20% wide
+        self.assertTrue(0.05 <= snapshot['p50'] <= 0.05 * 1.2)
+        self.assertTrue(0.095 <= snapshot['p95'] <= 0.1)
+        self.assertTrue(0.099 <= snapshot['p99'] <= 0.1)
+
+    def test_empty_histogram(self):
+        self.assertEqual(LatencyHistogram().snapshot(),
+                         {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None})
+
+
+@patch('sym_api_client_python.services.latency_recorder.time')
+class TestLatencyRecorder(unittest.TestCase):
+
+    def test_completed_event_is_recorded(self, mock_time):
+        recorder = LatencyRecorder()
+        mock_time.time.return_value = 1000.0
+        mock_time.monotonic.return_value = 10.0
+        recorder.received('id', 'MESSAGESENT', 999500)
+        mock_time.monotonic.return_value = 10.1
+        recorder.dequeued('id')
+        mock_time.monotonic.return_value = 10.3
+        mock_time.time.return_value = 1000.3
+
+        self.assertEqual(recorder.completed('id'), (999500, 10.0, 10.1, 10.3))
+        self.assertEqual(len(recorder), 0)
+        self.assertIsNone(recorder.completed('id'))
+
+        snapshot = recorder.snapshot()['MESSAGESENT']
+        self.assertAlmostEqual(snapshot['queue_wait']['max'], 0.1)
+        self.assertAlmostEqual(snapshot['handler']['max'], 0.2)
+        self.assertAlmostEqual(snapshot['end_to_end']['max'], 0.8)
+
+        recorder.reset()
+        self.assertEqual(recorder.snapshot(), {})
+
+    def test_traces_are_bounded(self, mock_time):
+        recorder = LatencyRecorder(max_traces=2, ttl_sec=60)
+        mock_time.monotonic.return_value = 0
+        recorder.received('a', 'MESSAGESENT', 0)
+        recorder.received('b', 'MESSAGESENT', 0)
+        recorder.received('c', 'MESSAGESENT', 0)
+        self.assertEqual(len(recorder), 2)
+        self.assertIsNone(recorder.completed('a'))
+
+        # b and c expire
+        mock_time.monotonic.return_value = 61
+        recorder.received('d', 'MESSAGESENT', 0)
+        self.assertEqual(len(recorder), 1)
+        self.assertEqual(recorder.evicted_traces, 3)
+
+    def test_discarded_event_is_not_recorded(self, mock_time):
+        recorder = LatencyRecorder()
+        mock_time.monotonic.return_value = 0
+        recorder.received('a', 'UNKNOWN', 0)
+        recorder.discard('a')
+        self.assertEqual(len(recorder), 0)
+        self.assertIsNone(recorder.completed('a'))
+        self.assertEqual(recorder.snapshot(), {})
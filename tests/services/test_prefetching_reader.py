@@ -0,0 +1,102 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.datafeed_event_service import DataFeedEventService
+from sym_api_client_python.services.prefetching_reader import PrefetchingDatafeedReader
+from tests.services.test_event_dispatcher import RecordingIMListener
+from tests.util.resource_util import get_resource_filepath
+
+
+class TestPrefetchingDatafeedReader(unittest.TestCase):
+
+    def setUp(self):
+        self.stop = False
+        self.reads = 0
+
+    def read_events(self):
+        self.reads += 1
+        time.sleep(0.001)
+        return [self.reads]
+
+    def test_reads_while_consumer_is_busy(self):
+        reader = PrefetchingDatafeedReader(self.read_events, lambda: self.stop, high_watermark=1000,
+                                           low_watermark=500)
+        reader.start()
+        # The consumer is busy: reads go on regardless
+        time.sleep(0.05)
+        self.assertGreater(reader.buffered_events, 1)
+
+        events = reader.get_events(timeout=1)
+        self.assertEqual(events, list(range(1, len(events) + 1)))
+
+        self.stop = True
+        reader.join(1)
+        self.assertFalse(reader.is_alive())
+
+    def test_reads_pause_at_high_watermark(self):
+        reader = PrefetchingDatafeedReader(self.read_events, lambda: self.stop, high_watermark=5,
+                                           low_watermark=2, batch_size=2)
+        reader.start()
+        time.sleep(0.05)
+        self.assertEqual(reader.buffered_events, 5)
+        self.assertEqual(reader.pause_count, 1)
+
+        # Down to 3 events, still above the low watermark
+        self.assertEqual(reader.get_events(), [1, 2])
+        time.sleep(0.02)
+        self.assertEqual(reader.buffered_events, 3)
+
+        # Down to 1 event, reads resume until the high watermark
+        self.assertEqual(reader.get_events(), [3, 4])
+        time.sleep(0.05)
+        self.assertEqual(reader.buffered_events, 5)
+        self.assertEqual(reader.get_stats()['pause_count'], 2)
+
+        self.stop = True
+        reader.wake_up()
+        reader.join(1)
+        self.assertFalse(reader.is_alive())
+
+    def test_watermarks_are_validated(self):
+        with self.assertRaises(ValueError):
+            PrefetchingDatafeedReader(self.read_events, lambda: self.stop, high_watermark=1, low_watermark=2)
+
+
+class TestDataFeedEventServicePrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.client = SymBotClient(None, self.config)
+        self.client.get_bot_user_info = MagicMock(return_value={'id': 456})
+
+    def test_read_datafeed_with_prefetch(self):
+        service = DataFeedEventService(self.client, prefetch=True)
+        listener = RecordingIMListener()
+        service.add_im_listener(listener)
+        reader_threads = set()
+
+        def read_datafeed(datafeed_id):
+            reader_threads.add(threading.get_ident())
+            read = datafeed_service.prefetching_reader.read_count
+            if read == 3:
+                service.deactivate_datafeed()
+            return [{'type': 'MESSAGESENT', 'timestamp': 0, 'messageId': str(read),
+                     'payload': {'messageSent': {'message': {'messageId': str(read),
+                                                             'stream': {'streamId': 's', 'streamType': 'IM'}}}},
+                     'initiator': {'user': {'userId': 123}}}]
+
+        datafeed_service = service.datafeed_event_service
+        datafeed_service.datafeed_client = MagicMock()
+        datafeed_service.datafeed_client.read_datafeed.side_effect = read_datafeed
+        service.read_datafeed()
+
+        # Events read before deactivation are all handled, on the calling thread
+        self.assertEqual(listener.handled, ['0', '1', '2', '3'])
+        self.assertEqual(listener.threads, {threading.get_ident()})
+        self.assertNotIn(threading.get_ident(), reader_threads)
+        self.assertFalse(datafeed_service.prefetching_reader.is_alive())
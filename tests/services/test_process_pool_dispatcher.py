@@ -0,0 +1,131 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from functools import partial
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, AsyncMock
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.datafeed_event_service import DataFeedEventService, AsyncDataFeedEventService
+from sym_api_client_python.listeners.im_listener import IMListener
+from sym_api_client_python.services.process_pool_dispatcher import ProcessPoolEventDispatcher
+from tests.util.resource_util import get_resource_filepath
+
+
+def create_bot_client():
+    config = SymConfig(get_resource_filepath('./bot-config.json'))
+    config.load_config()
+    return SymBotClient(None, config)
+
+
+def create_listeners(output_dir, bot_client):
+    return [FileWritingIMListener(output_dir)]
+
+
+def create_async_listeners(output_dir, bot_client):
+    return [AsyncFileWritingIMListener(output_dir)]
+
+
+def make_event(message_id):
+    return {'type': 'MESSAGESENT', 'timestamp': 0, 'messageId': message_id,
+            'payload': {'messageSent': {'message': {'messageId': message_id,
+                                                    'stream': {'streamId': 's', 'streamType': 'IM'}}}},
+            'initiator': {'user': {'userId': 123}}}
+
+
+class TestProcessPoolEventDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.client = create_bot_client()
+        self.client.get_bot_user_info = MagicMock(return_value={'id': 456})
+
+    def test_read_datafeed_with_process_pool(self):
+        process_pool = ProcessPoolEventDispatcher(2, create_bot_client, partial(create_listeners, self.output_dir))
+        service = DataFeedEventService(self.client, process_pool=process_pool, ordered_by_stream=True)
+        events = [make_event(str(i)) for i in range(5)] + [make_event('fail')]
+
+        def read_datafeed(datafeed_id):
+            service.deactivate_datafeed(wait_for_handler_completions=False)
+            return events
+
+        datafeed_service = service.datafeed_event_service
+        datafeed_service.datafeed_client = MagicMock()
+        datafeed_service.datafeed_client.read_datafeed.side_effect = read_datafeed
+        with self.assertLogs('sym_api_client_python.services.process_pool_dispatcher', level='ERROR'):
+            service.read_datafeed()
+
+        # Handled in order, in another process, and the failure was reported to the parent
+        self.assertEqual(read_handled_events(self.output_dir), ['0', '1', '2', '3', '4'])
+        self.assertEqual(process_pool.handled_events, 6)
+        self.assertEqual(process_pool.failed_events, 1)
+        self.assertIsNone(process_pool.executor)
+
+
+class TestProcessPoolEventDispatcherAsync(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.client = create_bot_client()
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
+        self.client.close_async_sessions = AsyncMock()
+        self.exceptions = []
+
+    async def test_async_service_with_process_pool(self):
+        process_pool = ProcessPoolEventDispatcher(2, create_bot_client,
+                                                  partial(create_async_listeners, self.output_dir))
+        service = AsyncDataFeedEventService(self.client, process_pool=process_pool,
+                                            exception_handler=self.exceptions.append)
+        ran = []
+
+        async def read_datafeed(_arg):
+            await asyncio.sleep(0)
+            if ran:
+                while process_pool.handled_events < 3:
+                    await asyncio.sleep(0.01)
+                await service.deactivate_datafeed()
+                return []
+            ran.append(True)
+            return [make_event('0'), make_event('fail'), make_event('1')]
+
+        service.datafeed_client = AsyncMock()
+        service.datafeed_client.read_datafeed_async.side_effect = read_datafeed
+        await asyncio.gather(service.read_datafeed(), service.handle_events(), service.handle_exceptions())
+
+        self.assertEqual(sorted(read_handled_events(self.output_dir)), ['0', '1'])
+        self.assertEqual(len(self.exceptions), 1)
+        self.assertIsInstance(self.exceptions[0], ValueError)
+
+
+def read_handled_events(output_dir):
+    path = os.path.join(output_dir, 'handled')
+    if not os.path.exists(path):
+        return []
+    with open(path) as handled_file:
+        lines = handled_file.read().split()
+    # Events were handled in worker processes
+    assert all(int(pid) != os.getpid() for pid in lines[1::2])
+    return lines[0::2]
+
+
+class FileWritingIMListener(IMListener):
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def on_im_message(self, message):
+        if message['messageId'] == 'fail':
+            raise ValueError('Listener failure')
+        with open(os.path.join(self.output_dir, 'handled'), 'a') as handled_file:
+            handled_file.write('{} {}\n'.format(message['messageId'], os.getpid()))
+
+    def on_im_created(self, stream):
+        pass  # Not used
+
+
+class AsyncFileWritingIMListener(FileWritingIMListener):
+
+    async def on_im_message(self, message):
+        super().on_im_message(message)
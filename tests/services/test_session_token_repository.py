@@ -0,0 +1,81 @@
+import os
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sym_api_client_python.auth.rsa_auth import SymBotRSAAuth
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.services.session_token_repository import (OnDiskSessionTokenRepository,
+                                                                      SESSION_TOKEN_FILE,
+                                                                      create_session_token_repository)
+from tests.util.resource_util import get_resource_filepath
+
+
+class TestOnDiskSessionTokenRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.config.data['reuseSessionTokens'] = True
+        self.config.data['sessionTokenFilePath'] = self.folder
+        self.repository = create_session_token_repository(self.config)
+
+    def test_disabled_by_default(self):
+        del self.config.data['reuseSessionTokens']
+        self.assertIsNone(create_session_token_repository(self.config))
+
+    def test_store_and_read_tokens(self):
+        self.assertIsNone(self.repository.read_tokens_from_file())
+
+        self.repository.store_tokens_to_file('session_token', 'key_manager_token')
+
+        self.assertEqual(self.repository.session_token_file_path, os.path.join(self.folder, SESSION_TOKEN_FILE))
+        self.assertEqual(self.repository.read_tokens_from_file(), ('session_token', 'key_manager_token'))
+        mode = stat.S_IMODE(os.stat(self.repository.session_token_file_path).st_mode)
+        self.assertEqual(mode, 0o600)
+        self.assertEqual(os.listdir(self.folder), [SESSION_TOKEN_FILE])
+
+    def test_expired_tokens_are_ignored(self):
+        repository = OnDiskSessionTokenRepository(self.folder, self.config, ttl_sec=0)
+        repository.store_tokens_to_file('session_token', 'key_manager_token')
+
+        self.assertIsNone(repository.read_tokens_from_file())
+
+    def test_tokens_of_another_bot_are_ignored(self):
+        self.repository.store_tokens_to_file('session_token', 'key_manager_token')
+        self.config.data['botUsername'] = 'another-bot'
+
+        self.assertIsNone(create_session_token_repository(self.config).read_tokens_from_file())
+
+    def test_corrupted_file_is_ignored(self):
+        with open(self.repository.session_token_file_path, 'w') as session_token_file:
+            session_token_file.write('{"owner": ')
+
+        with self.assertLogs('sym_api_client_python.services.session_token_repository', level='WARNING'):
+            self.assertIsNone(self.repository.read_tokens_from_file())
+
+    def test_cached_tokens_are_used_on_first_authentication_only(self):
+        self.repository.store_tokens_to_file('cached_session_token', 'cached_key_manager_token')
+        auth = SymBotRSAAuth(self.config)
+
+        def session_authenticate():
+            auth.session_token = 'session_token'
+
+        def key_manager_authenticate():
+            auth.key_manager_token = 'key_manager_token'
+
+        with patch.object(auth, 'session_authenticate', side_effect=session_authenticate) as session_auth, \
+                patch.object(auth, 'key_manager_authenticate', side_effect=key_manager_authenticate):
+            auth.authenticate()
+            session_auth.assert_not_called()
+            self.assertEqual(auth.get_session_token(), 'cached_session_token')
+            self.assertEqual(auth.get_key_manager_token(), 'cached_key_manager_token')
+
+            # Reauthentication, for instance after a 401 because the cached tokens were revoked
+            auth.authenticate()
+            session_auth.assert_called_once()
+
+        self.assertEqual(auth.get_session_token(), 'session_token')
+        self.assertEqual(self.repository.read_tokens_from_file(), ('session_token', 'key_manager_token'))
@@ -0,0 +1,131 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.connection_pool import PooledHTTPAdapter, create_tcp_connector
+from tests.util.resource_util import get_resource_filepath
+
+THREADS = 8
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    barrier = None
+
+    def do_GET(self):
+        # Answers once all the threads have a connection, so that they are all in use at once
+        self.barrier.wait(timeout=5)
+        body = b'{"id": 456}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LongPollHandler(BaseHTTPRequestHandler):
+    """Holds datafeed reads until released, answers the other calls right away"""
+    protocol_version = 'HTTP/1.1'
+    release_reads = None
+
+    def do_GET(self):
+        if self.path.endswith('/read'):
+            self.release_reads.wait(timeout=5)
+        body = b'{"path": "%s"}' % self.path.encode('ascii')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.config.data['podConnectionPoolSize'] = THREADS
+        self.config.data['agentKeepAlive'] = False
+        auth = MagicMock()
+        auth.get_session_token.return_value = 'session_token'
+        auth.get_key_manager_token.return_value = 'key_manager_token'
+        self.bot_client = SymBotClient(auth, self.config)
+
+    def test_sessions_use_the_configured_pools(self):
+        pod_adapter = self.bot_client.get_pod_session().get_adapter('https://pod')
+        self.assertIsInstance(pod_adapter, PooledHTTPAdapter)
+        self.assertEqual(pod_adapter._pool_maxsize, THREADS)
+        self.assertEqual(self.bot_client.get_pod_session().headers['Connection'], 'keep-alive')
+
+        agent_session = self.bot_client.get_agent_session()
+        self.assertEqual(agent_session.get_adapter('https://agent')._pool_maxsize, 10)
+        self.assertEqual(agent_session.headers['Connection'], 'close')
+
+    def test_connections_are_reused_across_threads(self):
+        SlowHandler.barrier = threading.Barrier(THREADS)
+        server = ThreadingHTTPServer(('localhost', 0), SlowHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.config.data['podUrl'] = 'http://localhost:{}'.format(server.server_address[1])
+
+        with ThreadPoolExecutor(THREADS) as executor:
+            for _ in range(3):
+                # Distinct calls, identical concurrent ones would be coalesced
+                results = list(executor.map(lambda call: self.bot_client.execute_rest_call(
+                    'GET', '/pod/v2/sessioninfo', params={'call': call}), range(THREADS)))
+                self.assertEqual(results, [{'id': 456}] * THREADS)
+
+        stats = self.bot_client.get_connection_pool_stats()
+        self.assertEqual(stats['agent'], [])
+        self.assertEqual(stats['pod'], [{
+            'host': 'localhost', 'port': server.server_address[1], 'scheme': 'http', 'max_size': THREADS,
+            'in_use': 0, 'idle': THREADS, 'connections_created': THREADS, 'requests': 3 * THREADS}])
+
+    def test_tcp_connector_config(self):
+        self.config.data['asyncDnsCacheTtl'] = 300
+        with patch('aiohttp.TCPConnector') as connector_class:
+            create_tcp_connector(self.config.get_async_connector_config(), 'ssl_context')
+            self.config.data['keepAlive'] = False
+            create_tcp_connector(self.config.get_async_connector_config())
+
+        self.assertEqual(connector_class.call_args_list[0].kwargs, {
+            'limit': 100, 'limit_per_host': 0, 'ttl_dns_cache': 300, 'ssl': 'ssl_context', 'keepalive_timeout': 15})
+        self.assertEqual(connector_class.call_args_list[1].kwargs, {
+            'limit': 100, 'limit_per_host': 0, 'ttl_dns_cache': 300, 'ssl': None, 'force_close': True})
+
+    def test_datafeed_reads_do_not_hold_agent_connections(self):
+        LongPollHandler.release_reads = threading.Event()
+        server = ThreadingHTTPServer(('localhost', 0), LongPollHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.config.data['agentUrl'] = 'http://localhost:{}'.format(server.server_address[1])
+        # A single agent connection, calls waiting for it
+        self.config.data['agentConnectionPoolSize'] = 1
+        self.config.data['agentConnectionPoolBlock'] = True
+        self.config.data['agentKeepAlive'] = True
+
+        with ThreadPoolExecutor(1) as executor:
+            read = executor.submit(self.bot_client.execute_rest_call, 'GET', '/agent/v4/datafeed/id/read')
+            for _ in range(2):
+                self.assertEqual(self.bot_client.execute_rest_call('GET', '/agent/v1/info', timeout=2),
+                                 {'path': '/agent/v1/info'})
+            self.assertFalse(read.done())
+            LongPollHandler.release_reads.set()
+            self.assertEqual(read.result(timeout=5), {'path': '/agent/v4/datafeed/id/read'})
+
+        stats = self.bot_client.get_connection_pool_stats()
+        self.assertEqual([pool['requests'] for pool in stats['agent']], [2])
+        self.assertEqual([pool['requests'] for pool in stats['datafeed']], [1])
+        self.assertEqual(stats['datafeed'][0]['max_size'], 2)
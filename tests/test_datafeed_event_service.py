@@ -1,4 +1,5 @@
 import asyncio
+import time
 from unittest import mock
 from unittest.async_case import IsolatedAsyncioTestCase
 from unittest.mock import MagicMock, AsyncMock
@@ -6,8 +7,10 @@ from unittest.mock import MagicMock, AsyncMock
 from sym_api_client_python.clients.sym_bot_client import SymBotClient
 from sym_api_client_python.configure.configure import SymConfig
 from sym_api_client_python.datafeed_event_service import AsyncDataFeedEventService
+from sym_api_client_python.exceptions.ServerErrorException import ServerErrorException
 from sym_api_client_python.listeners.im_listener import IMListener
 from tests.clients.test_datafeed_client import get_path_relative_to_resources_folder
+from tests.util.loop_lag import LoopLagMonitor
 
 
 class TestDataFeedEventService(IsolatedAsyncioTestCase):
@@ -23,7 +26,7 @@ class TestDataFeedEventService(IsolatedAsyncioTestCase):
         new_callable=AsyncMock)
     async def test_read_datafeed_event_no_id(self, datafeed_client_mock):
         service = AsyncDataFeedEventService(self.client)
-        self.client.get_bot_user_info = MagicMock(return_value={'id': 456})
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
 
         service.datafeed_client = datafeed_client_mock
         datafeed_client_mock.read_datafeed_async.side_effect = self.return_event_no_id_first_time
@@ -40,8 +43,9 @@ class TestDataFeedEventService(IsolatedAsyncioTestCase):
         'sym_api_client_python.clients.datafeed_client.DataFeedClient',
         new_callable=AsyncMock)
     async def test_read_datafeed_event_unknown_type(self, datafeed_client_mock):
-        service = AsyncDataFeedEventService(self.client)
-        self.client.get_bot_user_info = MagicMock(return_value={'id': 456})
+        trace_recorder = []
+        service = AsyncDataFeedEventService(self.client, trace_recorder=trace_recorder)
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
 
         service.datafeed_client = datafeed_client_mock
         datafeed_client_mock.read_datafeed_async.side_effect = self.return_event_unknown_type_first_time
@@ -51,8 +55,193 @@ class TestDataFeedEventService(IsolatedAsyncioTestCase):
 
         # Simulate start_datafeed
         await asyncio.gather(service.read_datafeed(), service.handle_events())
+        await asyncio.sleep(0)
+
+        self.assertIsNotNone(listener.last_message)
+        # The unsupported event is not left behind in the traces
+        self.assertEqual(len(service.latency_recorder), 0)
+        self.assertEqual([trace.message_id for trace in trace_recorder], ['234'])
+        self.assertEqual(list(service.latency_recorder.snapshot()), ['MESSAGESENT'])
+
+    @mock.patch(
+        'sym_api_client_python.clients.datafeed_client.DataFeedClient',
+        new_callable=AsyncMock)
+    async def test_read_datafeed_v2(self, datafeed_client_mock):
+        self.config.data['datafeedVersion'] = 'v2'
+        service = AsyncDataFeedEventService(self.client)
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
+
+        service.datafeed_client = datafeed_client_mock
+        datafeed_client_mock.get_ack_id = MagicMock(return_value='ack_id')
+        datafeed_client_mock.list_datafeed_id_async.return_value = [{'id': 'datafeed_v2_id'}]
+        datafeed_client_mock.read_datafeed_async.side_effect = self.return_event_v2_first_time
+
+        listener = IMListenerRecorder(service)
+        service.add_im_listener(listener)
+
+        # Simulate start_datafeed
+        service.datafeed_id = await service._get_or_create_datafeed_id_v2_async()
+        await asyncio.gather(service.read_datafeed(), service.handle_events())
+
+        self.assertIsNotNone(listener.last_message)
+        datafeed_client_mock.create_datafeed_async.assert_not_called()
+        datafeed_client_mock.read_datafeed_async.assert_called_with('datafeed_v2_id', 'ack_id')
+
+    @mock.patch(
+        'sym_api_client_python.clients.datafeed_client.DataFeedClient',
+        new_callable=AsyncMock)
+    async def test_bounded_in_flight_and_backpressure(self, datafeed_client_mock):
+        service = AsyncDataFeedEventService(self.client, max_in_flight=2, max_queue_size=1)
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
+        self.client.close_async_sessions = AsyncMock()
+
+        service.datafeed_client = datafeed_client_mock
+        datafeed_client_mock.read_datafeed_async.side_effect = self.return_events_first_time(5)
+
+        listener = BlockingIMListener()
+        service.add_im_listener(listener)
+
+        tasks = asyncio.gather(service.read_datafeed(), service.handle_events())
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+        # 2 events handled, 1 in the queue, 1 waiting to be queued: reading is paused
+        self.assertEqual(service.in_flight, 2)
+        self.assertEqual(listener.running, 2)
+        self.assertEqual(service.queue_depth, 1)
+        self.assertEqual(datafeed_client_mock.read_datafeed_async.call_count, 1)
+
+        listener.release.set()
+        await service.deactivate_datafeed()
+        await tasks
+
+        self.assertEqual(listener.handled, 5)
+        self.assertEqual(service.peak_in_flight, 2)
+        self.assertEqual(service.peak_queue_depth, 1)
+        self.assertEqual(service.in_flight, 0)
+
+    @mock.patch(
+        'sym_api_client_python.clients.datafeed_client.DataFeedClient',
+        new_callable=AsyncMock)
+    async def test_ordered_by_stream(self, datafeed_client_mock):
+        service = AsyncDataFeedEventService(self.client, ordered_by_stream=True)
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
+        self.client.close_async_sessions = AsyncMock()
+
+        service.datafeed_client = datafeed_client_mock
+        datafeed_client_mock.read_datafeed_async.side_effect = self.return_stream_events_first_time(
+            [('a', 'a1'), ('b', 'b1'), ('a', 'a2')])
+
+        listener = SlowFirstIMListener(slow_message='a1')
+        service.add_im_listener(listener)
+
+        tasks = asyncio.gather(service.read_datafeed(), service.handle_events())
+        while len(listener.handled) < 3:
+            await asyncio.sleep(0.01)
+        await service.deactivate_datafeed()
+        await tasks
+
+        # b1 is not held back by the slow a1, but a2 waits for it
+        self.assertEqual(listener.handled, ['b1', 'a1', 'a2'])
+        self.assertEqual(service.stream_tails, {})
+
+    @mock.patch(
+        'sym_api_client_python.clients.datafeed_client.DataFeedClient',
+        new_callable=AsyncMock)
+    async def test_duplicate_events_are_dropped(self, datafeed_client_mock):
+        service = AsyncDataFeedEventService(self.client, deduplicate_events=True)
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
+        self.client.close_async_sessions = AsyncMock()
+
+        service.datafeed_client = datafeed_client_mock
+        datafeed_client_mock.read_datafeed_async.side_effect = self.return_stream_events_first_time(
+            [('a', 'a1'), ('a', 'a2'), ('a', 'a1')])
+
+        listener = SlowFirstIMListener(slow_message=None)
+        service.add_im_listener(listener)
+
+        tasks = asyncio.gather(service.read_datafeed(), service.handle_events())
+        while len(listener.handled) < 2:
+            await asyncio.sleep(0.01)
+        await service.deactivate_datafeed()
+        await tasks
+
+        self.assertEqual(sorted(listener.handled), ['a1', 'a2'])
+        self.assertEqual(service.event_deduplicator.duplicate_events, 1)
+        self.assertEqual(len(service.latency_recorder), 0)
+
+    async def test_datafeed_v1_never_blocks_the_loop(self):
+        def blocking_call(*args):
+            time.sleep(0.3)
+
+        self.config.data['reuseDatafeedID'] = False
+        service = AsyncDataFeedEventService(self.client, error_timeout_sec=0.01)
+        # The synchronous calls block, the service must use the asynchronous ones
+        self.client.get_bot_user_info = MagicMock(side_effect=blocking_call)
+        self.client.get_bot_user_info_async = AsyncMock(return_value={'id': 456})
+        self.client.close_async_sessions = AsyncMock()
+        datafeed_client_mock = MagicMock()
+        datafeed_client_mock.create_datafeed.side_effect = blocking_call
+        datafeed_client_mock.read_datafeed.side_effect = blocking_call
+        datafeed_client_mock.create_datafeed_async = AsyncMock(side_effect=['datafeed_1', 'datafeed_2'])
+        read_results = [ServerErrorException('Server Error Exception: 503')]
+
+        async def read(datafeed_id):
+            if read_results:
+                raise read_results.pop()
+            return await self.return_event_no_id_first_time(datafeed_id)
+        datafeed_client_mock.read_datafeed_async = AsyncMock(side_effect=read)
+        service.datafeed_client = datafeed_client_mock
+
+        listener = IMListenerRecorder(service)
+        service.add_im_listener(listener)
+
+        async with LoopLagMonitor() as monitor:
+            await service.start_datafeed()
 
         self.assertIsNotNone(listener.last_message)
+        self.assertEqual(service.datafeed_id, 'datafeed_2')
+        datafeed_client_mock.read_datafeed_async.assert_called_with('datafeed_2')
+        self.assertLess(monitor.max_lag, 0.1)
+
+    def test_get_stream_key(self):
+        message_sent = {'payload': {'messageSent': {'message': {'stream': {'streamId': 'abc', 'streamType': 'IM'}}}}}
+        elements_action = {'payload': {'symphonyElementsAction': {'formStream': {'streamId': 'a/b+c=='},
+                                                                  'actionStream': {'streamId': 'xyz'}}}}
+        user_joined = {'payload': {'userJoinedRoom': {'stream': {'streamId': 'room'}, 'affectedUser': {}}}}
+        connection = {'payload': {'connectionAccepted': {'fromUser': {'userId': 1}}}}
+
+        self.assertEqual(AsyncDataFeedEventService.get_stream_key(message_sent), 'abc')
+        self.assertEqual(AsyncDataFeedEventService.get_stream_key(elements_action), 'a_b-c')
+        self.assertEqual(AsyncDataFeedEventService.get_stream_key(user_joined), 'room')
+        self.assertIsNone(AsyncDataFeedEventService.get_stream_key(connection))
+
+    def return_stream_events_first_time(self, stream_and_message_ids):
+        async def read(_arg):
+            await asyncio.sleep(0)
+            if self.ran:
+                return []
+            self.ran = True
+            return [{'type': 'MESSAGESENT', 'timestamp': 0, 'messageId': message_id,
+                     'payload': {'messageSent': {'message': {'messageId': message_id,
+                                                             'stream': {'streamId': stream_id,
+                                                                        'streamType': 'IM'}}}},
+                     'initiator': {'user': {'userId': 123}}} for stream_id, message_id in stream_and_message_ids]
+        return read
+
+    def return_events_first_time(self, number_of_events):
+        async def read(_arg):
+            await asyncio.sleep(0)
+            if self.ran:
+                return []
+            self.ran = True
+            return [{'type': 'MESSAGESENT', 'timestamp': 0, 'messageId': str(i),
+                     'payload': {'messageSent': {'message': {'stream': {'streamType': 'IM'}}}},
+                     'initiator': {'user': {'userId': 123}}} for i in range(number_of_events)]
+        return read
+
+    async def return_event_v2_first_time(self, _datafeed_id, _ack_id):
+        return await self.return_event_no_id_first_time(_datafeed_id)
 
     async def return_event_no_id_first_time(self, _arg):
         if self.ran:
@@ -97,3 +286,37 @@ class IMListenerRecorder(IMListener):
 
     def on_im_created(self, stream):
         pass  # Not used
+
+
+class BlockingIMListener(IMListener):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+        self.running = 0
+        self.handled = 0
+
+    async def on_im_message(self, message):
+        self.running += 1
+        await self.release.wait()
+        self.running -= 1
+        self.handled += 1
+
+    def on_im_created(self, stream):
+        pass  # Not used
+
+
+class SlowFirstIMListener(IMListener):
+
+    def __init__(self, slow_message) -> None:
+        super().__init__()
+        self.slow_message = slow_message
+        self.handled = []
+
+    async def on_im_message(self, message):
+        if message['messageId'] == self.slow_message:
+            await asyncio.sleep(0.05)
+        self.handled.append(message['messageId'])
+
+    def on_im_created(self, stream):
+        pass  # Not used
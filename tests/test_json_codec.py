@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from sym_api_client_python import json_codec
+from sym_api_client_python.auth.rsa_auth import SymBotRSAAuth
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.json_codec import (
+    get_json_codec, encode_json_body, OrjsonCodec, StdlibJsonCodec, UjsonCodec)
+from tests.util.resource_util import get_resource_filepath
+
+EVENTS = {'ackId': 'ack', 'events': [{'id': 'é1', 'timestamp': 1565879149167, 'initiator': {'user': {'userId': 1}},
+                                      'payload': {'messageSent': {'message': {'message': '<div>🙂</div>'}}}}]}
+
+
+class TestJsonCodec(unittest.TestCase):
+
+    def test_codecs_round_trip_bytes(self):
+        for codec in (StdlibJsonCodec, OrjsonCodec, UjsonCodec):
+            if not json_codec._CODECS[codec.name][1]():
+                continue
+            with self.subTest(codec.name):
+                encoded = codec.dumps(EVENTS)
+                self.assertIsInstance(encoded, bytes)
+                self.assertEqual(StdlibJsonCodec.loads(encoded), EVENTS)
+                self.assertEqual(codec.loads(StdlibJsonCodec.dumps(EVENTS)), EVENTS)
+                with self.assertRaises(ValueError):
+                    codec.loads(b'<html>Not json</html>')
+
+    def test_get_json_codec(self):
+        self.assertIs(get_json_codec('json'), StdlibJsonCodec)
+        with self.assertRaises(ValueError):
+            get_json_codec('yaml')
+
+    @patch.object(json_codec, 'ujson', None)
+    @patch.object(json_codec, 'orjson', None)
+    def test_auto_falls_back_on_stdlib(self):
+        self.assertIs(get_json_codec(), StdlibJsonCodec)
+        self.assertIs(get_json_codec('auto'), StdlibJsonCodec)
+        with self.assertRaises(ImportError):
+            get_json_codec('orjson')
+
+    def test_encode_json_body(self):
+        kwargs = {'json': {'ackId': ''}, 'headers': {'X-Trace-Id': '1'}}
+        encoded = encode_json_body(StdlibJsonCodec, kwargs)
+
+        self.assertEqual(encoded, {'data': b'{"ackId":""}',
+                                   'headers': {'X-Trace-Id': '1', 'Content-Type': 'application/json'}})
+        # The given keyword arguments are left untouched, for retries
+        self.assertIn('json', kwargs)
+        self.assertEqual(encode_json_body(StdlibJsonCodec, {'params': {'limit': 1}}), {'params': {'limit': 1}})
+
+
+@patch('sym_api_client_python.clients.sym_bot_client.requests.sessions.Session.request')
+class TestSymBotClientJsonCodec(unittest.TestCase):
+
+    def setUp(self):
+        configure = SymConfig(get_resource_filepath('./bot-config.json'))
+        configure.load_config()
+        configure.data['jsonCodec'] = 'json'
+        self.bot_client = SymBotClient(SymBotRSAAuth(configure), configure)
+
+    def test_response_is_decoded_from_bytes(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200, content=StdlibJsonCodec.dumps(EVENTS))
+
+        self.assertEqual(self.bot_client.execute_rest_call('POST', '/agent/v5/datafeeds/id/read',
+                                                           json={'ackId': ''}), EVENTS)
+        mock_request.assert_called_with('POST', self.bot_client.config.data['agentUrl'] + '/agent/v5/datafeeds/id/read',
+                                        data=b'{"ackId":""}', headers={'Content-Type': 'application/json'},
+                                        timeout=(10, 60))
+
+    def test_non_json_response_is_returned_as_text(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200, content=b'OK', text='OK')
+
+        self.assertEqual(self.bot_client.execute_rest_call('GET', '/pod/v1/podcert'), 'OK')
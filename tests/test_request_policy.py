@@ -0,0 +1,249 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, patch
+
+import aiohttp
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.request_policy import (RequestCoalescer, RequestHedger, classify_request,
+                                                  get_coalescing_key, to_aiohttp_timeout,
+                                                  LONG_POLL, LOOKUP, SEND, UPLOAD)
+from tests.clients.test_sym_bot_client import MockAsyncResponse
+from tests.util.resource_util import get_resource_filepath
+
+HEDGE_DELAY_SEC = 0.05
+SLOW_CALL_SEC = 0.5
+
+
+class SlowFirstCall:
+    """Callable whose first call is slow, or fails if error is given, and the next ones fast"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, value):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(SLOW_CALL_SEC)
+            if self.error:
+                raise self.error
+        return '{} from call {}'.format(value, call)
+
+
+class TestRequestPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+
+    def test_classify_request(self):
+        self.assertEqual(classify_request('GET', '/agent/v4/datafeed/id/read', {}), LONG_POLL)
+        self.assertEqual(classify_request('POST', '/agent/v5/datafeeds/id/read', {'json': {}}), LONG_POLL)
+        self.assertEqual(classify_request('GET', '/pod/v2/user', {'params': {'uid': 1}}), LOOKUP)
+        self.assertEqual(classify_request('POST', '/agent/v4/stream/sid/message/create', {'files': {}}), SEND)
+        self.assertEqual(classify_request('DELETE', '/agent/v5/datafeeds/id', {}), SEND)
+        self.assertEqual(classify_request('POST', '/agent/v4/stream/sid/message/create',
+                                          {'data': MultipartEncoder(fields={'message': 'm'})}), UPLOAD)
+        self.assertEqual(classify_request('GET', '/agent/v1/stream/sid/attachment', {}), UPLOAD)
+
+    def test_request_timeouts(self):
+        self.assertEqual(self.config.get_request_timeout(LOOKUP), (10, 30))
+        self.assertEqual(self.config.get_request_timeout(SEND), (10, 60))
+        self.assertEqual(self.config.get_request_timeout(UPLOAD), (10, 300))
+        self.assertEqual(self.config.get_request_timeout(LONG_POLL), (10, 60))
+
+        self.config.data['connectTimeout'] = 3
+        self.config.data['lookupTimeout'] = 5
+        self.config.data['uploadTimeout'] = 0
+        self.assertEqual(self.config.get_request_timeout(LOOKUP), (3, 5))
+        self.assertEqual(self.config.get_request_timeout(UPLOAD), (3, None))
+        self.assertIsNone(self.config.get_hedge_delay())
+
+    def test_coalescing_key(self):
+        self.assertEqual(get_coalescing_key('GET', '/pod/v2/user', {'params': {'uid': 1, 'local': 'true'}}),
+                         get_coalescing_key('get', '/pod/v2/user', {'params': {'local': 'true', 'uid': 1}}))
+        self.assertNotEqual(get_coalescing_key('GET', '/pod/v2/user', {'params': {'uid': 1}}),
+                            get_coalescing_key('GET', '/pod/v2/user', {'params': {'uid': 2}}))
+        self.assertIsNone(get_coalescing_key('POST', '/pod/v1/admin/user/create', {'json': {}}))
+        self.assertIsNone(get_coalescing_key('GET', '/agent/v4/datafeed/id/read', {}))
+        self.assertIsNone(get_coalescing_key('GET', '/pod/v2/user', {'params': {'uid': {1, 2}}}))
+
+    def test_to_aiohttp_timeout(self):
+        self.assertEqual(to_aiohttp_timeout((3, 5)), aiohttp.ClientTimeout(total=None, sock_connect=3, sock_read=5))
+        self.assertEqual(to_aiohttp_timeout(7), aiohttp.ClientTimeout(total=7))
+
+    @patch('requests.Session.request')
+    def test_rest_calls_get_the_timeout_of_their_class(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=204)
+        self.config.data['lookupTimeout'] = 5
+        bot_client = SymBotClient(MagicMock(), self.config)
+
+        bot_client.execute_rest_call('GET', '/pod/v2/user', params={'uid': 1})
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], (10, 5))
+        bot_client.execute_rest_call('POST', '/agent/v4/stream/sid/message/create', files={})
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], (10, 60))
+        bot_client.execute_rest_call('GET', '/pod/v2/user', timeout=1)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], 1)
+
+    def test_slow_call_is_hedged(self):
+        hedger = RequestHedger(HEDGE_DELAY_SEC)
+        self.addCleanup(hedger.shutdown)
+        function = SlowFirstCall()
+
+        started = time.monotonic()
+        self.assertEqual(hedger.call(function, 'user'), 'user from call 2')
+
+        self.assertLess(time.monotonic() - started, SLOW_CALL_SEC)
+        self.assertEqual((hedger.calls, hedger.hedged, hedger.hedge_wins), (1, 1, 1))
+        # The next call is fast and not hedged
+        self.assertEqual(hedger.call(function, 'user'), 'user from call 3')
+        self.assertEqual((hedger.calls, hedger.hedged, hedger.hedge_wins), (2, 1, 1))
+
+    def test_failed_attempt_falls_back_on_the_other(self):
+        hedger = RequestHedger(HEDGE_DELAY_SEC)
+        self.addCleanup(hedger.shutdown)
+        function = SlowFirstCall(error=ConnectionError('Pod node unavailable'))
+
+        self.assertEqual(hedger.call(function, 'user'), 'user from call 2')
+
+        def failing(value):
+            raise ValueError(value)
+
+        with self.assertRaises(ValueError):
+            hedger.call(failing, 'user')
+
+    def test_disabled_without_delay(self):
+        hedger = RequestHedger(None)
+        function = SlowFirstCall()
+
+        self.assertEqual(hedger.call(function, 'user'), 'user from call 1')
+        self.assertEqual(hedger.calls, 0)
+
+
+class TestRequestCoalescer(unittest.TestCase):
+
+    def test_concurrent_identical_calls_are_coalesced(self):
+        coalescer = RequestCoalescer()
+        barrier = threading.Barrier(5)
+        calls = []
+
+        def slow_call(value):
+            calls.append(value)
+            time.sleep(0.2)
+            return {'value': value}
+
+        def call(_):
+            barrier.wait()
+            return coalescer.call(('GET', '/pod/v2/user'), slow_call, 'user')
+
+        with ThreadPoolExecutor(5) as executor:
+            results = list(executor.map(call, range(5)))
+
+        self.assertEqual(results, [{'value': 'user'}] * 5)
+        self.assertEqual(calls, ['user'])
+        self.assertEqual((coalescer.calls, coalescer.coalesced), (5, 4))
+        # Not coalesced with the calls that already returned
+        coalescer.call(('GET', '/pod/v2/user'), slow_call, 'user')
+        self.assertEqual(len(calls), 2)
+
+    def test_errors_are_shared(self):
+        coalescer = RequestCoalescer()
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise ConnectionError('Pod node unavailable')
+
+        with ThreadPoolExecutor(2) as executor:
+            first = executor.submit(coalescer.call, 'key', failing)
+            started.wait()
+            second = executor.submit(coalescer.call, 'key', failing)
+            for future in (first, second):
+                self.assertIsInstance(future.exception(), ConnectionError)
+        self.assertEqual(coalescer.coalesced, 1)
+
+    def test_disabled(self):
+        coalescer = RequestCoalescer(enabled=False)
+        function = SlowFirstCall()
+        self.assertEqual(coalescer.call('key', function, 'user'), 'user from call 1')
+        self.assertEqual(coalescer.calls, 0)
+
+
+class TestRequestHedgerAsync(IsolatedAsyncioTestCase):
+
+    async def test_slow_call_is_hedged_and_cancelled(self):
+        hedger = RequestHedger(HEDGE_DELAY_SEC)
+        attempts = []
+
+        async def lookup(value):
+            attempts.append(asyncio.current_task())
+            await asyncio.sleep(SLOW_CALL_SEC if len(attempts) == 1 else 0)
+            return '{} from call {}'.format(value, len(attempts))
+
+        self.assertEqual(await hedger.call_async(lookup, 'room'), 'room from call 2')
+        await asyncio.sleep(0)
+
+        self.assertTrue(attempts[0].cancelled())
+        self.assertEqual((hedger.calls, hedger.hedged, hedger.hedge_wins), (1, 1, 1))
+
+    async def test_hedged_rest_call(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        config.data['hedgeDelay'] = HEDGE_DELAY_SEC
+        auth = MagicMock()
+        auth.get_session_token.return_value = 'session_token'
+        bot_client = SymBotClient(auth, config)
+        self.addAsyncCleanup(bot_client.close_async_sessions)
+        timeouts = []
+
+        async def request(session, method, url, **kwargs):
+            timeouts.append(kwargs['timeout'])
+            await asyncio.sleep(SLOW_CALL_SEC if len(timeouts) == 1 else 0)
+            return MockAsyncResponse(200, {'roomSystemInfo': {'id': len(timeouts)}})
+
+        with patch('aiohttp.ClientSession.request', new=request):
+            room_info = await bot_client.get_stream_client().get_room_info_async('stream_id')
+
+        self.assertEqual(room_info, {'roomSystemInfo': {'id': 2}})
+        self.assertEqual(timeouts, [aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)] * 2)
+
+
+class TestRequestCoalescerAsync(IsolatedAsyncioTestCase):
+
+    async def test_identical_lookups_share_one_request(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        auth = MagicMock()
+        auth.get_session_token.return_value = 'session_token'
+        bot_client = SymBotClient(auth, config)
+        self.addAsyncCleanup(bot_client.close_async_sessions)
+        sent = []
+
+        async def request(session, method, url, **kwargs):
+            sent.append(kwargs['params'])
+            await asyncio.sleep(0.05)
+            return MockAsyncResponse(200, {'id': kwargs['params']['uid']})
+
+        user_client = bot_client.get_user_client()
+        with patch('aiohttp.ClientSession.request', new=request):
+            cancelled = asyncio.ensure_future(user_client.get_user_from_id_async(1))
+            lookups = [user_client.get_user_from_id_async(user_id) for user_id in (1, 1, 2, 1)]
+            await asyncio.sleep(0)
+            # Does not cancel the request of the others
+            cancelled.cancel()
+            users = await asyncio.gather(*lookups)
+
+        self.assertEqual(users, [{'id': 1}, {'id': 1}, {'id': 2}, {'id': 1}])
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(bot_client.get_request_stats()['coalesced'], 3)
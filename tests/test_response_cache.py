@@ -0,0 +1,130 @@
+import time
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, patch
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.request_policy import get_coalescing_key
+from sym_api_client_python.response_cache import ResponseCache, USER, STREAM, ROOM, POD_FEATURES
+from tests.clients.test_sym_bot_client import MockAsyncResponse
+from tests.test_retry_policy import make_response
+from tests.util.resource_util import get_resource_filepath
+
+
+def user_key(user_id):
+    return get_coalescing_key('GET', '/pod/v2/user', {'params': {'uid': user_id, 'local': False}})
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_responses_expire(self):
+        cache = ResponseCache({USER: 0.05, ROOM: 0})
+        self.assertTrue(cache.is_cached(USER, user_key(1)))
+        self.assertFalse(cache.is_cached(ROOM, user_key(1)))
+        self.assertFalse(cache.is_cached(USER, None))
+
+        self.assertEqual(cache.get(user_key(1)), (False, None))
+        cache.put(USER, user_key(1), {'id': 1})
+        self.assertEqual(cache.get(user_key(1)), (True, {'id': 1}))
+        time.sleep(0.06)
+        self.assertEqual(cache.get(user_key(1)), (False, None))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 0))
+
+    def test_least_recently_used_responses_are_evicted(self):
+        cache = ResponseCache({USER: 60}, max_size=2)
+        cache.put(USER, user_key(1), {'id': 1})
+        cache.put(USER, user_key(2), {'id': 2})
+        cache.get(user_key(1))
+        cache.put(USER, user_key(3), {'id': 3})
+
+        self.assertEqual(cache.get(user_key(1)), (True, {'id': 1}))
+        self.assertEqual(cache.get(user_key(2)), (False, None))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_invalidation(self):
+        cache = ResponseCache({USER: 60, STREAM: 60, ROOM: 60, POD_FEATURES: 60})
+        room_key = get_coalescing_key('GET', '/pod/v3/room/sid/info', {})
+        stream_key = get_coalescing_key('GET', '/pod/v2/streams/sid/info', {})
+        other_room_key = get_coalescing_key('GET', '/pod/v3/room/other/info', {})
+        email_key = get_coalescing_key('GET', '/pod/v2/user', {'params': {'email': 'bot@symphony.com'}})
+        for endpoint, key, response in ((ROOM, room_key, {}), (STREAM, stream_key, {}), (ROOM, other_room_key, {}),
+                                        (USER, user_key(1), {'id': 1}), (USER, email_key, {'id': 1}),
+                                        (USER, user_key(2), {'id': 2}), (POD_FEATURES, ('features',), [])):
+            cache.put(endpoint, key, response)
+
+        self.assertEqual(cache.invalidate_stream('sid'), 2)
+        self.assertEqual(cache.invalidate_user(1), 2)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.invalidate(POD_FEATURES), 1)
+        self.assertEqual(cache.clear(), 2)
+
+    def test_config(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        self.assertEqual(config.get_response_cache_config(), {
+            'ttls': {'user': 60, 'stream': 60, 'room': 60, 'attachmentTypes': 3600, 'podFeatures': 3600},
+            'max_size': 10000})
+        config.data.update({'userCacheTtl': 0, 'responseCacheSize': 100})
+        self.assertEqual(config.get_response_cache_config()['ttls'][USER], 0)
+        self.assertEqual(config.get_response_cache_config()['max_size'], 100)
+
+
+class TestCachedLookups(unittest.TestCase):
+
+    def setUp(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        self.bot_client = SymBotClient(MagicMock(), config)
+
+    @patch('requests.Session.request')
+    def test_user_lookups_are_cached_until_updated(self, mock_request):
+        mock_request.side_effect = lambda method, url, **kwargs: make_response(200, {'id': 1, 'method': method})
+        user_client = self.bot_client.get_user_client()
+
+        self.assertEqual(user_client.get_user_from_id(1), {'id': 1, 'method': 'GET'})
+        self.assertEqual(user_client.get_user_from_id(1), {'id': 1, 'method': 'GET'})
+        self.assertEqual(mock_request.call_count, 1)
+
+        self.bot_client.get_admin_client().admin_update_user(1, {'displayName': 'Bot'})
+        user_client.get_user_from_id(1)
+        self.assertEqual(mock_request.call_count, 3)
+        stats = self.bot_client.get_request_stats()
+        self.assertEqual((stats['cache_hits'], stats['cache_misses']), (1, 2))
+
+    @patch('requests.Session.request')
+    def test_errors_are_not_cached(self, mock_request):
+        mock_request.side_effect = [make_response(404, {'message': 'Not found'}), make_response(200, ['image/png'])]
+        message_client = self.bot_client.get_message_client()
+
+        with self.assertRaises(Exception):
+            message_client.get_supported_attachment_types()
+        self.assertEqual(message_client.get_supported_attachment_types(), ['image/png'])
+        self.assertEqual(message_client.get_supported_attachment_types(), ['image/png'])
+        self.assertEqual(mock_request.call_count, 2)
+
+
+class TestCachedLookupsAsync(IsolatedAsyncioTestCase):
+
+    async def test_room_info_is_cached_until_updated(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        auth = MagicMock()
+        auth.get_session_token.return_value = 'session_token'
+        bot_client = SymBotClient(auth, config)
+        self.addAsyncCleanup(bot_client.close_async_sessions)
+        sent = []
+
+        async def request(session, method, url, **kwargs):
+            sent.append(url)
+            return MockAsyncResponse(200, {'roomSystemInfo': {'id': 'sid'}})
+
+        stream_client = bot_client.get_stream_client()
+        with patch('aiohttp.ClientSession.request', new=request):
+            await stream_client.get_room_info_async('sid')
+            await stream_client.get_room_info_async('sid')
+            self.assertEqual(len(sent), 1)
+            with patch('requests.Session.request', return_value=make_response(200, {})):
+                stream_client.deactivate_room('sid')
+            await stream_client.get_room_info_async('sid')
+        self.assertEqual(len(sent), 2)
@@ -0,0 +1,163 @@
+import email.utils
+import json
+import time
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from sym_api_client_python.clients.sym_bot_client import SymBotClient
+from sym_api_client_python.configure.configure import SymConfig
+from sym_api_client_python.exceptions.APIClientErrorException import APIClientErrorException
+from sym_api_client_python.exceptions.ServerErrorException import ServerErrorException
+from sym_api_client_python.exceptions.TooManyRequestsException import TooManyRequestsException
+from sym_api_client_python.request_policy import LONG_POLL, LOOKUP, SEND, UPLOAD
+from sym_api_client_python.retry_policy import (RateLimiter, RetryPolicy, TokenBucket, get_endpoint_family,
+                                                parse_retry_after, MESSAGE, AGENT, POD, DATAFEED)
+from tests.clients.test_sym_bot_client import MockAsyncResponse
+from tests.util.resource_util import get_resource_filepath
+
+
+def make_response(status, payload, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode('utf-8')
+    response.headers.update(headers or {})
+    return response
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('2'), 2)
+        self.assertEqual(parse_retry_after('0.5'), 0.5)
+        self.assertAlmostEqual(parse_retry_after(email.utils.formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+        self.assertEqual(parse_retry_after(email.utils.formatdate(time.time() - 30, usegmt=True)), 0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+    def test_get_endpoint_family(self):
+        self.assertEqual(get_endpoint_family('/agent/v4/stream/sid/message/create', SEND), MESSAGE)
+        self.assertEqual(get_endpoint_family('/agent/v2/message/import', SEND), MESSAGE)
+        self.assertEqual(get_endpoint_family('/agent/v1/message/search', LOOKUP), AGENT)
+        self.assertEqual(get_endpoint_family('/pod/v2/user', LOOKUP), POD)
+        self.assertEqual(get_endpoint_family('/agent/v5/datafeeds/id/read', LONG_POLL), DATAFEED)
+
+    def test_retry_delay(self):
+        policy = RetryPolicy(max_retries=2)
+        # 429s are retried whatever the method, after the Retry-After
+        self.assertEqual(policy.get_retry_delay('POST', SEND, 0, 429, '3'), 3)
+        self.assertLessEqual(policy.get_retry_delay('POST', SEND, 1, 429, None), 1)
+        self.assertIsNone(policy.get_retry_delay('POST', SEND, 2, 429, '3'))
+        # 5xx and connection errors only for idempotent methods
+        self.assertLessEqual(policy.get_retry_delay('GET', LOOKUP, 0, 503), 0.5)
+        self.assertLessEqual(policy.get_retry_delay('DELETE', SEND, 1), 1)
+        self.assertIsNone(policy.get_retry_delay('POST', SEND, 0, 503))
+        self.assertIsNone(policy.get_retry_delay('POST', SEND, 0))
+        self.assertIsNone(policy.get_retry_delay('GET', LOOKUP, 0, 404))
+        self.assertIsNone(policy.get_retry_delay('GET', LONG_POLL, 0, 503))
+        self.assertIsNone(policy.get_retry_delay('POST', UPLOAD, 0, 429, '1'))
+        self.assertEqual(policy.retries, 4)
+
+        policy = RetryPolicy(retry_non_idempotent=True, max_retry_after_sec=10)
+        self.assertIsNotNone(policy.get_retry_delay('POST', SEND, 0, 503))
+        self.assertLessEqual(policy.get_retry_delay('POST', SEND, 0, 429, '3600'), 0.5)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.01)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, delta=0.01)
+
+    def test_rate_limiter(self):
+        rate_limiter = RateLimiter({MESSAGE: 1, POD: None})
+        self.assertEqual(rate_limiter.reserve(MESSAGE), 0)
+        self.assertGreater(rate_limiter.reserve(MESSAGE), 0.9)
+        self.assertEqual(rate_limiter.reserve(POD), 0)
+        rate_limiter.pause(POD, 5)
+        self.assertGreater(rate_limiter.reserve(POD), 4.9)
+        self.assertEqual(rate_limiter.reserve(AGENT), 0)
+        self.assertEqual(rate_limiter.throttled, 2)
+
+    def test_config(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        self.assertEqual(config.get_retry_config(),
+                         {'max_retries': 3, 'retry_non_idempotent': False, 'max_retry_after_sec': 60})
+        self.assertEqual(config.get_rate_limits(), {MESSAGE: None, AGENT: None, POD: None})
+        config.data.update({'maxRetries': 0, 'messageRateLimit': 5})
+        self.assertEqual(config.get_retry_config()['max_retries'], 0)
+        self.assertEqual(config.get_rate_limits()[MESSAGE], 5)
+
+
+@patch('sym_api_client_python.retry_policy.RetryPolicy.get_backoff', return_value=0)
+class TestRetries(unittest.TestCase):
+
+    def setUp(self):
+        self.config = SymConfig(get_resource_filepath('./bot-config.json'))
+        self.config.load_config()
+        self.bot_client = SymBotClient(MagicMock(), self.config)
+
+    @patch('requests.Session.request')
+    def test_too_many_requests_is_retried_after_retry_after(self, mock_request, _):
+        mock_request.side_effect = [make_response(429, {'message': 'slow down'}, {'Retry-After': '0'}),
+                                    make_response(200, {'id': 1})]
+        result = self.bot_client.execute_rest_call('POST', '/agent/v4/stream/sid/message/create', files={})
+        self.assertEqual(result, {'id': 1})
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch('requests.Session.request')
+    def test_too_many_requests_raised_once_retries_are_exhausted(self, mock_request, _):
+        mock_request.return_value = make_response(429, {'message': 'slow down'}, {'Retry-After': '0'})
+        with self.assertRaises(TooManyRequestsException) as context:
+            self.bot_client.execute_rest_call('GET', '/pod/v2/user')
+        self.assertEqual(context.exception.retry_after, 0)
+        self.assertIsInstance(context.exception, APIClientErrorException)
+        self.assertEqual(mock_request.call_count, 4)
+
+    @patch('requests.Session.request')
+    def test_server_errors_are_retried_for_idempotent_calls_only(self, mock_request, _):
+        mock_request.side_effect = [make_response(503, {}), requests.exceptions.ConnectionError(),
+                                    make_response(200, {'id': 1})]
+        self.assertEqual(self.bot_client.execute_rest_call('GET', '/pod/v2/user'), {'id': 1})
+
+        mock_request.side_effect = [make_response(503, {})]
+        with self.assertRaises(ServerErrorException):
+            self.bot_client.execute_rest_call('POST', '/agent/v4/stream/sid/message/create', files={})
+        self.assertEqual(mock_request.call_count, 4)
+
+
+class TestRetriesAsync(IsolatedAsyncioTestCase):
+
+    async def test_too_many_requests_pauses_the_family(self):
+        config = SymConfig(get_resource_filepath('./bot-config.json'))
+        config.load_config()
+        auth = MagicMock()
+        auth.get_session_token.return_value = 'session_token'
+        auth.get_key_manager_token.return_value = 'key_manager_token'
+        bot_client = SymBotClient(auth, config)
+        self.addAsyncCleanup(bot_client.close_async_sessions)
+        sent = []
+
+        async def request(session, method, url, **kwargs):
+            sent.append(time.monotonic())
+            if len(sent) == 1:
+                return MockAsyncResponse(429, {'message': 'slow down'}, {'Retry-After': '0.2'})
+            return MockAsyncResponse(200, {'id': len(sent)})
+
+        with patch('aiohttp.ClientSession.request', new=request):
+            result = await bot_client.execute_rest_call_async('POST', '/agent/v4/stream/sid/message/create',
+                                                              files={'message': 'm'})
+            self.assertEqual(result, {'id': 2})
+            self.assertGreaterEqual(sent[1] - sent[0], 0.2)
+
+            # The other message sends wait for the Retry-After too, the pod calls do not
+            bot_client.rate_limiter.pause(MESSAGE, 0.2)
+            start = time.monotonic()
+            await bot_client.execute_rest_call_async('GET', '/pod/v2/user')
+            self.assertLess(time.monotonic() - start, 0.1)
+            await bot_client.execute_rest_call_async('POST', '/agent/v4/stream/sid/message/create',
+                                                     files={'message': 'm'})
+            self.assertGreaterEqual(time.monotonic() - start, 0.15)
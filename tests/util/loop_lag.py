@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+
+class LoopLagMonitor:
+    """Measures the largest delay of the event loop in waking up a coroutine sleeping for
+    interval seconds, which is how long the loop was blocked. To be used as an async context
+    manager around the code under test"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _monitor(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, time.monotonic() - started - self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.ensure_future(self._monitor())
+        # Let the monitor start before the code under test
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass